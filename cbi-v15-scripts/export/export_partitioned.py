@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Incremental, Hive-partitioned export of the training splits
+Writes daily_ml_matrix/split=<split>/year=<yyyy>/month=<mm>/part-0.parquet
+plus a _manifest.json recording each partition's row count, date range,
+schema hash and source modification stamp. Reruns only rewrite partitions
+whose source changed, so daily increments land in seconds.
+
+Usage:
+  python export_partitioned.py                          # from BigQuery
+  python export_partitioned.py --duckdb local.duckdb    # local DuckDB stand-in
+  python export_partitioned.py --full                   # ignore the manifest
+"""
+import argparse
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import pyarrow as pa
+
+from export_training_data import OUTPUT_DIR, PAGE_SIZE, PROJECT_ID, SPLITS, get_client, get_gateway, guarded_query, write_batches
+
+logging.basicConfig(level=logging.INFO)
+
+DATASET_NAME = "daily_ml_matrix"
+MANIFEST_NAME = "_manifest.json"
+MAX_WORKERS = 4
+
+PartitionKey = Tuple[int, int]  # (year, month)
+
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _schema_hash(columns) -> str:
+    return hashlib.sha256(json.dumps(columns).encode()).hexdigest()[:16]
+
+
+class BigQuerySource:
+    """Partition stamps from INFORMATION_SCHEMA.PARTITIONS; data via result pages"""
+
+    def schema_hash(self, table_ref: str) -> str:
+        table = get_client().get_table(f"{PROJECT_ID}.{table_ref}")
+        return _schema_hash([(f.name, f.field_type) for f in table.schema])
+
+    def partition_stamps(self, table_ref: str) -> Dict[PartitionKey, dict]:
+        dataset, table = table_ref.split(".")
+        query = f"""
+        SELECT
+            EXTRACT(YEAR FROM PARSE_DATE('%Y%m%d', partition_id)) AS year,
+            EXTRACT(MONTH FROM PARSE_DATE('%Y%m%d', partition_id)) AS month,
+            SUM(total_rows) AS rows,
+            MIN(PARSE_DATE('%Y%m%d', partition_id)) AS min_date,
+            MAX(PARSE_DATE('%Y%m%d', partition_id)) AS max_date,
+            MAX(last_modified_time) AS source_modified
+        FROM `{PROJECT_ID}.{dataset}.INFORMATION_SCHEMA.PARTITIONS`
+        WHERE table_name = '{table}'
+          AND partition_id NOT IN ('__NULL__', '__UNPARTITIONED__')
+          AND total_rows > 0
+        GROUP BY year, month
+        """
+        stamps = {(r.year, r.month): {
+            "rows": r.rows,
+            "min_date": r.min_date.isoformat(),
+            "max_date": r.max_date.isoformat(),
+            "source_modified": r.source_modified.isoformat(),
+        } for r in guarded_query(query, label=f"partition stamps {table_ref}").result()}
+        if stamps:
+            return stamps
+
+        # Unpartitioned table: scan once and stamp every month with the table's mtime
+        logging.warning(f"⚠️  {table_ref} has no date partitions; any change rewrites every month")
+        modified = get_client().get_table(f"{PROJECT_ID}.{table_ref}").modified.isoformat()
+        query = f"""
+        SELECT EXTRACT(YEAR FROM date) AS year, EXTRACT(MONTH FROM date) AS month,
+               COUNT(*) AS rows, MIN(date) AS min_date, MAX(date) AS max_date
+        FROM `{PROJECT_ID}.{table_ref}`
+        GROUP BY year, month
+        """
+        return {(r.year, r.month): {
+            "rows": r.rows,
+            "min_date": r.min_date.isoformat(),
+            "max_date": r.max_date.isoformat(),
+            "source_modified": modified,
+        } for r in guarded_query(query, allow_full_scan=True, label=f"month scan {table_ref}").result()}
+
+    def batches(self, table_ref: str, start: date, end: date) -> Iterator[pa.RecordBatch]:
+        query = f"""
+        SELECT * FROM `{PROJECT_ID}.{table_ref}`
+        WHERE date >= '{start}' AND date < '{end}'
+        ORDER BY date, symbol
+        """
+        yield from get_gateway().read(query, label=f"export {table_ref} {start:%Y-%m}", page_size=PAGE_SIZE)
+
+
+class DuckDBSource:
+    """Local stand-in; DuckDB has no partition mtimes, so a content hash is the stamp"""
+
+    def __init__(self, database: str):
+        import duckdb
+        self.con = duckdb.connect(database, read_only=True)
+
+    def schema_hash(self, table_ref: str) -> str:
+        schema, table = table_ref.split(".")
+        columns = self.con.cursor().execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = ? AND table_name = ? ORDER BY ordinal_position",
+            [schema, table],
+        ).fetchall()
+        return _schema_hash([list(c) for c in columns])
+
+    def partition_stamps(self, table_ref: str) -> Dict[PartitionKey, dict]:
+        rows = self.con.cursor().execute(f"""
+            SELECT year(date), month(date), COUNT(*), MIN(date), MAX(date), SUM(hash(t))
+            FROM {table_ref} t
+            GROUP BY ALL
+        """).fetchall()
+        return {(y, m): {
+            "rows": n,
+            "min_date": lo.isoformat(),
+            "max_date": hi.isoformat(),
+            "source_modified": str(fingerprint),
+        } for y, m, n, lo, hi, fingerprint in rows}
+
+    def batches(self, table_ref: str, start: date, end: date) -> Iterator[pa.RecordBatch]:
+        cursor = self.con.cursor()
+        yield from cursor.execute(
+            f"SELECT * FROM {table_ref} WHERE date >= ? AND date < ? ORDER BY date, symbol",
+            [start, end],
+        ).fetch_record_batch(PAGE_SIZE)
+
+
+def partition_path(root: Path, split: str, year: int, month: int) -> Path:
+    return root / f"split={split}" / f"year={year}" / f"month={month:02d}" / "part-0.parquet"
+
+
+def load_manifest(root: Path) -> dict:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {"partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(root: Path, manifest: dict):
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    tmp = root / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    tmp.replace(root / MANIFEST_NAME)
+
+
+def plan_split(source, split: str, table_ref: str, manifest: dict, full: bool = False):
+    """Return (stale partitions to write, partitions to delete, stamps) for one split"""
+    schema_hash = source.schema_hash(table_ref)
+    stamps = source.partition_stamps(table_ref)
+    recorded = {k: v for k, v in manifest["partitions"].items() if v["split"] == split}
+
+    stale = []
+    for (year, month), stamp in sorted(stamps.items()):
+        key = f"split={split}/year={year}/month={month:02d}"
+        entry = recorded.get(key)
+        if (full or entry is None
+                or entry["schema_hash"] != schema_hash
+                or entry["source_modified"] != stamp["source_modified"]
+                or entry["rows"] != stamp["rows"]):
+            stale.append((key, year, month, dict(stamp, schema_hash=schema_hash)))
+
+    live = {f"split={split}/year={y}/month={m:02d}" for y, m in stamps}
+    removed = [k for k in recorded if k not in live]
+    return stale, removed
+
+
+def export_partitioned(source, root: Path, full: bool = False):
+    """Bring the partitioned dataset at `root` up to date with the source splits"""
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(root)
+
+    tasks = []
+    for split, table_ref in SPLITS.items():
+        stale, removed = plan_split(source, split, table_ref, manifest, full=full)
+        for key in removed:
+            entry = manifest["partitions"].pop(key)
+            (root / entry["file"]).unlink(missing_ok=True)
+            logging.info(f"🗑️  Removed {key} (no longer in source)")
+        logging.info(f"{split}: {len(stale)} partition(s) changed")
+        tasks.extend((split, table_ref, *t) for t in stale)
+
+    def write(task):
+        split, table_ref, key, year, month, stamp = task
+        start, end = _month_range(year, month)
+        path = partition_path(root, split, year, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = write_batches(source.batches(table_ref, start, end), path)
+        if rows == 0:
+            # The month emptied after it was stamped: no file, and none left from an earlier run
+            path.unlink(missing_ok=True)
+            return key, None
+        return key, dict(stamp, split=split, rows=rows, file=str(path.relative_to(root)))
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for key, entry in pool.map(write, tasks):
+            if entry is None:
+                manifest["partitions"].pop(key, None)
+                logging.warning(f"⚠️  {key}: no rows read, left out of the manifest")
+                continue
+            manifest["partitions"][key] = entry
+            logging.info(f"✅ {key}: {entry['rows']:,} rows ({entry['min_date']} → {entry['max_date']})")
+
+    save_manifest(root, manifest)
+    logging.info(f"✅ {len(tasks)} partition(s) rewritten, "
+                 f"{len(manifest['partitions'])} in manifest at {root / MANIFEST_NAME}")
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental Hive-partitioned training export")
+    parser.add_argument("--duckdb", help="Read splits from a local DuckDB file instead of BigQuery")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--full", action="store_true", help="Rewrite every partition")
+    args = parser.parse_args()
+
+    source = DuckDBSource(args.duckdb) if args.duckdb else BigQuerySource()
+    export_partitioned(source, args.output_dir / DATASET_NAME, full=args.full)
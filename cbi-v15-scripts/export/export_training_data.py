@@ -2,17 +2,38 @@
 """
 Export training data from BigQuery to Parquet for Mac training
 Exports train/val/test splits as separate files
+
+Default mode streams each split's result pages straight into Parquet row
+groups (memory stays flat as the matrix widens) and exports all splits in
+parallel, so wall time is bounded by the slowest split.
+
+Usage:
+  python export_training_data.py                          # stream from BigQuery
+  python export_training_data.py --mode dataframe         # legacy to_dataframe() path
+  python export_training_data.py --duckdb local.duckdb    # local DuckDB stand-in
 """
-from google.cloud import bigquery
-import pandas as pd
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterator
 import logging
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Shared pooled client, created on first use (not needed for the DuckDB stand-in)
+from src.utils.bigquery import get_client
+# Cost guard (dry-run estimate, spend ledger, concurrency limit) and result cache
+from src.utils.query_guard import get_gateway, guarded_query
+
 logging.basicConfig(level=logging.INFO)
-client = bigquery.Client(project="cbi-v15")
 
+PROJECT_ID = "cbi-v15"
 OUTPUT_DIR = Path("/Volumes/Satechi Hub/Projects/CBI-V15/03_Training_Exports")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 SPLITS = {
     "train": "training.daily_ml_matrix_train",
@@ -20,34 +41,134 @@ SPLITS = {
     "test": "training.daily_ml_matrix_test"
 }
 
-def export_split(split_name: str, table_ref: str):
+PAGE_SIZE = 50_000  # Rows per BigQuery result page / DuckDB record batch
+ROW_GROUP_ROWS = 100_000  # Rows per Parquet row group
+
+
+def bigquery_batches(table_ref: str) -> Iterator[pa.RecordBatch]:
+    """Stream a split from BigQuery as Arrow record batches, one result page at a time"""
+    query = f"SELECT * FROM `{PROJECT_ID}.{table_ref}` ORDER BY date, symbol"
+    # Training needs the full history, so no partition window; still costed.
+    # An unchanged split is re-read from the local result cache
+    yield from get_gateway().read(query, allow_full_scan=True, label=f"export {table_ref}", page_size=PAGE_SIZE)
+
+
+def duckdb_batches_factory(database: str) -> Callable[[str], Iterator[pa.RecordBatch]]:
+    """Batch source reading the same split tables from a local DuckDB file"""
+    import duckdb
+    con = duckdb.connect(database, read_only=True)
+
+    def duckdb_batches(table_ref: str) -> Iterator[pa.RecordBatch]:
+        # One cursor per split: DuckDB connections are not shared across threads
+        cursor = con.cursor()
+        reader = cursor.execute(f"SELECT * FROM {table_ref} ORDER BY date, symbol").fetch_record_batch(PAGE_SIZE)
+        yield from reader
+
+    return duckdb_batches
+
+
+def write_batches(batches: Iterator[pa.RecordBatch], output_path: Path) -> int:
+    """Write record batches to Parquet, buffering only one row group at a time"""
+    writer = None
+    buffered = []
+    buffered_rows = 0
+    total = 0
+    tmp_path = output_path.with_suffix(".parquet.tmp")
+
+    def flush():
+        nonlocal buffered, buffered_rows
+        if buffered:
+            writer.write_table(pa.Table.from_batches(buffered), row_group_size=ROW_GROUP_ROWS)
+            buffered, buffered_rows = [], 0
+
+    try:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, batch.schema, compression='snappy')
+            buffered.append(batch)
+            buffered_rows += batch.num_rows
+            total += batch.num_rows
+            if buffered_rows >= ROW_GROUP_ROWS:
+                flush()
+        if writer is not None:
+            flush()
+            writer.close()
+            tmp_path.replace(output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return total
+
+
+def export_split(split_name: str, table_ref: str, batches=bigquery_batches):
     """Export a single split to Parquet"""
     logging.info(f"Exporting {split_name} split from {table_ref}...")
-    
-    query = f"SELECT * FROM `cbi-v15.{table_ref}` ORDER BY date, symbol"
-    df = client.query(query).to_dataframe()
-    
+
+    output_path = OUTPUT_DIR / f"daily_ml_matrix_{split_name}.parquet"
+    rows = write_batches(batches(table_ref), output_path)
+
+    if rows == 0:
+        logging.warning(f"⚠️  No data found for {split_name} split")
+        return False
+
+    columns = len(pq.read_schema(output_path))
+    logging.info(f"✅ Exported {rows:,} rows, {columns} columns to {output_path}")
+    logging.info(f"   File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+    return True
+
+
+def export_split_dataframe(split_name: str, table_ref: str):
+    """Export a single split through a full in-memory DataFrame (legacy path)"""
+    logging.info(f"Exporting {split_name} split from {table_ref}...")
+
+    query = f"SELECT * FROM `{PROJECT_ID}.{table_ref}` ORDER BY date, symbol"
+    df = guarded_query(query, allow_full_scan=True, label=f"export {table_ref}").to_dataframe()
+
     if df.empty:
         logging.warning(f"⚠️  No data found for {split_name} split")
         return False
-    
+
     output_path = OUTPUT_DIR / f"daily_ml_matrix_{split_name}.parquet"
     df.to_parquet(output_path, index=False, compression='snappy')
-    
+
     logging.info(f"✅ Exported {len(df):,} rows, {len(df.columns)} columns to {output_path}")
     logging.info(f"   File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
-    
+
     return True
 
-def export_all_splits():
+
+def export_all_splits(mode: str = "stream", batches=bigquery_batches):
     """Export all train/val/test splits"""
-    logging.info("Exporting training data splits from BigQuery...")
-    
-    for split_name, table_ref in SPLITS.items():
-        export_split(split_name, table_ref)
-    
-    logging.info("✅ All splits exported successfully")
+    logging.info(f"Exporting training data splits to {OUTPUT_DIR}...")
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    if mode == "dataframe":
+        if batches is not bigquery_batches:
+            raise ValueError("dataframe mode reads from BigQuery only; use stream mode for other sources")
+        results = [export_split_dataframe(name, ref) for name, ref in SPLITS.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=len(SPLITS)) as pool:
+            futures = [pool.submit(export_split, name, ref, batches) for name, ref in SPLITS.items()]
+            results = [f.result() for f in futures]
+
+    if all(results):
+        logging.info("✅ All splits exported successfully")
+    else:
+        logging.warning("⚠️  Some splits were empty")
+
 
 if __name__ == "__main__":
-    export_all_splits()
+    parser = argparse.ArgumentParser(description="Export train/val/test splits to Parquet")
+    parser.add_argument("--mode", choices=["stream", "dataframe"], default="stream")
+    parser.add_argument("--duckdb", help="Read splits from a local DuckDB file instead of BigQuery (stream mode)")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+    if args.duckdb and args.mode == "dataframe":
+        parser.error("--duckdb streams splits; it cannot be combined with --mode dataframe")
 
+    OUTPUT_DIR = args.output_dir
+    batches = duckdb_batches_factory(args.duckdb) if args.duckdb else bigquery_batches
+    export_all_splits(mode=args.mode, batches=batches)
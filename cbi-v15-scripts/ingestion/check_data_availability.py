@@ -2,41 +2,40 @@
 """
 Check data availability in BigQuery tables
 Shows what data exists and what's missing
+All tables are checked from partition metadata in one batched request
 """
-from google.cloud import bigquery
+import sys
+from pathlib import Path
 import logging
 
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ops.freshness import TableStatus, collect_status
+from src.utils.bigquery import get_client
+from src.utils.query_guard import get_gateway
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 PROJECT_ID = "cbi-v15"
 
-def check_table_data(dataset: str, table: str):
-    """Check if table has data"""
-    client = bigquery.Client(project=PROJECT_ID)
-    table_id = f"{PROJECT_ID}.{dataset}.{table}"
-    
-    try:
-        query = f"SELECT COUNT(*) as count, MIN(date) as min_date, MAX(date) as max_date FROM `{table_id}`"
-        result = client.query(query).to_dataframe()
-        
-        if not result.empty:
-            count = result['count'].iloc[0]
-            min_date = result['min_date'].iloc[0]
-            max_date = result['max_date'].iloc[0]
-            
-            if count > 0:
-                logger.info(f"✅ {dataset}.{table}: {count:,} rows ({min_date} to {max_date})")
-                return True
-            else:
-                logger.warning(f"⚠️  {dataset}.{table}: Empty")
-                return False
-        else:
-            logger.warning(f"⚠️  {dataset}.{table}: No data")
-            return False
-    except Exception as e:
-        logger.error(f"❌ {dataset}.{table}: Error - {e}")
+def check_table_data(status: TableStatus):
+    """Log one table's availability; True if it has data"""
+    dataset, table = status.dataset, status.table
+
+    if status.error:
+        logger.error(f"❌ {dataset}.{table}: Error - {status.error}")
         return False
+    if not status.exists:
+        logger.warning(f"⚠️  {dataset}.{table}: No data")
+        return False
+    if status.row_count > 0:
+        logger.info(f"✅ {dataset}.{table}: {status.row_count:,} rows ({status.min_date} to {status.max_date})")
+        return True
+    logger.warning(f"⚠️  {dataset}.{table}: Empty")
+    return False
 
 def main():
     """Check all critical tables"""
@@ -44,42 +43,44 @@ def main():
     logger.info("=" * 60)
     
     # Raw layer tables
-    logger.info("\n📊 Raw Layer:")
     raw_tables = [
         ("raw", "databento_futures_ohlcv_1d"),
         ("raw", "fred_economic"),
         ("raw", "scrapecreators_trump_posts"),
         ("raw", "scrapecreators_news_buckets"),
     ]
-    
-    raw_has_data = False
-    for dataset, table in raw_tables:
-        if check_table_data(dataset, table):
-            raw_has_data = True
-    
-    # Staging layer tables
-    logger.info("\n📊 Staging Layer:")
     staging_tables = [
         ("staging", "market_daily"),
         ("staging", "fred_macro_clean"),
         ("staging", "news_bucketed"),
     ]
+    feature_tables = [
+        ("features", "daily_ml_matrix"),
+        ("features", "technical_indicators_us_oil_solutions"),
+    ]
+
+    client = get_client(PROJECT_ID)
+    statuses = collect_status(client, raw_tables + staging_tables + feature_tables, project=PROJECT_ID,
+                              gateway=get_gateway(PROJECT_ID))
+
+    logger.info("\n📊 Raw Layer:")
+    raw_has_data = False
+    for dataset, table in raw_tables:
+        if check_table_data(statuses[(dataset, table)]):
+            raw_has_data = True
     
+    # Staging layer tables
+    logger.info("\n📊 Staging Layer:")
     staging_has_data = False
     for dataset, table in staging_tables:
-        if check_table_data(dataset, table):
+        if check_table_data(statuses[(dataset, table)]):
             staging_has_data = True
     
     # Features layer tables
     logger.info("\n📊 Features Layer:")
-    feature_tables = [
-        ("features", "daily_ml_matrix"),
-        ("features", "technical_indicators_us_oil_solutions"),
-    ]
-    
     feature_has_data = False
     for dataset, table in feature_tables:
-        if check_table_data(dataset, table):
+        if check_table_data(statuses[(dataset, table)]):
             feature_has_data = True
     
     # Summary
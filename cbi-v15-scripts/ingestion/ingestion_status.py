@@ -1,19 +1,40 @@
 #!/usr/bin/env python3
 """
 Check ingestion status and data freshness
+All tables are checked from partition metadata in one batched request
 """
-from google.cloud import bigquery
-from datetime import datetime, timedelta
+import sys
+from pathlib import Path
 import logging
+from datetime import datetime, timezone
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.incremental import ledger_source
+from src.ops.freshness import collect_status
+from src.ops.ingestion_ledger import BigQueryLedger
+from src.utils.bigquery import get_client
+from src.utils.config import load_optimization_config
+from src.utils.query_guard import get_gateway
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 PROJECT_ID = "cbi-v15"
 
+# Ingesters that append to ops.ingestion_completion; the Databento loaders
+# record one source per symbol (databento_zl, databento_zs, ...)
+DATABENTO_SYMBOLS = load_optimization_config()["databento"]["symbols"]
+LEDGER_SOURCES = [
+    "vegas_events",
+    *[ledger_source(s) for s in DATABENTO_SYMBOLS["primary"] + DATABENTO_SYMBOLS["secondary"]],
+]
+
 def check_ingestion_status():
     """Check status of all ingestion sources"""
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_client(PROJECT_ID)
     
     logger.info("📊 Ingestion Status Check")
     logger.info("=" * 60)
@@ -25,66 +46,72 @@ def check_ingestion_status():
         "ScrapeCreators News": "raw.scrapecreators_news_buckets",
         "ScrapeCreators Trump": "raw.scrapecreators_trump_posts",
     }
-    
-    logger.info("\n📥 Raw Layer:")
-    for source, table_id in raw_tables.items():
-        try:
-            query = f"""
-            SELECT 
-                COUNT(*) as row_count,
-                MIN(date) as min_date,
-                MAX(date) as max_date
-            FROM `{PROJECT_ID}.{table_id}`
-            """
-            result = client.query(query).to_dataframe()
-            
-            if not result.empty and result['row_count'].iloc[0] > 0:
-                count = result['row_count'].iloc[0]
-                max_date = result['max_date'].iloc[0]
-                days_old = (datetime.now().date() - max_date).days if max_date else None
-                
-                status = "✅" if days_old is None or days_old <= 2 else "⚠️"
-                logger.info(f"  {status} {source}: {count:,} rows, latest: {max_date} ({days_old} days ago)")
-            else:
-                logger.info(f"  ⚠️  {source}: No data")
-        except Exception as e:
-            logger.warning(f"  ❌ {source}: Error - {str(e)[:50]}")
-    
-    # Check staging tables
-    logger.info("\n🔄 Staging Layer:")
     staging_tables = {
         "Market Daily": "staging.market_daily",
         "FRED Clean": "staging.fred_macro_clean",
         "News Bucketed": "staging.news_bucketed",
     }
-    
+    feature_tables = {
+        "Daily ML Matrix": "features.daily_ml_matrix",
+    }
+
+    all_tables = {**raw_tables, **staging_tables, **feature_tables}
+    statuses = collect_status(client, [tuple(t.split(".")) for t in all_tables.values()], project=PROJECT_ID,
+                              gateway=get_gateway(PROJECT_ID))
+
+    # Latest completion per source straight from the ledger, no data-table scans
+    logger.info("\n🧾 Ingestion Ledger:")
+    try:
+        latest = BigQueryLedger(client, project=PROJECT_ID).latest(LEDGER_SOURCES)
+    except Exception as e:
+        logger.warning(f"  ❌ Ledger unavailable: {str(e)[:50]}")
+        latest = {}
+    for source in LEDGER_SOURCES:
+        rec = latest.get(source)
+        if rec is None:
+            logger.info(f"  ⚠️  {source}: No successful run recorded")
+            continue
+        days_old = (datetime.now(timezone.utc).date() - rec.watermark_date).days if rec.watermark_date else None
+        status = "✅" if days_old is not None and days_old <= 2 else "⚠️"
+        logger.info(
+            f"  {status} {source}: watermark {rec.watermark_date}, {rec.rows_ingested:,} rows "
+            f"in {rec.duration_seconds:.1f}s (completed {rec.completed_at:%Y-%m-%d %H:%M} UTC)"
+        )
+
+    logger.info("\n📥 Raw Layer:")
+    for source, table_id in raw_tables.items():
+        s = statuses[tuple(table_id.split("."))]
+        if s.error:
+            logger.warning(f"  ❌ {source}: Error - {s.error[:50]}")
+        elif s.row_count > 0:
+            days_old = s.days_old
+            status = "✅" if days_old is None or days_old <= 2 else "⚠️"
+            logger.info(f"  {status} {source}: {s.row_count:,} rows, latest: {s.max_date} ({days_old} days ago)")
+        else:
+            logger.info(f"  ⚠️  {source}: No data")
+
+    # Check staging tables
+    logger.info("\n🔄 Staging Layer:")
     for table_name, table_id in staging_tables.items():
-        try:
-            query = f"SELECT COUNT(*) as count FROM `{PROJECT_ID}.{table_id}`"
-            result = client.query(query).to_dataframe()
-            count = result['count'].iloc[0] if not result.empty else 0
-            
-            if count > 0:
-                logger.info(f"  ✅ {table_name}: {count:,} rows")
-            else:
-                logger.info(f"  ⚠️  {table_name}: Empty (run Dataform staging)")
-        except Exception as e:
-            logger.warning(f"  ❌ {table_name}: Error - {str(e)[:50]}")
-    
+        s = statuses[tuple(table_id.split("."))]
+        if s.error:
+            logger.warning(f"  ❌ {table_name}: Error - {s.error[:50]}")
+        elif s.row_count > 0:
+            logger.info(f"  ✅ {table_name}: {s.row_count:,} rows")
+        else:
+            logger.info(f"  ⚠️  {table_name}: Empty (run Dataform staging)")
+
     # Check features
     logger.info("\n🎯 Features Layer:")
-    try:
-        query = f"SELECT COUNT(*) as count FROM `{PROJECT_ID}.features.daily_ml_matrix`"
-        result = client.query(query).to_dataframe()
-        count = result['count'].iloc[0] if not result.empty else 0
-        
-        if count > 0:
-            logger.info(f"  ✅ Daily ML Matrix: {count:,} rows")
+    for table_name, table_id in feature_tables.items():
+        s = statuses[tuple(table_id.split("."))]
+        if s.error:
+            logger.warning(f"  ❌ {table_name}: Error - {s.error[:50]}")
+        elif s.row_count > 0:
+            logger.info(f"  ✅ {table_name}: {s.row_count:,} rows")
         else:
-            logger.info(f"  ⚠️  Daily ML Matrix: Empty (run Dataform features)")
-    except Exception as e:
-        logger.warning(f"  ❌ Daily ML Matrix: Error - {str(e)[:50]}")
-    
+            logger.info(f"  ⚠️  {table_name}: Empty (run Dataform features)")
+
     logger.info("\n" + "=" * 60)
     logger.info("📋 Recommendations:")
     logger.info("  - Check API keys: ./scripts/setup/verify_api_keys.sh")
@@ -2,114 +2,132 @@
 """
 Collect Vegas Events from Glide API
 Daily ingestion at 3 AM UTC
+
+Pages are fetched concurrently over one pooled session (src/ingestion/glide.py)
+and handed to a BulkSink (src/ingestion/sink.py) as they arrive: rows are
+batched into BigQuery load jobs and MERGEd on event_id, so memory does not
+grow with the size of the event catalog and re-collected events are updated
+rather than duplicated.
+
+Usage:
+  python collect_vegas_events.py
+  python collect_vegas_events.py --concurrency 16 --page-size 1000
+  python collect_vegas_events.py --api-url http://localhost:8080 --dry-run   # local stand-in
 """
 
+import argparse
+import asyncio
+import json
+import os
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
-import requests
-from google.cloud import bigquery
-from google.cloud import secretmanager
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.glide import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PAGE_SIZE,
+    GLIDE_API_URL,
+    iter_pages,
+)
+from src.ingestion.sink import BigQueryLoadBackend, BulkSink
+from src.ops.ingestion_ledger import BigQueryLedger, track_run
+from src.utils.bigquery import get_client
+from src.utils.secrets import get_secret
 
 PROJECT_ID = "cbi-v15"
 DATASET_ID = "raw"
 TABLE_ID = "vegas_events"
+SECRET_NAME = "glide-api-key"
+SINK_BATCH_ROWS = 10_000
 
 def get_api_key():
-    """Get Glide API key from Secret Manager"""
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{PROJECT_ID}/secrets/glide-api-key/versions/latest"
-    response = client.access_secret_version(request={"name": name})
-    return response.payload.data.decode("UTF-8")
-
-def collect_vegas_events():
-    """Collect Vegas events from Glide API"""
-    api_key = get_api_key()
-    
-    # Glide API endpoint for events
-    url = "https://api.glide.app/api/v1/events"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    print(f"Collecting Vegas events from Glide API...")
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data or "data" not in data:
-            print("⚠️  No events data returned")
-            return []
-        
-        events = data.get("data", [])
-        print(f"✅ Collected {len(events)} events")
-        
-        return events
-        
-    except Exception as e:
-        print(f"❌ Error collecting events: {e}")
-        raise
+    """Glide API key: GLIDE_API_KEY if set, else Secret Manager (cached in process)"""
+    return os.getenv("GLIDE_API_KEY") or get_secret(SECRET_NAME, project=PROJECT_ID)
 
-def save_to_bigquery(events):
-    """Save events to BigQuery"""
-    if not events:
-        print("⚠️  No events to save")
-        return
-    
-    client = bigquery.Client(project=PROJECT_ID)
-    table_ref = client.dataset(DATASET_ID).table(TABLE_ID)
-    
-    # Prepare data
-    rows = []
-    for event in events:
-        row = {
+def to_rows(events):
+    """Map Glide events to raw.vegas_events rows"""
+    created_at = datetime.now().isoformat()
+    return [
+        {
             "event_id": event.get("id"),
             "event_name": event.get("name"),
             "event_date": event.get("date"),
             "event_type": event.get("type"),
             "venue": event.get("venue"),
             "description": event.get("description"),
-            "created_at": datetime.now().isoformat(),
-            "raw_data": str(event)  # Store full JSON as string
+            "created_at": created_at,
+            "raw_data": json.dumps(event, default=str)  # Store full JSON as string
         }
-        rows.append(row)
-    
-    # Insert rows
-    errors = client.insert_rows_json(table_ref, rows)
-    if errors:
-        print(f"❌ Errors inserting rows: {errors}")
-        raise Exception(f"BigQuery insert errors: {errors}")
-    
-    print(f"✅ Saved {len(rows)} events to BigQuery")
+        for event in events
+    ]
+
+def bigquery_sink():
+    """Buffered load-job sink into raw.vegas_events, deduplicated on event_id"""
+    backend = BigQueryLoadBackend(get_client(PROJECT_ID), f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}")
+    return BulkSink(backend, key_columns=("event_id",), max_rows=SINK_BATCH_ROWS)
+
+async def collect_vegas_events(sink=None, api_url=GLIDE_API_URL, page_size=DEFAULT_PAGE_SIZE,
+                               concurrency=DEFAULT_CONCURRENCY):
+    """Fetch every page of events into `sink` (None: fetch only); returns the event count"""
+    api_key = get_api_key()
+    print(f"Collecting Vegas events from {api_url} ({concurrency} pages in flight, {page_size}/page)...")
+
+    events = pages = 0
+    async for page in iter_pages(api_key, base_url=api_url, page_size=page_size, concurrency=concurrency):
+        pages += 1
+        events += len(page.records)
+        if sink is not None:
+            # write() blocks when the sink is behind; run it off the loop so
+            # that backpressure pauses page consumption, not the event loop
+            await asyncio.to_thread(sink.write, to_rows(page.records))
+
+    if not events:
+        print("⚠️  No events data returned")
+    else:
+        print(f"✅ Collected {events:,} events in {pages} pages")
+    return events
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collect Vegas events from the Glide API into BigQuery")
+    parser.add_argument("--api-url", default=GLIDE_API_URL, help="API base URL (e.g. a local stand-in)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Pages in flight")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch only; no BigQuery writes or ledger record")
+    return parser.parse_args()
 
 def main():
     """Main function"""
+    args = parse_args()
     print("=" * 60)
     print("Vegas Events Collection")
     print("=" * 60)
     print()
-    
+
+    started = time.perf_counter()
     try:
-        # Collect events
-        events = collect_vegas_events()
-        
-        # Save to BigQuery
-        if events:
-            save_to_bigquery(events)
-        
+        if args.dry_run:
+            asyncio.run(collect_vegas_events(None, args.api_url, args.page_size, args.concurrency))
+        else:
+            ledger = BigQueryLedger(get_client(PROJECT_ID))
+            with track_run(ledger, "vegas_events", f"{DATASET_ID}.{TABLE_ID}") as run:
+                with bigquery_sink() as sink:
+                    asyncio.run(collect_vegas_events(sink, args.api_url, args.page_size, args.concurrency))
+                run.rows = sink.stats.rows_written
+                print(f"✅ Saved {run.rows:,} events to BigQuery in {sink.stats.batches} load jobs "
+                      f"({sink.stats.duplicates} duplicates dropped)")
+                run.watermark = datetime.utcnow().date()
+
         print()
-        print("✅ Vegas events collection complete!")
-        
+        print(f"✅ Vegas events collection complete! ({time.perf_counter() - started:.1f}s)")
+
     except Exception as e:
         print(f"❌ Collection failed: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
     main()
-
@@ -444,7 +444,11 @@ CREATE TABLE IF NOT EXISTS `cbi-v15.ops.ingestion_completion` (
   completed_at TIMESTAMP,
   status STRING,
   rows_ingested INT64,
-  error_message STRING
+  error_message STRING,
+  table_name STRING,
+  watermark_date DATE,
+  bytes_written INT64,
+  duration_seconds FLOAT64
 )
 PARTITION BY DATE(date)
 CLUSTER BY source;
@@ -505,7 +509,9 @@ CREATE TABLE IF NOT EXISTS `cbi-v15.forecasts.zl_predictions_1w` (
   prediction FLOAT64,
   lower_bound FLOAT64,
   upper_bound FLOAT64,
-  confidence FLOAT64
+  confidence FLOAT64,
+  run_id STRING,  -- publishing run of src/forecasts/publish.py, reruns replace their rows
+  published_at TIMESTAMP
 )
 PARTITION BY DATE(date)
 CLUSTER BY model_type;
@@ -517,7 +523,9 @@ CREATE TABLE IF NOT EXISTS `cbi-v15.forecasts.zl_predictions_1m` (
   prediction FLOAT64,
   lower_bound FLOAT64,
   upper_bound FLOAT64,
-  confidence FLOAT64
+  confidence FLOAT64,
+  run_id STRING,  -- publishing run of src/forecasts/publish.py, reruns replace their rows
+  published_at TIMESTAMP
 )
 PARTITION BY DATE(date)
 CLUSTER BY model_type;
@@ -529,7 +537,9 @@ CREATE TABLE IF NOT EXISTS `cbi-v15.forecasts.zl_predictions_3m` (
   prediction FLOAT64,
   lower_bound FLOAT64,
   upper_bound FLOAT64,
-  confidence FLOAT64
+  confidence FLOAT64,
+  run_id STRING,  -- publishing run of src/forecasts/publish.py, reruns replace their rows
+  published_at TIMESTAMP
 )
 PARTITION BY DATE(date)
 CLUSTER BY model_type;
@@ -541,8 +551,27 @@ CREATE TABLE IF NOT EXISTS `cbi-v15.forecasts.zl_predictions_6m` (
   prediction FLOAT64,
   lower_bound FLOAT64,
   upper_bound FLOAT64,
-  confidence FLOAT64
+  confidence FLOAT64,
+  run_id STRING,  -- publishing run of src/forecasts/publish.py, reruns replace their rows
+  published_at TIMESTAMP
 )
 PARTITION BY DATE(date)
 CLUSTER BY model_type;
 
+-- Forecast tables deployed before run_id / published_at existed: CREATE TABLE
+-- IF NOT EXISTS leaves them untouched, and the publish MERGE needs both columns
+ALTER TABLE `cbi-v15.forecasts.zl_predictions_1w`
+  ADD COLUMN IF NOT EXISTS run_id STRING,
+  ADD COLUMN IF NOT EXISTS published_at TIMESTAMP;
+
+ALTER TABLE `cbi-v15.forecasts.zl_predictions_1m`
+  ADD COLUMN IF NOT EXISTS run_id STRING,
+  ADD COLUMN IF NOT EXISTS published_at TIMESTAMP;
+
+ALTER TABLE `cbi-v15.forecasts.zl_predictions_3m`
+  ADD COLUMN IF NOT EXISTS run_id STRING,
+  ADD COLUMN IF NOT EXISTS published_at TIMESTAMP;
+
+ALTER TABLE `cbi-v15.forecasts.zl_predictions_6m`
+  ADD COLUMN IF NOT EXISTS run_id STRING,
+  ADD COLUMN IF NOT EXISTS published_at TIMESTAMP;
@@ -90,13 +90,17 @@ CREATE OR REPLACE TABLE `cbi-v15.ops.ingestion_completion` (
   completed_at TIMESTAMP,
   status STRING,
   rows_ingested INT64,
-  error_message STRING
+  error_message STRING,
+  table_name STRING,
+  watermark_date DATE,
+  bytes_written INT64,
+  duration_seconds FLOAT64
 )
 PARTITION BY DATE(date)
 CLUSTER BY source;
 
 -- Initialize with today's date (no completions yet)
-INSERT INTO `cbi-v15.ops.ingestion_completion` VALUES
+INSERT INTO `cbi-v15.ops.ingestion_completion` (date, source, completed_at, status, rows_ingested, error_message) VALUES
 (CURRENT_DATE(), 'databento_zl', NULL, 'pending', NULL, NULL),
 (CURRENT_DATE(), 'databento_other', NULL, 'pending', NULL, NULL),
 (CURRENT_DATE(), 'fred', NULL, 'pending', NULL, NULL),
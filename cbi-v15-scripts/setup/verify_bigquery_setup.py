@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
 """
 Verify BigQuery Setup - Ensures all datasets and tables are created correctly
+Metadata lookups run concurrently on the shared client, so the full check
+takes about as long as the slowest single call. Table schemas, partitioning
+and clustering are diffed against create_skeleton_tables_complete.sql.
 """
 
+import argparse
+import json
+import sys
+from pathlib import Path
 from google.cloud import bigquery
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.ops.checks import run_checks
+from src.ops.schema_drift import collect_drift, drift_report, load_skeleton_specs
+from src.utils.bigquery import get_client
+from src.utils.query_guard import get_gateway
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -90,112 +105,106 @@ def verify_datasets(client: bigquery.Client) -> bool:
     """Verify all expected datasets exist"""
     logger.info("Verifying datasets...")
     
-    datasets = list(client.list_datasets())
-    dataset_ids = [d.dataset_id for d in datasets]
+    results = run_checks({
+        expected: (lambda d=expected: client.get_dataset(d).location)
+        for expected in EXPECTED_DATASETS
+    })
     
     missing = []
-    for expected in EXPECTED_DATASETS:
-        if expected not in dataset_ids:
+    wrong_location = False
+    for expected, result in results.items():
+        if not result.ok:
             missing.append(expected)
             logger.error(f"❌ Missing dataset: {expected}")
+        elif result.detail.lower() != LOCATION.lower():
+            logger.error(f"❌ Dataset {expected} in wrong location: {result.detail} (expected {LOCATION})")
+            wrong_location = True
         else:
-            # Verify location
-            dataset = client.get_dataset(expected)
-            if dataset.location.lower() != LOCATION.lower():
-                logger.error(f"❌ Dataset {expected} in wrong location: {dataset.location} (expected {LOCATION})")
-                return False
             logger.info(f"✅ Dataset {expected} exists in {LOCATION}")
     
     if missing:
         logger.error(f"❌ Missing {len(missing)} datasets: {missing}")
         return False
+    if wrong_location:
+        return False
     
     logger.info(f"✅ All {len(EXPECTED_DATASETS)} datasets verified")
     return True
 
 
-def verify_tables(client: bigquery.Client) -> bool:
-    """Verify all expected tables exist"""
-    logger.info("Verifying tables...")
+def verify_tables(client: bigquery.Client, report_path: Optional[Path] = None) -> bool:
+    """Diff every expected table against the skeleton DDL and print a JSON drift report"""
+    logger.info("Verifying table schemas against create_skeleton_tables_complete.sql...")
     
-    all_passed = True
-    total_tables = 0
-    
-    for dataset_id, expected_tables in EXPECTED_TABLES.items():
-        logger.info(f"Checking dataset: {dataset_id}")
-        
-        tables = list(client.list_tables(dataset_id))
-        table_ids = [t.table_id for t in tables]
-        
-        for expected_table in expected_tables:
-            total_tables += 1
-            if expected_table not in table_ids:
-                logger.error(f"❌ Missing table: {dataset_id}.{expected_table}")
-                all_passed = False
-            else:
-                # Verify partitioning and clustering
-                table = client.get_table(f"{PROJECT_ID}.{dataset_id}.{expected_table}")
-                
-                # Check partitioning
-                if table.time_partitioning:
-                    partition_field = table.time_partitioning.field
-                    logger.info(f"✅ Table {dataset_id}.{expected_table} partitioned by {partition_field}")
-                else:
-                    logger.warning(f"⚠️  Table {dataset_id}.{expected_table} not partitioned")
-                
-                # Check clustering
-                if table.clustering_fields:
-                    logger.info(f"✅ Table {dataset_id}.{expected_table} clustered by {table.clustering_fields}")
-                
-                logger.info(f"✅ Table {dataset_id}.{expected_table} exists")
-    
-    if all_passed:
-        logger.info(f"✅ All {total_tables} tables verified")
-    else:
-        logger.error(f"❌ Some tables missing")
+    specs = load_skeleton_specs()
+    table_ids = [
+        f"{dataset_id}.{table}"
+        for dataset_id, tables in EXPECTED_TABLES.items()
+        for table in tables
+    ]
+    not_in_ddl = [t for t in table_ids if t not in specs]
+    if not_in_ddl:
+        logger.error(f"❌ Expected tables missing from the skeleton DDL: {not_in_ddl}")
+        return False
     
-    return all_passed
+    expected = {t: specs[t] for t in table_ids}
+    drift = collect_drift(client, expected, project=PROJECT_ID)
+    report = drift_report(expected, drift)
+    
+    for d in drift:
+        icon = "❌" if d.severity == "error" else "⚠️ "
+        where = f".{d.column}" if d.column else ""
+        detail = f" (expected {d.expected}, actual {d.actual})" if d.expected or d.actual else ""
+        log = logger.error if d.severity == "error" else logger.warning
+        log(f"{icon} {d.table}{where}: {d.kind}{detail}")
+    
+    # Machine-readable report on stdout (logging goes to stderr)
+    print(json.dumps(report, indent=2))
+    if report_path:
+        report_path.write_text(json.dumps(report, indent=2))
+        logger.info(f"Drift report written to {report_path}")
+    
+    if report["errors"]:
+        logger.error(f"❌ {report['errors']} schema errors across {report['tables_with_drift']} tables")
+        return False
+    logger.info(f"✅ All {len(table_ids)} tables match the skeleton DDL ({report['warnings']} warnings)")
+    return True
 
 
 def verify_reference_data(client: bigquery.Client) -> bool:
     """Verify reference tables are populated"""
     logger.info("Verifying reference data...")
     
-    # Check regime_calendar
-    query = "SELECT COUNT(*) as count FROM `cbi-v15.reference.regime_calendar`"
-    result = client.query(query).result()
-    count = next(result).count
-    if count == 0:
-        logger.error("❌ regime_calendar is empty")
-        return False
-    logger.info(f"✅ regime_calendar has {count} rows")
-    
-    # Check train_val_test_splits
-    query = "SELECT COUNT(*) as count FROM `cbi-v15.reference.train_val_test_splits`"
-    result = client.query(query).result()
-    count = next(result).count
-    if count == 0:
-        logger.error("❌ train_val_test_splits is empty")
-        return False
-    logger.info(f"✅ train_val_test_splits has {count} rows")
-    
-    # Check neural_drivers
-    query = "SELECT COUNT(*) as count FROM `cbi-v15.reference.neural_drivers`"
-    result = client.query(query).result()
-    count = next(result).count
-    if count == 0:
-        logger.error("❌ neural_drivers is empty")
-        return False
-    logger.info(f"✅ neural_drivers has {count} rows")
+    reference_tables = ["regime_calendar", "train_val_test_splits", "neural_drivers"]
+    gateway = get_gateway(PROJECT_ID, client)
     
-    return True
+    def count_rows(table: str) -> int:
+        query = f"SELECT COUNT(*) as count FROM `cbi-v15.reference.{table}`"
+        # COUNT(*) reads table metadata only; allow_full_scan keeps partitioned tables countable
+        result = gateway.read_table(query, allow_full_scan=True, label=f"count {table}")
+        return result["count"][0].as_py()
+    
+    results = run_checks({table: (lambda t=table: count_rows(t)) for table in reference_tables})
+    
+    all_passed = True
+    for table, result in results.items():
+        if not result.ok:
+            logger.error(f"❌ {table}: {result.error}")
+            all_passed = False
+        elif result.detail == 0:
+            logger.error(f"❌ {table} is empty")
+            all_passed = False
+        else:
+            logger.info(f"✅ {table} has {result.detail} rows")
+    
+    return all_passed
 
 
-def main():
+def main(report_path: Optional[Path] = None):
     """Main verification function"""
     logger.info(f"🔍 Verifying BigQuery setup for project: {PROJECT_ID} in location: {LOCATION}")
     
-    client = bigquery.Client(project=PROJECT_ID, location=LOCATION)
+    client = get_client(PROJECT_ID, location=LOCATION)
     
     # Verify datasets
     if not verify_datasets(client):
@@ -203,7 +212,7 @@ def main():
         return False
     
     # Verify tables
-    if not verify_tables(client):
+    if not verify_tables(client, report_path):
         logger.error("❌ Table verification failed")
         return False
     
@@ -217,6 +226,8 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Verify BigQuery datasets, table schemas and reference data")
+    parser.add_argument("--report", type=Path, help="Also write the JSON drift report to this file")
+    success = main(parser.parse_args().report)
     exit(0 if success else 1)
 
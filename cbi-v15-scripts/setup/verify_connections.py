@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """
 Verify GCP and BigQuery connections for CBI-V15
+Checks run concurrently on the shared BigQuery client; each returns
+(passed, messages) and the report is printed in check order.
 """
 
 import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 try:
     from google.cloud import bigquery
@@ -16,25 +18,24 @@ except ImportError:
     print("❌ Missing dependencies. Install: pip install google-cloud-bigquery google-cloud-secret-manager")
     sys.exit(1)
 
+from src.ops.checks import run_checks
+from src.utils.bigquery import get_client
+
 PROJECT_ID = "cbi-v15"
 REGION = "us-central1"
 
 def check_gcp_project():
     """Verify GCP project exists and is accessible"""
-    print("🔍 Checking GCP project...")
     try:
-        client = bigquery.Client(project=PROJECT_ID)
+        client = get_client(PROJECT_ID)
         project = client.project
-        print(f"   ✅ Project accessible: {project}")
-        return True
+        return True, [f"   ✅ Project accessible: {project}"]
     except Exception as e:
-        print(f"   ❌ Error accessing project: {e}")
-        return False
+        return False, [f"   ❌ Error accessing project: {e}"]
 
 def check_bigquery_datasets():
     """Verify all required BigQuery datasets exist"""
-    print("🔍 Checking BigQuery datasets...")
-    
+
     required_datasets = [
         "raw",
         "staging", 
@@ -46,39 +47,38 @@ def check_bigquery_datasets():
         "ops"
     ]
     
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_client(PROJECT_ID)
     existing_datasets = {ds.dataset_id for ds in client.list_datasets()}
     
     all_exist = True
+    messages = []
     for dataset in required_datasets:
         if dataset in existing_datasets:
-            print(f"   ✅ Dataset '{dataset}' exists")
+            messages.append(f"   ✅ Dataset '{dataset}' exists")
         else:
-            print(f"   ❌ Dataset '{dataset}' missing")
+            messages.append(f"   ❌ Dataset '{dataset}' missing")
             all_exist = False
     
-    return all_exist
+    return all_exist, messages
 
 def check_secret_manager():
     """Verify Secret Manager is accessible"""
-    print("🔍 Checking Secret Manager...")
     try:
         client = secretmanager.SecretManagerServiceClient()
         parent = f"projects/{PROJECT_ID}"
         
         # Try to list secrets (will fail if no access)
         list(client.list_secrets(request={"parent": parent}))
-        print(f"   ✅ Secret Manager accessible")
-        return True
+        return True, [f"   ✅ Secret Manager accessible"]
     except Exception as e:
-        print(f"   ⚠️  Secret Manager check: {e}")
-        print(f"   ℹ️  This is OK if no secrets exist yet")
-        return True  # Not a blocker
+        return True, [  # Not a blocker
+            f"   ⚠️  Secret Manager check: {e}",
+            f"   ℹ️  This is OK if no secrets exist yet",
+        ]
 
 def check_api_keys():
     """Check if API keys are stored (macOS Keychain)"""
-    print("🔍 Checking API keys in Keychain...")
-    
+
     import subprocess
     
     keys_to_check = [
@@ -88,6 +88,7 @@ def check_api_keys():
     ]
     
     found_keys = []
+    messages = []
     for key in keys_to_check:
         try:
             result = subprocess.run(
@@ -97,14 +98,14 @@ def check_api_keys():
                 timeout=2
             )
             if result.returncode == 0:
-                print(f"   ✅ {key} found in Keychain")
+                messages.append(f"   ✅ {key} found in Keychain")
                 found_keys.append(key)
             else:
-                print(f"   ⚠️  {key} not found in Keychain")
+                messages.append(f"   ⚠️  {key} not found in Keychain")
         except Exception:
-            print(f"   ⚠️  Could not check {key}")
+            messages.append(f"   ⚠️  Could not check {key}")
     
-    return len(found_keys) > 0
+    return len(found_keys) > 0, messages
 
 def main():
     print("=" * 60)
@@ -112,12 +113,19 @@ def main():
     print("=" * 60)
     print()
     
-    results = {
-        "GCP Project": check_gcp_project(),
-        "BigQuery Datasets": check_bigquery_datasets(),
-        "Secret Manager": check_secret_manager(),
-        "API Keys": check_api_keys()
-    }
+    results = run_checks({
+        "GCP Project": check_gcp_project,
+        "BigQuery Datasets": check_bigquery_datasets,
+        "Secret Manager": check_secret_manager,
+        "API Keys": check_api_keys
+    })
+    
+    for check, result in results.items():
+        print(f"🔍 Checking {check}...")
+        for line in result.detail or []:
+            print(line)
+        if result.error:
+            print(f"   ❌ Error: {result.error}")
     
     print()
     print("=" * 60)
@@ -125,10 +133,10 @@ def main():
     print("=" * 60)
     
     all_passed = True
-    for check, passed in results.items():
-        status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"{check}: {status}")
-        if not passed:
+    for check, result in results.items():
+        status = "✅ PASS" if result.ok else "❌ FAIL"
+        print(f"{check}: {status} ({result.seconds:.1f}s)")
+        if not result.ok:
             all_passed = False
     
     print()
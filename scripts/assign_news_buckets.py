@@ -0,0 +1,78 @@
+# Assign news bucket tags to scrapecreators_news_buckets rows
+# Fills theme_primary, is_trump_related and policy_axis with the compiled
+# keyword automaton (src/news/buckets.py), streaming the rows in batches, and
+# prints per-bucket hit counts for monitoring.
+#
+# Usage:
+#   python scripts/assign_news_buckets.py                       # untagged rows
+#   python scripts/assign_news_buckets.py --database local.duckdb --retag
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.motherduck import connect
+from src.news.buckets import BucketClassifier
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+NEWS_TABLE = "scrapecreators_news_buckets"
+BATCH_ROWS = 10_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tag news rows with thematic bucket, Trump flag and policy axis")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--table", default=NEWS_TABLE)
+    parser.add_argument("--retag", action="store_true", help="Re-tag every row, not only untagged ones")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+    classifier = BucketClassifier()
+
+    where = "" if args.retag else "WHERE theme_primary IS NULL"
+    # Read the rows up front: the table is updated batch by batch below
+    rows = con.execute(f"SELECT article_id, headline, content FROM {args.table} {where}").pl().to_dicts()
+    batches = [rows[i:i + args.batch_rows] for i in range(0, len(rows), args.batch_rows)]
+
+    updated = 0
+    for batch, assignments in zip(batches, classifier.classify_stream(batches)):
+        con.register("bucket_tags", pa.Table.from_pylist([
+            {"article_id": row["article_id"], "theme_primary": a.theme_primary,
+             "is_trump_related": a.is_trump_related, "policy_axis": a.policy_axis}
+            for row, a in zip(batch, assignments)
+        ]))
+        try:
+            con.execute(f"""
+                UPDATE {args.table} t
+                SET theme_primary = s.theme_primary,
+                    is_trump_related = s.is_trump_related,
+                    policy_axis = s.policy_axis
+                FROM bucket_tags s
+                WHERE t.article_id = s.article_id
+            """)
+            updated += con.fetchone()[0]
+        finally:
+            con.unregister("bucket_tags")
+
+    print(f"✅ {updated:,} rows tagged → {args.table}")
+    print(classifier.report())
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Benchmark the Arrow and pandas load paths for Databento OHLCV bars
+# Each loader runs in a fresh process so peak RSS is measured independently.
+#
+# Usage:
+#   python scripts/benchmark_arrow_load.py --dbn-file /path/to/ohlcv.dbn.zst [--repeat 3]
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _run(loader: str, paths, queue):
+    import databento as db
+    import duckdb
+
+    from src.ingestion.databento.motherduck import ZL_OHLCV_DDL, MotherDuckSink
+
+    con = duckdb.connect(":memory:")
+    con.execute(ZL_OHLCV_DDL)
+    sink = MotherDuckSink(con, loader=loader)
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    rows = sum(sink.write(db.DBNStore.from_file(p)) for p in paths)
+    elapsed = time.perf_counter() - started
+    queue.put((rows, elapsed, _peak_rss_mb() - baseline))
+
+
+def benchmark(loader: str, paths):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(loader, paths, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Arrow vs pandas Databento load paths")
+    parser.add_argument("--dbn-file", nargs="+", type=Path, required=True)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'loader':<8} {'rows':>10} {'best s':>8} {'rows/s':>12} {'peak RSS +MB':>13}")
+    for loader in ("pandas", "arrow"):
+        runs = [benchmark(loader, args.dbn_file) for _ in range(args.repeat)]
+        rows = runs[0][0]
+        best = min(r[1] for r in runs)
+        rss = max(r[2] for r in runs)
+        print(f"{loader:<8} {rows:>10,} {best:>8.3f} {rows / best:>12,.0f} {rss:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
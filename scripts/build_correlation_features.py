@@ -0,0 +1,75 @@
+# Build pair correlations and cross-asset betas locally from zl_futures_ohlcv
+# Writes pair_correlations_daily, cross_asset_betas_daily and the ZL-BRL /
+# ZL-DXY correlation columns of fx_indicators_daily next to the OHLCV table in
+# MotherDuck (or a local DuckDB file) from one co-moment sweep.
+#
+# Usage:
+#   python scripts/build_correlation_features.py
+#   python scripts/build_correlation_features.py --database local.duckdb --symbols ZL ZS ZM CL HO FCPO 6L DX
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.comoments import (
+    BETA_ASSETS,
+    BETA_BASE,
+    BETA_COLUMNS,
+    BETA_DDL,
+    BETA_TABLE,
+    FX_BASE,
+    FX_COLUMNS,
+    FX_DDL,
+    FX_SYMBOLS,
+    FX_TABLE,
+    PAIR_COLUMNS,
+    PAIR_DDL,
+    PAIR_SYMBOLS,
+    PAIR_TABLE,
+    cross_asset_betas,
+    fx_correlations,
+    pair_correlations,
+    write_frames,
+)
+from src.features.technical import load_ohlcv
+from src.ingestion.databento.motherduck import connect
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute rolling pair correlations and betas from local OHLCV bars")
+    parser.add_argument("--symbols", nargs="+", default=PAIR_SYMBOLS, help="Symbols to pair up")
+    parser.add_argument("--base", default=BETA_BASE, help="Symbol the betas are measured for")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+
+    started = time.perf_counter()
+    bars = load_ohlcv(con, symbols=sorted(set(args.symbols) | {args.base, FX_BASE, *FX_SYMBOLS.values()}))
+    assets = [s for s in args.symbols if s != args.base] or BETA_ASSETS
+
+    pair_rows = write_frames(con, pair_correlations(bars, args.symbols), PAIR_TABLE, PAIR_DDL, PAIR_COLUMNS)
+    beta_rows = write_frames(con, [cross_asset_betas(bars, args.base, assets)], BETA_TABLE, BETA_DDL, BETA_COLUMNS)
+    fx_rows = write_frames(con, [fx_correlations(bars)], FX_TABLE, FX_DDL, FX_COLUMNS)
+
+    print(f"✅ {pair_rows:,} rows → {PAIR_TABLE}, {beta_rows:,} rows → {BETA_TABLE}, {fx_rows:,} rows → {FX_TABLE}")
+    print(f"   {bars['symbol'].n_unique()} symbols in {time.perf_counter() - started:.2f}s")
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
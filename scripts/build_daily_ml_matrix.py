@@ -0,0 +1,86 @@
+# Assemble daily_ml_matrix locally from the raw tables
+# One row per ZL trading date with prices, FRED, COT, USDA, EIA and weather
+# series joined as of the first date each value was public (see MATRIX_SOURCES
+# in src/features/matrix.py for the publication lags and staleness limits).
+# By default only the tail of the matrix is refreshed, far enough back that
+# the forward-looking target_* prices are filled in as new bars arrive.
+#
+# Usage:
+#   python scripts/build_daily_ml_matrix.py
+#   python scripts/build_daily_ml_matrix.py --full --database local.duckdb
+#   python scripts/build_daily_ml_matrix.py --start 2020-01-01 --chunk-days 90
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.matrix import (
+    DEFAULT_CHUNK_DAYS,
+    MATRIX_BASE_COLUMNS,
+    MATRIX_TABLE,
+    TARGET_HORIZONS,
+    TARGET_SYMBOL,
+    MatrixBuilder,
+)
+from src.ingestion.databento.motherduck import connect
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+# Calendar days covering the longest target horizon (126 trading days) plus holidays
+REFRESH_DAYS = int(max(TARGET_HORIZONS.values()) * 7 / 5) + 14
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build daily_ml_matrix with point-in-time as-of joins")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--symbol", default=TARGET_SYMBOL)
+    parser.add_argument("--table", default=MATRIX_TABLE)
+    parser.add_argument("--start", type=date.fromisoformat, help="First date to (re)build (YYYY-MM-DD)")
+    parser.add_argument("--full", action="store_true", help="Drop and rebuild the whole table")
+    parser.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS,
+                        help="Dates joined per statement; lower this to cap memory")
+    return parser.parse_args()
+
+
+def existing_columns(con, table: str):
+    rows = con.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position", [table]
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+
+    started = time.perf_counter()
+    builder = MatrixBuilder(con, symbol=args.symbol, table=args.table)
+    expected = MATRIX_BASE_COLUMNS + builder.feature_columns
+    current = existing_columns(con, args.table)
+
+    rebuild = args.full or current != expected
+    start = args.start
+    if current and current != expected and not args.full:
+        print(f"⚠️  {args.table} columns changed ({len(current)} → {len(expected)}), rebuilding")
+    if not rebuild and start is None:
+        last = con.execute(f"SELECT MAX(date) FROM {args.table} WHERE symbol = ?", [args.symbol]).fetchone()[0]
+        start = last - timedelta(days=REFRESH_DAYS) if last else None
+
+    rows = builder.build(start=None if rebuild else start, chunk_days=args.chunk_days, rebuild=rebuild)
+    print(f"✅ {rows:,} rows × {len(expected)} columns → {args.table} in {time.perf_counter() - started:.2f}s")
+    con.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
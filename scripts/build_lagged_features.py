@@ -0,0 +1,60 @@
+# Build lagged_features_daily locally from zl_futures_ohlcv
+# Lags are offset views over one base price/return array and are only
+# materialized a batch of rows at a time while writing, so memory stays close
+# to the size of the base features however many lags are configured.
+#
+# Usage:
+#   python scripts/build_lagged_features.py
+#   python scripts/build_lagged_features.py --database local.duckdb --symbols ZL ZS ZM
+#   python scripts/build_lagged_features.py --parquet lagged_features_daily.parquet
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.lags import DEFAULT_BATCH_ROWS, LAGGED_TABLE, LaggedFeatures
+from src.features.technical import load_ohlcv
+from src.ingestion.databento.motherduck import connect
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute lagged price/return features from local OHLCV bars")
+    parser.add_argument("--symbols", nargs="+", help="Limit to these symbols (default: all in the table)")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--table", default=LAGGED_TABLE)
+    parser.add_argument("--parquet", type=Path, help="Write a Parquet file instead of the DuckDB table")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows materialized per write")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+
+    started = time.perf_counter()
+    lagged = LaggedFeatures.from_bars(load_ohlcv(con, symbols=args.symbols))
+    if args.parquet:
+        rows = lagged.write_parquet(args.parquet, batch_rows=args.batch_rows)
+        target = args.parquet
+    else:
+        rows = lagged.write_duckdb(con, table=args.table, batch_rows=args.batch_rows)
+        target = args.table
+
+    print(f"✅ {rows:,} rows × {len(lagged.columns)} lag columns → {target}")
+    print(f"   base array {lagged.nbytes / 1e6:.1f} MB, {time.perf_counter() - started:.2f}s")
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Build the 19 technical indicators locally from zl_futures_ohlcv
+# Writes technical_indicators_us_oil_solutions next to the OHLCV table in
+# MotherDuck (or a local DuckDB file), no BigQuery/Dataform run needed.
+# The default incremental mode only folds in bars added or revised since the
+# last run; --mode full recomputes everything in one vectorized pass.
+#
+# Usage:
+#   python scripts/build_technical_features.py
+#   python scripts/build_technical_features.py --mode full --database local.duckdb --symbols ZL HO 6L
+#   python scripts/build_technical_features.py --verify      # compare the table to a full recompute
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import polars as pl
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.incremental import update_technical_indicators
+from src.features.technical import (
+    TECHNICAL_COLUMNS,
+    TECHNICAL_TABLE,
+    compute_technical_indicators,
+    load_ohlcv,
+    write_technical_indicators,
+)
+from src.ingestion.databento.motherduck import connect
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute technical indicators from local OHLCV bars")
+    parser.add_argument("--symbols", nargs="+", help="Limit to these symbols (default: all in the table)")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--mode", choices=["incremental", "full"], default="incremental")
+    parser.add_argument("--table", default=TECHNICAL_TABLE, help="Output table (full mode)")
+    parser.add_argument("--verify", action="store_true",
+                        help="After the build, compare the table to a full recompute")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Relative tolerance for --verify")
+    return parser.parse_args()
+
+
+def verify(con, table: str, symbols, tolerance: float) -> bool:
+    """Compare the stored features with a fresh full recompute"""
+    expected = compute_technical_indicators(load_ohlcv(con, symbols=symbols))
+    where = f"WHERE symbol IN ({', '.join('?' for _ in symbols)})" if symbols else ""
+    stored = con.execute(f"SELECT {', '.join(TECHNICAL_COLUMNS)} FROM {table} {where}", list(symbols or [])).pl()
+    joined = expected.join(stored, on=["date", "symbol"], how="full", suffix="_stored", coalesce=True)
+    ok = True
+    for col in TECHNICAL_COLUMNS[2:]:
+        a, b = pl.col(col), pl.col(f"{col}_stored")
+        bad = joined.filter(
+            (a.is_null() != b.is_null()) | ((a - b).abs() > tolerance * (1 + b.abs()))
+        ).height
+        if bad:
+            print(f"  ❌ {col}: {bad:,} rows differ from a full recompute")
+            ok = False
+    print("✅ Matches a full recompute" if ok else "❌ Verification failed")
+    return ok
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+
+    if args.mode == "incremental":
+        started = time.perf_counter()
+        replayed = update_technical_indicators(con, symbols=args.symbols)
+        total = sum(replayed.values())
+        print(f"✅ Replayed {total:,} bars for {len(replayed)} changed symbols in {time.perf_counter() - started:.2f}s")
+        ok = verify(con, TECHNICAL_TABLE, args.symbols, args.tolerance) if args.verify else True
+        con.close()
+        return 0 if ok else 1
+
+    started = time.perf_counter()
+    bars = load_ohlcv(con, symbols=args.symbols)
+    loaded = time.perf_counter()
+    features = compute_technical_indicators(bars)
+    computed = time.perf_counter()
+    rows = write_technical_indicators(con, features, table=args.table)
+    written = time.perf_counter()
+
+    print(f"✅ {rows:,} rows for {features['symbol'].n_unique()} symbols → {args.table}")
+    print(f"   load {loaded - started:.2f}s, compute {computed - loaded:.2f}s, write {written - computed:.2f}s")
+    ok = verify(con, args.table, args.symbols, args.tolerance) if args.verify else True
+    con.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
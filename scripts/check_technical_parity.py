@@ -0,0 +1,209 @@
+# Parity check for the local technical indicator engine
+# Recomputes every indicator with straightforward per-bar loops (no Polars)
+# and compares against src/features/technical.py column by column. With
+# --against, the engine is also compared to an export of the warehouse table
+# (features.technical_indicators_us_oil_solutions as Parquet or CSV).
+#
+# Usage:
+#   python scripts/check_technical_parity.py                          # synthetic 15y ZL/HO/6L bars
+#   python scripts/check_technical_parity.py --database local.duckdb
+#   python scripts/check_technical_parity.py --database local.duckdb --against bq_technical.parquet
+
+import argparse
+import math
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.features.technical import (
+    BASE_SYMBOL,
+    BRL_SYMBOL,
+    HO_SYMBOL,
+    TECHNICAL_COLUMNS,
+    TRADING_DAYS,
+    compute_technical_indicators,
+    load_ohlcv,
+)
+from src.ingestion.databento.motherduck import connect
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+FEATURE_COLUMNS = TECHNICAL_COLUMNS[2:]
+
+
+def synthetic_bars(years: int = 15, seed: int = 7) -> pl.DataFrame:
+    """Random-walk daily bars for ZL, HO and 6L on business days, with a few gaps"""
+    rng = np.random.default_rng(seed)
+    days = [date(2010, 1, 4) + timedelta(days=i) for i in range(int(years * 365.25))]
+    days = [d for d in days if d.weekday() < 5]
+    frames = []
+    for symbol, start_price in [(BASE_SYMBOL, 45.0), (HO_SYMBOL, 2.5), (BRL_SYMBOL, 0.3)]:
+        keep = rng.random(len(days)) > 0.01  # ~1% missing bars per symbol
+        n = int(keep.sum())
+        close = start_price * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+        open_ = close * np.exp(rng.normal(0, 0.005, n))
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.006, n)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.006, n)))
+        frames.append(pl.DataFrame({
+            "date": [d for d, k in zip(days, keep) if k],
+            "symbol": symbol,
+            "open": open_, "high": high, "low": low, "close": close,
+            "volume": rng.integers(1_000, 100_000, n).astype(float),
+            "open_interest": rng.integers(50_000, 500_000, n).astype(float),
+        }))
+    return pl.concat(frames)
+
+
+def _ema(values, span):
+    alpha, out, ema = 2 / (span + 1), [], None
+    for i, v in enumerate(values):
+        ema = v if ema is None else alpha * v + (1 - alpha) * ema
+        out.append(ema if i + 1 >= span else None)
+    return out
+
+
+def _window(values, i, n):
+    return values[i - n + 1:i + 1] if i + 1 >= n else None
+
+
+def _std(xs):
+    m = sum(xs) / len(xs)
+    return math.sqrt(sum((x - m) ** 2 for x in xs) / (len(xs) - 1))
+
+
+def _corr(xs, ys):
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    return sxy / math.sqrt(sxx * syy) if sxx and syy else None
+
+
+def reference_indicators(bars: pl.DataFrame) -> pl.DataFrame:
+    """Independent per-bar implementation of the same definitions"""
+    rows = []
+    by_symbol = {s: g.sort("date") for s, g in bars.group_by("symbol", maintain_order=True)}
+    by_symbol = {s[0] if isinstance(s, tuple) else s: g for s, g in by_symbol.items()}
+    closes = {s: dict(zip(g["date"], g["close"])) for s, g in by_symbol.items()}
+
+    for symbol, g in by_symbol.items():
+        d, o, h, l, c, v, oi = (g[col].to_list() for col in ["date", "open", "high", "low", "close", "volume", "open_interest"])
+        ema = {span: _ema(c, span) for span in (5, 10, 12, 21, 26)}
+        log_ret = [None] + [math.log(c[i] / c[i - 1]) for i in range(1, len(c))]
+        gk = [0.5 * math.log(h[i] / l[i]) ** 2 - (2 * math.log(2) - 1) * math.log(c[i] / o[i]) ** 2 for i in range(len(c))]
+        pk = [math.log(h[i] / l[i]) ** 2 for i in range(len(c))]
+        typical_v = [(h[i] + l[i] + c[i]) / 3 * v[i] for i in range(len(c))]
+
+        # Cross-asset inputs for the base symbol, aligned on ZL dates
+        ho = [closes.get(HO_SYMBOL, {}).get(x) for x in d]
+        brl = [closes.get(BRL_SYMBOL, {}).get(x) for x in d]
+        brl_dates = sorted(closes.get(BRL_SYMBOL, {}))
+        brl_prev = {x: brl_dates[i - 1] for i, x in enumerate(brl_dates) if i}
+        brl_ret = [
+            math.log(closes[BRL_SYMBOL][x] / closes[BRL_SYMBOL][brl_prev[x]]) if x in brl_prev else None
+            for x in d
+        ] if BRL_SYMBOL in closes else [None] * len(d)
+
+        for i in range(len(c)):
+            row = {"date": d[i], "symbol": symbol}
+            dist = lambda ref: c[i] / ref - 1 if ref is not None else None
+            row["dist_ema_5"], row["dist_ema_10"], row["dist_ema_21"] = (dist(ema[s][i]) for s in (5, 10, 21))
+            w63, w200, w20 = _window(c, i, 63), _window(c, i, 200), _window(c, i, 20)
+            row["dist_sma_63"] = dist(sum(w63) / 63) if w63 else None
+            row["dist_sma_200"] = dist(sum(w200) / 200) if w200 else None
+            if w20:
+                ma, sd = sum(w20) / 20, _std(w20)
+                upper, lower = ma + 2 * sd, ma - 2 * sd
+                row["bb_pct_b"] = (c[i] - lower) / (upper - lower) if upper != lower else None
+                row["bb_bandwidth"] = (upper - lower) / ma
+            else:
+                row["bb_pct_b"] = row["bb_bandwidth"] = None
+            e12, e26 = ema[12][i], ema[26][i]
+            row["ppo_12_26"] = (e12 - e26) / e26 * 100 if e12 is not None and e26 is not None else None
+            wtv, wv = _window(typical_v, i, 21), _window(v, i, 21)
+            row["dist_vwap_21d"] = dist(sum(wtv) / sum(wv)) if wv and sum(wv) else None
+            wgk, wpk = _window(gk, i, 21), _window(pk, i, 21)
+            row["vol_garman_klass_annualized"] = math.sqrt(sum(wgk) / 21) * math.sqrt(TRADING_DAYS) if wgk and sum(wgk) >= 0 else None
+            row["vol_parkinson_annualized"] = math.sqrt(sum(wpk) / 21 / (4 * math.log(2))) * math.sqrt(TRADING_DAYS) if wpk else None
+            wr = _window(log_ret, i, 21)
+            row["vol_21d"] = _std(wr) * math.sqrt(TRADING_DAYS) if wr and None not in wr else None
+            row["amihud_illiquidity"] = abs(c[i] / c[i - 1] - 1) / (v[i] * c[i]) if i and v[i] else None
+            row["oi_volume_ratio"] = oi[i] / v[i] if oi[i] is not None and v[i] else None
+
+            if symbol == BASE_SYMBOL:
+                row["boho_spread"] = c[i] / 100 * 7.5 - ho[i] if ho[i] is not None else None
+                pairs = [(z, b) for z, b in zip(log_ret[:i + 1], brl_ret[:i + 1]) if z is not None and b is not None]
+                has_pair = log_ret[i] is not None and brl_ret[i] is not None
+                row["corr_zl_brl_60d"] = _corr(*zip(*pairs[-60:])) if has_pair and len(pairs) >= 60 else None
+                row["terms_of_trade_zl_brl"] = c[i] / brl[i] if brl[i] else None
+            else:
+                row["boho_spread"] = row["corr_zl_brl_60d"] = row["terms_of_trade_zl_brl"] = None
+
+            doy = d[i].timetuple().tm_yday
+            row["doy_sin"], row["doy_cos"] = math.sin(2 * math.pi * doy / 365), math.cos(2 * math.pi * doy / 365)
+            rows.append(row)
+
+    schema = {"date": pl.Date, "symbol": pl.Utf8, **{c: pl.Float64 for c in FEATURE_COLUMNS}}
+    return pl.DataFrame(rows, schema=schema, orient="row").select(TECHNICAL_COLUMNS)
+
+
+def compare(engine: pl.DataFrame, reference: pl.DataFrame, label: str, rtol: float, atol: float) -> bool:
+    """Per-column max difference and null-pattern mismatches on (date, symbol) matches"""
+    joined = engine.join(reference, on=["date", "symbol"], how="inner", suffix="_ref")
+    print(f"\n{label}: {joined.height:,} matching rows")
+    ok = True
+    for col in FEATURE_COLUMNS:
+        a, b = joined[col], joined[f"{col}_ref"]
+        null_mismatch = int((a.is_null() != b.is_null()).sum())
+        both = a.is_not_null() & b.is_not_null()
+        diff = (a.filter(both) - b.filter(both)).abs()
+        limit = atol + rtol * b.filter(both).abs()
+        bad = int((diff > limit).sum())
+        max_diff = diff.max() if diff.len() else 0.0
+        status = "✅" if not (bad or null_mismatch) else "❌"
+        ok &= status == "✅"
+        print(f"  {status} {col:<30} max |Δ| {max_diff or 0.0:.2e}  out of tolerance {bad}  null mismatches {null_mismatch}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the local technical indicator engine for parity")
+    parser.add_argument("--database", help="DuckDB file with zl_futures_ohlcv (default: synthetic bars)")
+    parser.add_argument("--against", type=Path, help="Warehouse export of the technical indicators table")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--atol", type=float, default=1e-12)
+    args = parser.parse_args()
+
+    if args.database:
+        con = connect(MOTHERDUCK_TOKEN, database=args.database)
+        bars = load_ohlcv(con)
+        con.close()
+    else:
+        bars = synthetic_bars()
+
+    started = time.perf_counter()
+    engine = compute_technical_indicators(bars)
+    print(f"Engine: {engine.height:,} rows, {bars['symbol'].n_unique()} symbols in {time.perf_counter() - started:.3f}s")
+
+    ok = compare(engine, reference_indicators(bars), "Engine vs reference loops", args.rtol, args.atol)
+    if args.against:
+        warehouse = pl.read_parquet(args.against) if args.against.suffix == ".parquet" else pl.read_csv(args.against, try_parse_dates=True)
+        warehouse = warehouse.select(TECHNICAL_COLUMNS).with_columns(pl.col(FEATURE_COLUMNS).cast(pl.Float64))
+        # Warehouse values went through FLOAT64 SQL aggregates; allow a looser tolerance
+        ok &= compare(engine, warehouse, f"Engine vs {args.against.name}", max(args.rtol, 1e-6), max(args.atol, 1e-9))
+
+    print("\n✅ Parity OK" if ok else "\n❌ Parity check failed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# Run one Databento ingestion cycle for a configured symbol set
+# Symbols are fetched concurrently from their watermarks, staged window by
+# window and merged into MotherDuck in one transaction per cycle; symbols
+# without history are backfilled in checkpointed windows. Scheduled every
+# 4 hours for `secondary`.
+#
+# Usage:
+#   python scripts/databento_cycle.py --set secondary
+#   python scripts/databento_cycle.py --symbols ZS ZM --workers 2 --database local.duckdb
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import databento as db
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.backfill import (
+    DEFAULT_WINDOW_DAYS,
+    BackfillCheckpoint,
+    DBNFileSource,
+    HistoricalSource,
+    utc_today,
+)
+from src.ingestion.databento.cache import CachedSource, DatabentoCache
+from src.ingestion.databento.incremental import record_runs, run_started_at
+from src.ingestion.databento.motherduck import MotherDuckSink, connect
+from src.ingestion.databento.multi_symbol import DEFAULT_RETRIES, DEFAULT_WORKERS, run_cycle
+from src.ops.ingestion_ledger import DuckDBLedger, mirror_to_bigquery
+from src.utils.config import load_optimization_config
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+DATABENTO_KEY = os.getenv('DATABENTO_API_KEY')
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+DEFAULT_CHECKPOINT = project_root / ".checkpoints" / "databento_cycle.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent multi-symbol Databento ingestion")
+    parser.add_argument("--set", choices=["primary", "secondary", "all"], default="secondary",
+                        help="Symbol set from databento.symbols in the config")
+    parser.add_argument("--symbols", nargs="+", help="Explicit symbols (overrides --set)")
+    parser.add_argument("--years", type=int, default=15, help="History for symbols with no rows yet")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS,
+                        help="Backfill window for symbols with no rows yet")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT,
+                        help="Resume point of interrupted backfills")
+    parser.add_argument("--dbn-file", nargs="+", type=Path,
+                        help="Read local DBN files instead of the Databento API")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--no-bigquery-ledger", action="store_true",
+                        help="Record runs only in the MotherDuck ledger, not ops.ingestion_completion")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local Databento cache")
+    parser.add_argument("--cache-path", type=Path, help="Override databento.cache_path from the config")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = load_optimization_config()["databento"]
+
+    if args.symbols:
+        symbols = args.symbols
+    elif args.set == "all":
+        symbols = config["symbols"]["primary"] + config["symbols"]["secondary"]
+    else:
+        symbols = config["symbols"][args.set]
+
+    source = DBNFileSource(args.dbn_file) if args.dbn_file else HistoricalSource(db.Historical(DATABENTO_KEY))
+    if config.get("enable_local_cache") and not args.no_cache:
+        source = CachedSource(source, DatabentoCache(
+            args.cache_path or config["cache_path"],
+            max_bytes=int(config["cache_max_gb"] * 1024 ** 3) if config.get("cache_max_gb") else None,
+            max_age_days=config.get("cache_max_age_days"),
+        ))
+
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+    sink = MotherDuckSink(con)
+    # Watermarks are read from the MotherDuck ledger; runs are also recorded to
+    # ops.ingestion_completion so the BigQuery status tools see them
+    ledger = DuckDBLedger(con) if args.no_bigquery_ledger else mirror_to_bigquery(DuckDBLedger(con))
+
+    end_date = utc_today()
+    start_date = end_date - timedelta(days=365 * args.years)
+
+    print(f"Ingestion cycle: {', '.join(symbols)} ({args.workers} workers)")
+    started_at, started = run_started_at(con), time.perf_counter()
+    results = run_cycle(
+        source, sink, con, symbols,
+        full_start=start_date, end=end_date,
+        max_workers=args.workers, retries=args.retries,
+        window_days=args.window_days, checkpoint=BackfillCheckpoint(args.checkpoint),
+        ledger=ledger,
+    )
+    elapsed = time.perf_counter() - started
+    record_runs(ledger, con, symbols, started_at, elapsed,
+                errors={r.symbol: r.error for r in results if r.status != "ok"})
+
+    print()
+    for r in results:
+        status = "✅" if r.status == "ok" else "❌"
+        detail = f"{r.rows:,} rows, {r.start} → {r.end}" if r.status == "ok" else r.error
+        print(f"  {status} {r.symbol}: {detail} ({r.attempts} attempts, {r.seconds:.1f}s)")
+
+    failed = [r.symbol for r in results if r.status != "ok"]
+    print(f"\nCycle finished in {elapsed:.1f}s: {len(results) - len(failed)}/{len(results)} symbols ok")
+    con.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,78 +1,152 @@
 # Export historical ZL futures data from Databento to MotherDuck
 # This script runs on AnoFox (local machine) and pushes to MotherDuck
+#
+# Usage:
+#   python scripts/databento_to_motherduck.py                      # incremental sync from the watermark
+#   python scripts/databento_to_motherduck.py --mode backfill      # 15y backfill, 1y windows
+#   python scripts/databento_to_motherduck.py --window-days 90     # smaller windows, lower peak memory
+#   python scripts/databento_to_motherduck.py --dbn-file zl.dbn --database local.duckdb
 
-import databento as db
-import duckdb
+import argparse
+import logging
 import os
-from datetime import datetime, timedelta
-
-# API Keys
-DATABENTO_KEY = 'db-8uKak7BPpJejVjqxtJ4xnh9sGWYHE'
-MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')  # Set in environment
-
-# Initialize Databento Historical client
-databento_client = db.Historical(DATABENTO_KEY)
-
-# Fetch 15 years of ZL daily OHLCV data
-print("Fetching 15 years of ZL futures data from Databento...")
-end_date = datetime.now().strftime('%Y-%m-%d')
-start_date = (datetime.now() - timedelta(days=365*15)).strftime('%Y-%m-%d')
-
-data = databento_client.timeseries.get_range(
-    dataset='GLBX.MDP3',
-    symbols=['ZL'],
-    schema='ohlcv-1d',  # Daily OHLCV bars
-    start=start_date,
-    end=end_date,
-    stype_in='continuous'  # Continuous contract (auto-rolls)
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import databento as db
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.backfill import (
+    DEFAULT_WINDOW_DAYS,
+    BackfillCheckpoint,
+    BackfillRequest,
+    DBNFileSource,
+    HistoricalSource,
+    run_backfill,
+    utc_today,
+)
+from src.ingestion.databento.cache import CachedSource, DatabentoCache
+from src.ingestion.databento.incremental import (
+    DEFAULT_OVERLAP_DAYS,
+    record_runs,
+    run_incremental,
+    run_started_at,
 )
+from src.ingestion.databento.motherduck import DATABASE, TABLE, MotherDuckSink, connect
+from src.ops.ingestion_ledger import DuckDBLedger, mirror_to_bigquery
+from src.utils.config import load_optimization_config
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+# API Keys (set in environment)
+DATABENTO_KEY = os.getenv('DATABENTO_API_KEY')
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+DEFAULT_CHECKPOINT = project_root / ".checkpoints" / "databento_backfill.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load Databento OHLCV bars into MotherDuck")
+    parser.add_argument("--mode", choices=["incremental", "backfill"], default="incremental",
+                        help="incremental: sync from each symbol's watermark (full backfill if empty)")
+    parser.add_argument("--symbols", nargs="+", default=["ZL"])
+    parser.add_argument("--years", type=int, default=15, help="History length to backfill")
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS,
+                        help="Days fetched and written per window (bounds peak memory)")
+    parser.add_argument("--overlap-days", type=int, default=DEFAULT_OVERLAP_DAYS,
+                        help="Days before the watermark to refetch for revised bars")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--dbn-file", nargs="+", type=Path,
+                        help="Read local DBN files instead of the Databento API")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--no-bigquery-ledger", action="store_true",
+                        help="Record runs only in the MotherDuck ledger, not ops.ingestion_completion")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local Databento cache")
+    parser.add_argument("--cache-path", type=Path, help="Override databento.cache_path from the config")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    end_date = utc_today()
+    start_date = end_date - timedelta(days=365 * args.years)
+    request = BackfillRequest(symbols=tuple(args.symbols), start=start_date, end=end_date)
+
+    if args.dbn_file:
+        source = DBNFileSource(args.dbn_file)
+    else:
+        source = HistoricalSource(db.Historical(DATABENTO_KEY))
+
+    cache = None
+    config = load_optimization_config()["databento"]
+    if config.get("enable_local_cache") and not args.no_cache:
+        cache = DatabentoCache(
+            args.cache_path or config["cache_path"],
+            max_bytes=int(config["cache_max_gb"] * 1024 ** 3) if config.get("cache_max_gb") else None,
+            max_age_days=config.get("cache_max_age_days"),
+        )
+        source = CachedSource(source, cache)
+
+    print("Connecting to MotherDuck..." if not args.database else f"Connecting to {args.database}...")
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+    sink = MotherDuckSink(con)
+    # Watermarks are read from the MotherDuck ledger; runs are also recorded to
+    # ops.ingestion_completion so the BigQuery status tools see them
+    ledger = DuckDBLedger(con) if args.no_bigquery_ledger else mirror_to_bigquery(DuckDBLedger(con))
+
+    checkpoint = BackfillCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.clear(request.key)
+
+    started_at, started = run_started_at(con), time.perf_counter()
+    try:
+        if args.mode == "incremental":
+            print(f"Syncing {', '.join(args.symbols)} up to {end_date}...")
+            rows = run_incremental(
+                source, sink, con, args.symbols,
+                full_start=start_date, end=end_date,
+                overlap_days=args.overlap_days,
+                window_days=args.window_days,
+                checkpoint=checkpoint,
+                ledger=ledger,
+            )
+        else:
+            print(f"Backfilling {', '.join(args.symbols)} from {start_date} to {end_date} "
+                  f"in {args.window_days}-day windows...")
+            rows = run_backfill(source, sink, request, window_days=args.window_days, checkpoint=checkpoint)
+    except Exception as e:
+        record_runs(ledger, con, args.symbols, started_at, time.perf_counter() - started,
+                    errors={symbol: str(e) for symbol in args.symbols})
+        raise
+    record_runs(ledger, con, args.symbols, started_at, time.perf_counter() - started)
+
+    print("✅ Data successfully loaded to MotherDuck!")
+    print(f"   Database: {args.database or DATABASE}")
+    print(f"   Table: {TABLE}")
+    print(f"   Rows: {rows}")
+
+    # Verify
+    result = sink.summary()
+    print(f"\nVerification:")
+    print(f"  Total rows: {result[0]}")
+    print(f"  Date range: {result[1]} to {result[2]}")
+
+    if cache:
+        stats = cache.stats
+        print(f"\nCache ({cache.root}):")
+        print(f"  Hits: {stats.hits}  Partial: {stats.partial_hits}  Misses: {stats.misses}")
+        print(f"  API calls: {stats.api_calls}  Fetched: {stats.bytes_fetched:,} B  Saved: {stats.bytes_saved:,} B")
+        print(f"  Size: {cache.total_bytes():,} B  Evictions: {stats.evictions}")
+
+    con.close()
+
 
-# Convert to DataFrame
-df = data.to_df()
-print(f"Fetched {len(df)} rows")
-
-# Connect to MotherDuck
-print("Connecting to MotherDuck...")
-con = duckdb.connect(f'md:?motherduck_token={MOTHERDUCK_TOKEN}')
-
-# Create database and schema if not exists
-con.execute("CREATE DATABASE IF NOT EXISTS usoil_intelligence")
-con.execute("USE usoil_intelligence")
-
-# Create table
-con.execute("""
-    CREATE TABLE IF NOT EXISTS zl_futures_ohlcv (
-        date DATE NOT NULL,
-        symbol VARCHAR NOT NULL,
-        open DECIMAL(10, 2),
-        high DECIMAL(10, 2),
-        low DECIMAL(10, 2),
-        close DECIMAL(10, 2) NOT NULL,
-        volume BIGINT,
-        open_interest BIGINT,
-        source VARCHAR DEFAULT 'databento',
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (date, symbol)
-    )
-""")
-
-# Insert data
-print("Pushing data to MotherDuck...")
-con.execute("""
-    INSERT OR REPLACE INTO zl_futures_ohlcv (date, symbol, open, high, low, close, volume)
-    SELECT * FROM df
-""")
-
-print("✅ Data successfully loaded to MotherDuck!")
-print(f"   Database: usoil_intelligence")
-print(f"   Table: zl_futures_ohlcv")
-print(f"   Rows: {len(df)}")
-
-# Verify
-result = con.execute("SELECT COUNT(*), MIN(date), MAX(date) FROM zl_futures_ohlcv").fetchone()
-print(f"\nVerification:")
-print(f"  Total rows: {result[0]}")
-print(f"  Date range: {result[1]} to {result[2]}")
-
-# Close connection
-con.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Cluster near-duplicate news rows ahead of sentiment scoring
+# Syndicated articles and reposted Trump posts are grouped with the MinHash/LSH
+# index in src/news/dedup.py; memberships land in news_dedup_members so
+# scoring and aggregation can keep one canonical row per story
+# (scripts/score_news_sentiment.py --canonical-only).
+#
+# Usage:
+#   python scripts/dedup_news.py                                  # rows not yet clustered
+#   python scripts/dedup_news.py --database local.duckdb --threshold 0.7
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.motherduck import connect
+from src.news.dedup import DEFAULT_RETENTION_DAYS, DEFAULT_THRESHOLD, MEMBERS_TABLE, NearDuplicateIndex
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+NEWS_TABLE = "scrapecreators_news_buckets"
+BATCH_ROWS = 5_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate news rows (MinHash/LSH)")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--table", default=NEWS_TABLE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity needed to join a cluster")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Only clusters seen this recently are matched against")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+    index = NearDuplicateIndex(con, threshold=args.threshold, retention_days=args.retention_days)
+
+    # Oldest first, so the earliest copy of a story becomes its canonical row
+    rows = con.execute(f"""
+        SELECT t.article_id, t.headline, t.content, COALESCE(t.created_at, CAST(t.date AS TIMESTAMP)) AS seen_at
+        FROM {args.table} t
+        ANTI JOIN {MEMBERS_TABLE} m ON m.doc_id = t.article_id
+        ORDER BY seen_at NULLS LAST, t.article_id
+    """).pl().to_dicts()
+    batches = [rows[i:i + args.batch_rows] for i in range(0, len(rows), args.batch_rows)]
+
+    started = time.perf_counter()
+    for _ in index.stream(batches, time_field="seen_at"):
+        pass
+    elapsed = time.perf_counter() - started
+
+    stats = index.stats
+    print(f"✅ {stats.docs:,} rows clustered → {MEMBERS_TABLE}")
+    print(f"   {stats.duplicates:,} duplicates ({stats.duplicate_rate:.1%}), {stats.new_clusters:,} new clusters, "
+          f"{len(index):,} clusters in window")
+    print(f"   {stats.empty:,} without text, {stats.repeated:,} repeated article ids skipped")
+    if stats.docs:
+        print(f"   {stats.docs / elapsed:,.0f} docs/s, {stats.candidates / stats.docs:.2f} candidates/doc")
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
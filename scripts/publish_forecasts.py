@@ -0,0 +1,68 @@
+# Publish a model sweep's predictions to the zl_predictions_<horizon> tables
+# The input is one Parquet file (or directory of files) with model_type,
+# horizon, date, prediction and optional lower_bound / upper_bound /
+# confidence columns, e.g. everything one AnoFox sweep produced. The whole
+# sweep is published as one batch under --run-id; publishing the same run
+# again replaces its rows instead of adding duplicates.
+#
+# Usage:
+#   python scripts/publish_forecasts.py sweep.parquet --run-id 20251201-anofox          # MotherDuck
+#   python scripts/publish_forecasts.py sweep/ --run-id 20251201-anofox --database local.duckdb
+#   python scripts/publish_forecasts.py sweep.parquet --run-id 20251201-anofox --bigquery
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.forecasts.publish import BigQueryForecastBackend, DuckDBForecastBackend, ForecastBatch
+from src.ingestion.databento.motherduck import connect
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Publish forecast predictions for every model and horizon in one batch")
+    parser.add_argument("input", type=Path, help="Parquet file or directory of predictions")
+    parser.add_argument("--run-id", required=True, help="Idempotency key: reruns with the same id replace its rows")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--bigquery", action="store_true", help="Publish to cbi-v15.forecasts instead")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    predictions = pq.read_table(args.input)
+
+    batch = ForecastBatch(args.run_id)
+    for key in predictions.group_by(["model_type", "horizon"]).aggregate([]).to_pylist():
+        mask = pc.and_(pc.equal(predictions["model_type"], key["model_type"]),
+                       pc.equal(predictions["horizon"], key["horizon"]))
+        batch.add(key["model_type"], key["horizon"], predictions.filter(mask))
+
+    if args.bigquery:
+        from src.utils.bigquery import get_client
+        backend = BigQueryForecastBackend(get_client())
+        con = None
+    else:
+        con = connect(MOTHERDUCK_TOKEN, database=args.database)
+        backend = DuckDBForecastBackend(con)
+
+    stats = batch.publish(backend)
+    print(f"✅ {stats.summary()}")
+    if con is not None:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
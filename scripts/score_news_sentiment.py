@@ -0,0 +1,115 @@
+# Score news bucket rows for ZL sentiment
+# Fills zl_sentiment / sentiment_confidence / sentiment_raw_score on
+# scrapecreators_news_buckets rows in MotherDuck (or a local DuckDB file).
+# Scores are memoized by content hash in a local DuckDB cache, so reposted or
+# re-ingested articles are never run through the model twice.
+#
+# Usage:
+#   python scripts/score_news_sentiment.py                          # unscored rows, FinBERT
+#   python scripts/score_news_sentiment.py --database local.duckdb --model lexicon
+#   python scripts/score_news_sentiment.py --rescore --batch-size 64 --workers 4
+#   python scripts/score_news_sentiment.py --canonical-only        # after scripts/dedup_news.py
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.motherduck import connect
+from src.news.dedup import DEDUP_DDL, MEMBERS_TABLE
+from src.news.scoring import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_WORKERS,
+    FinBERTModel,
+    LexiconModel,
+    ScoreCache,
+    SentimentScorer,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+NEWS_TABLE = "scrapecreators_news_buckets"
+DEFAULT_CACHE = project_root / ".cache" / "sentiment_scores.duckdb"
+CHUNK_ROWS = 5_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score news bucket rows for ZL sentiment")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--table", default=NEWS_TABLE)
+    parser.add_argument("--model", choices=["finbert", "lexicon"], default="finbert")
+    parser.add_argument("--rescore", action="store_true", help="Score every row, not only unscored ones")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="Score cache (DuckDB file)")
+    parser.add_argument("--canonical-only", action="store_true",
+                        help=f"Skip rows marked as near-duplicates in {MEMBERS_TABLE}")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    con = connect(MOTHERDUCK_TOKEN, database=args.database)
+
+    if args.model == "finbert":
+        # Split the cores between workers so torch threads don't oversubscribe
+        model = FinBERTModel(threads=max(1, (os.cpu_count() or 1) // args.workers))
+    else:
+        model = LexiconModel()
+    args.cache.parent.mkdir(parents=True, exist_ok=True)
+    cache = ScoreCache(args.cache)
+    scorer = SentimentScorer(model, cache, batch_size=args.batch_size, workers=args.workers)
+
+    filters = [] if args.rescore else ["t.zl_sentiment IS NULL"]
+    join = ""
+    if args.canonical_only:
+        # Before the first dedup run the table is empty and every row counts as canonical
+        for ddl in DEDUP_DDL:
+            con.execute(ddl)
+        join = f"LEFT JOIN {MEMBERS_TABLE} m ON m.doc_id = t.article_id"
+        filters.append("m.is_duplicate IS NOT TRUE")
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    # Read the rows up front: the table is updated chunk by chunk below
+    items = con.execute(
+        f"SELECT t.article_id, t.headline, t.content, t.theme_primary FROM {args.table} t {join} {where}"
+    ).pl().to_dicts()
+    updated = 0
+    for start in range(0, len(items), CHUNK_ROWS):
+        chunk = items[start:start + CHUNK_ROWS]
+        scores = scorer.score_buckets(chunk)
+        con.register("sentiment_scores", pa.Table.from_pylist(
+            [{"article_id": item["article_id"], "theme_primary": item["theme_primary"], **score}
+             for item, score in zip(chunk, scores)]
+        ))
+        try:
+            con.execute(f"""
+                UPDATE {args.table} t
+                SET zl_sentiment = s.zl_sentiment,
+                    sentiment_confidence = s.sentiment_confidence,
+                    sentiment_raw_score = s.sentiment_raw_score
+                FROM sentiment_scores s
+                WHERE t.article_id = s.article_id
+                  AND t.theme_primary IS NOT DISTINCT FROM s.theme_primary
+            """)
+            updated += con.fetchone()[0]
+        finally:
+            con.unregister("sentiment_scores")
+
+    print(f"✅ {updated:,} rows scored with {model.name} → {args.table}")
+    print(f"   {scorer.stats.summary()}")
+    print(f"   cache: {len(cache):,} entries in memory ({args.cache})")
+    cache.close()
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Serve the dashboard API from in-memory snapshots
+# Price history, latest features and ensemble forecasts are loaded from
+# MotherDuck (or a local DuckDB file) into columnar snapshots and refreshed
+# every dashboard.cache_ttl_minutes; requests never touch the warehouse.
+#
+# Usage:
+#   python scripts/serve_dashboard_api.py                            # MotherDuck, port 8080
+#   python scripts/serve_dashboard_api.py --database local.duckdb --port 9000
+#   curl 'localhost:8080/v1/prices?symbol=ZL&start=2024-01-01&limit=500'
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ingestion.databento.motherduck import connect
+from src.serving.api import create_app
+from src.serving.store import ServingStore
+from src.utils.config import load_optimization_config
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+MOTHERDUCK_TOKEN = os.getenv('MOTHERDUCK_TOKEN')
+
+
+def parse_args():
+    config = load_optimization_config()["dashboard"]
+    parser = argparse.ArgumentParser(description="Serve dashboard views from in-memory snapshots")
+    parser.add_argument("--database", help="Local DuckDB file instead of MotherDuck")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--refresh-minutes", type=float, default=config["cache_ttl_minutes"])
+    parser.add_argument("--page-limit", type=int, default=config["pagination_limit"])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = ServingStore(
+        lambda: connect(MOTHERDUCK_TOKEN, database=args.database),
+        refresh_seconds=args.refresh_minutes * 60,
+    )
+    print("📦 Loading snapshots...")
+    store.start()
+    app = create_app(store, page_limit=args.page_limit)
+
+    async def stop_refresh(app):
+        store.stop()
+
+    app.on_cleanup.append(stop_refresh)
+    print(f"✅ Serving on http://{args.host}:{args.port} (refresh every {args.refresh_minutes:g} min)")
+    web.run_app(app, host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Rolling co-moment engine for correlations and betas
+(features.pair_correlations_daily, features.cross_asset_betas_daily and the
+corr_zl_* / corr_regime_zl_* columns of features.fx_indicators_daily; the
+momentum, volatility and terms-of-trade columns of that table are not
+computed here)
+
+Running sums of x, y, x², y² and xy are kept as prefix sums per asset pair,
+so every window length is a difference of two rows: the whole
+pair × window × date panel comes out of one vectorized NumPy sweep in
+O(dates × pairs × windows), with no per-window recomputation. Pairs are
+processed in chunks so memory stays bounded however many assets are added.
+
+Windows follow the technical indicator convention: the last `w` dates on
+which both returns exist, with values only on dates where the pair trades.
+"""
+import logging
+from itertools import combinations
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import duckdb
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+PAIR_SYMBOLS = ["ZL", "ZS", "ZM", "CL", "HO", "FCPO", "6L", "DX"]
+BETA_BASE = "ZL"
+BETA_ASSETS = ["ZS", "ZM", "CL", "HO", "FCPO", "6L", "DX"]
+WINDOWS = (30, 60, 90, 252)
+DEFAULT_CHUNK_PAIRS = 32  # ~3 MB per T×P array for 15y of dailies
+
+# |corr| at or above these bounds is "high" / "medium", below is "low"
+CORR_REGIME_HIGH = 0.6
+CORR_REGIME_MEDIUM = 0.3
+
+# fx_indicators_daily: ZL against BRL (6L) and the dollar index (DX). Both
+# currencies' columns sit on one row per date under a single currency_pair key.
+FX_BASE = "ZL"
+FX_SYMBOLS = {"brl": "6L", "dxy": "DX"}
+FX_WINDOWS = (30, 60, 90)
+FX_REGIME_WINDOW = 60
+FX_CURRENCY_PAIR = "BRL_DXY"
+
+PAIR_TABLE = "pair_correlations_daily"
+BETA_TABLE = "cross_asset_betas_daily"
+FX_TABLE = "fx_indicators_daily"
+
+PAIR_COLUMNS = ["date", "symbol_pair", "symbol1", "symbol2",
+                *[f"corr_{w}d" for w in WINDOWS], "corr_regime_60d"]
+BETA_COLUMNS = ["date", "asset", *[f"beta_{w}d" for w in WINDOWS]]
+FX_COLUMNS = ["date", "currency_pair",
+              *[f"corr_zl_{fx}_{w}d" for fx in FX_SYMBOLS for w in FX_WINDOWS],
+              *[f"corr_regime_zl_{fx}" for fx in FX_SYMBOLS]]
+
+PAIR_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {PAIR_TABLE} (
+        date DATE NOT NULL,
+        symbol_pair VARCHAR NOT NULL,
+        symbol1 VARCHAR,
+        symbol2 VARCHAR,
+        {', '.join(f'corr_{w}d DOUBLE' for w in WINDOWS)},
+        corr_regime_60d VARCHAR,
+        PRIMARY KEY (date, symbol_pair)
+    )
+"""
+
+BETA_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {BETA_TABLE} (
+        date DATE NOT NULL,
+        asset VARCHAR NOT NULL,
+        {', '.join(f'beta_{w}d DOUBLE' for w in WINDOWS)},
+        PRIMARY KEY (date, asset)
+    )
+"""
+
+
+# Full fx_indicators_daily layout, so the correlation upserts leave the other
+# columns to whichever builder owns them
+FX_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {FX_TABLE} (
+        date DATE NOT NULL,
+        currency_pair VARCHAR NOT NULL,
+        brl_momentum_21d DOUBLE,
+        brl_momentum_63d DOUBLE,
+        brl_momentum_252d DOUBLE,
+        dxy_momentum_21d DOUBLE,
+        dxy_momentum_63d DOUBLE,
+        dxy_momentum_252d DOUBLE,
+        brl_volatility_21d DOUBLE,
+        brl_volatility_63d DOUBLE,
+        {', '.join(f'{c} DOUBLE' for c in FX_COLUMNS[2:-len(FX_SYMBOLS)])},
+        terms_of_trade_zl_brl DOUBLE,
+        {', '.join(f'{c} VARCHAR' for c in FX_COLUMNS[-len(FX_SYMBOLS):])},
+        PRIMARY KEY (date, currency_pair)
+    )
+"""
+
+
+def returns_panel(bars: pl.DataFrame, symbols: Sequence[str]) -> Tuple[pl.Series, np.ndarray, List[str]]:
+    """Log returns as a dates × symbols matrix (NaN where a symbol has no bar)
+
+    Each symbol's return is taken on its own calendar before alignment, so a
+    missing day never produces a multi-day return attributed to one date.
+    """
+    rets = (
+        bars.lazy()
+        .filter(pl.col("symbol").is_in(list(symbols)))
+        .sort("symbol", "date")
+        .select("date", "symbol", (pl.col("close") / pl.col("close").shift(1)).log().over("symbol").alias("ret"))
+        .collect()
+    )
+    present = [s for s in symbols if s in set(rets["symbol"].unique().to_list())]
+    wide = rets.pivot(on="symbol", index="date", values="ret").sort("date")
+    matrix = wide.select([pl.col(s).cast(pl.Float64) for s in present]).to_numpy()
+    return wide["date"], matrix, present
+
+
+def rolling_pair_moments(
+    returns: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+    windows: Sequence[int] = WINDOWS,
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """Rolling correlation and beta (cov / var(left)) per window for column pairs
+
+    Returns {window: {"corr": T×P, "beta": T×P}} with NaN where the window has
+    fewer than `window` paired observations or the pair is absent that date.
+    """
+    x, y = returns[:, left], returns[:, right]
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n_rows, n_pairs = mask.shape
+
+    # Demean per pair (correlation and beta are shift-invariant) so the prefix
+    # sums stay small and the differences below lose no precision
+    with np.errstate(invalid="ignore"):
+        valid = np.maximum(mask.sum(axis=0), 1)
+        x = np.where(mask, x - np.where(mask, x, 0).sum(axis=0) / valid, 0.0)
+        y = np.where(mask, y - np.where(mask, y, 0).sum(axis=0) / valid, 0.0)
+
+    def prefix(values):
+        out = np.zeros((n_rows + 1, n_pairs))
+        np.cumsum(values, axis=0, out=out[1:])
+        return out
+
+    sums = {"x": prefix(x), "y": prefix(y), "xx": prefix(x * x), "yy": prefix(y * y), "xy": prefix(x * y)}
+    count = np.cumsum(mask, axis=0)
+
+    # position[k, p] = prefix row just after pair p's k-th paired observation
+    position = np.zeros((n_rows + 1, n_pairs), dtype=np.int64)
+    rows, cols = np.nonzero(mask)
+    position[count[rows, cols], cols] = rows + 1
+
+    # Gathers go through flat indices into the row-major prefix arrays, which
+    # is several times faster than take_along_axis along axis 0
+    column = np.arange(n_pairs)
+    flat_sums = {k: v.ravel() for k, v in sums.items()}
+    flat_position = position.ravel()
+
+    out = {}
+    for w in windows:
+        ok = mask & (count >= w)
+        start = flat_position[np.where(ok, count - w, 0) * n_pairs + column] * n_pairs + column
+        s = {k: sums[k][1:] - flat[start] for k, flat in flat_sums.items()}
+        cov = s["xy"] - s["x"] * s["y"] / w
+        var_x = s["xx"] - s["x"] ** 2 / w
+        var_y = s["yy"] - s["y"] ** 2 / w
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.where(ok & (var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), np.nan)
+            beta = np.where(ok & (var_x > 0), cov / var_x, np.nan)
+        out[w] = {"corr": np.clip(corr, -1.0, 1.0), "beta": beta, "present": mask}
+    return out
+
+
+def _chunks(pairs: List[Tuple[int, int]], size: int) -> Iterator[List[Tuple[int, int]]]:
+    for i in range(0, len(pairs), size):
+        yield pairs[i:i + size]
+
+
+def _corr_regime(col: str) -> pl.Expr:
+    magnitude = pl.col(col).abs()
+    return (
+        pl.when(magnitude >= CORR_REGIME_HIGH).then(pl.lit("high"))
+        .when(magnitude >= CORR_REGIME_MEDIUM).then(pl.lit("medium"))
+        .when(magnitude.is_not_null()).then(pl.lit("low"))
+        .otherwise(None)
+    )
+
+
+def _long_frame(dates, moments, key: str, names: Dict[str, list], windows, prefix: str) -> pl.DataFrame:
+    """Flatten T×P moment arrays into one row per (date, pair) where the pair trades"""
+    present = next(iter(moments.values()))["present"]
+    rows, cols = np.nonzero(present)
+    data = {"date": dates.gather(rows), **{k: pl.Series(k, v).gather(cols) for k, v in names.items()}}
+    for w in windows:
+        data[f"{prefix}_{w}d"] = moments[w][key][rows, cols]
+    return pl.DataFrame(data).with_columns(pl.col(pl.Float64).fill_nan(None))
+
+
+def pair_correlations(
+    bars: pl.DataFrame,
+    symbols: Sequence[str] = PAIR_SYMBOLS,
+    windows: Sequence[int] = WINDOWS,
+    chunk_pairs: int = DEFAULT_CHUNK_PAIRS,
+) -> Iterator[pl.DataFrame]:
+    """pair_correlations_daily rows, one frame per chunk of symbol pairs"""
+    dates, returns, present = returns_panel(bars, symbols)
+    for chunk in _chunks(list(combinations(range(len(present)), 2)), chunk_pairs):
+        left, right = np.array([p[0] for p in chunk]), np.array([p[1] for p in chunk])
+        moments = rolling_pair_moments(returns, left, right, windows)
+        names = {
+            "symbol_pair": [f"{present[i]}_{present[j]}" for i, j in chunk],
+            "symbol1": [present[i] for i, _ in chunk],
+            "symbol2": [present[j] for _, j in chunk],
+        }
+        frame = _long_frame(dates, moments, "corr", names, windows, "corr")
+        if 60 in windows:
+            frame = frame.with_columns(_corr_regime("corr_60d").alias("corr_regime_60d"))
+        yield frame
+
+
+def cross_asset_betas(
+    bars: pl.DataFrame,
+    base: str = BETA_BASE,
+    assets: Sequence[str] = BETA_ASSETS,
+    windows: Sequence[int] = WINDOWS,
+) -> pl.DataFrame:
+    """cross_asset_betas_daily rows: COV(base, asset) / VAR(asset) per window"""
+    dates, returns, present = returns_panel(bars, [base, *assets])
+    if base not in present:
+        return pl.DataFrame(schema={"date": pl.Date, "asset": pl.Utf8, **{c: pl.Float64 for c in BETA_COLUMNS[2:]}})
+    others = [i for i, s in enumerate(present) if s != base]
+    left = np.array(others)
+    right = np.full(len(others), present.index(base))
+    moments = rolling_pair_moments(returns, left, right, windows)
+    return _long_frame(dates, moments, "beta", {"asset": [present[i] for i in others]}, windows, "beta")
+
+
+def fx_correlations(
+    bars: pl.DataFrame,
+    base: str = FX_BASE,
+    fx_symbols: Dict[str, str] = FX_SYMBOLS,
+    windows: Sequence[int] = FX_WINDOWS,
+) -> pl.DataFrame:
+    """fx_indicators_daily correlation columns, one row per date with a base return"""
+    dates, returns, present = returns_panel(bars, [base, *fx_symbols.values()])
+    columns = [f"corr_zl_{fx}_{w}d" for fx in fx_symbols for w in windows]
+    if base not in present:
+        return pl.DataFrame(schema={"date": pl.Date, "currency_pair": pl.Utf8, **{c: pl.Float64 for c in columns}})
+    base_col = present.index(base)
+    traded = [fx for fx, symbol in fx_symbols.items() if symbol in present]
+    rows = np.nonzero(~np.isnan(returns[:, base_col]))[0]
+    data = {"date": dates.gather(rows)}
+    moments = {}
+    if traded:
+        right = np.array([present.index(fx_symbols[fx]) for fx in traded])
+        moments = rolling_pair_moments(returns, np.full(len(traded), base_col), right, windows)
+    for fx in fx_symbols:
+        for w in windows:
+            values = moments[w]["corr"][rows, traded.index(fx)] if fx in traded else np.full(len(rows), np.nan)
+            data[f"corr_zl_{fx}_{w}d"] = values
+    frame = pl.DataFrame(data).with_columns(pl.col(pl.Float64).fill_nan(None))
+    if FX_REGIME_WINDOW in windows:
+        frame = frame.with_columns(
+            _corr_regime(f"corr_zl_{fx}_{FX_REGIME_WINDOW}d").alias(f"corr_regime_zl_{fx}") for fx in fx_symbols
+        )
+    return frame.with_columns(pl.lit(FX_CURRENCY_PAIR).alias("currency_pair"))
+
+
+def write_frames(con: duckdb.DuckDBPyConnection, frames, table: str, ddl: str, columns: Sequence[str]) -> int:
+    """Upsert each frame into `table` as it is produced"""
+    con.execute(ddl)
+    total = 0
+    for frame in frames:
+        if frame.is_empty():
+            continue
+        con.register("comoment_rows", frame.select(columns).to_arrow())
+        try:
+            con.execute(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM comoment_rows")
+            total += con.fetchone()[0]
+        finally:
+            con.unregister("comoment_rows")
+    return total
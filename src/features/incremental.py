@@ -0,0 +1,357 @@
+"""
+Incremental technical indicator updates
+Keeps running state per symbol so a new daily bar is folded in without
+recomputing history: EMA values are journaled for the last JOURNAL_BARS bars
+of each symbol, rolling windows are ring buffers refilled from the bars just
+before the update point, and each new bar costs O(window).
+
+Changed bars are found through zl_futures_ohlcv.updated_at (set on every
+upsert), so late-arriving or revised bars are detected the same way as new
+ones; bars deleted upstream are found as feature rows with no bar left.
+Each symbol is rebuilt from its earliest changed date only, or from its
+first bar when that date is older than the journal. Results
+follow the same definitions as src/features/technical.py; check with
+`scripts/build_technical_features.py --verify`.
+"""
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import polars as pl
+
+from src.features.technical import (
+    BASE_SYMBOL,
+    BB_STDDEVS,
+    BB_WINDOW,
+    BRL_SYMBOL,
+    HO_SYMBOL,
+    OHLCV_TABLE,
+    TECHNICAL_COLUMNS,
+    TECHNICAL_DDL,
+    TECHNICAL_TABLE,
+    TRADING_DAYS,
+    VOL_WINDOW,
+    VWAP_WINDOW,
+    cross_asset_indicators,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = "technical_indicator_state"
+SYNC_TABLE = "technical_indicator_sync"
+
+EMA_SPANS = (5, 10, 12, 21, 26)
+SMA_WINDOWS = (63, 200)
+LOOKBACK_BARS = max(SMA_WINDOWS) + 1  # bars needed to refill every ring buffer
+JOURNAL_BARS = LOOKBACK_BARS          # EMA snapshots kept per symbol
+
+# The cross-asset correlation needs 60 paired returns before the first
+# recomputed date; this many calendar days covers them with margin
+CROSS_LOOKBACK_DAYS = 180
+CROSS_COLUMNS = ["boho_spread", "corr_zl_brl_60d", "terms_of_trade_zl_brl"]
+
+STATE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+        symbol VARCHAR NOT NULL,
+        date DATE NOT NULL,
+        bar_count BIGINT,
+        {', '.join(f'ema_{s} DOUBLE' for s in EMA_SPANS)},
+        PRIMARY KEY (symbol, date)
+    )
+"""
+
+SYNC_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {SYNC_TABLE} (
+        symbol VARCHAR PRIMARY KEY,
+        synced_at TIMESTAMP,
+        last_date DATE
+    )
+"""
+
+BAR_COLUMNS = "date, CAST(open AS DOUBLE), CAST(high AS DOUBLE), CAST(low AS DOUBLE), " \
+              "CAST(close AS DOUBLE), CAST(volume AS DOUBLE), CAST(open_interest AS DOUBLE)"
+
+
+@dataclass
+class Bar:
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: Optional[float]
+    open_interest: Optional[float]
+
+
+def _div(num, den):
+    return num / den if num is not None and den else None
+
+
+@dataclass
+class IndicatorState:
+    """Running state for one symbol; update() appends a bar and returns its features"""
+    bar_count: int = 0
+    emas: Dict[int, Optional[float]] = field(default_factory=lambda: {s: None for s in EMA_SPANS})
+    prev_close: Optional[float] = None
+    closes: deque = field(default_factory=lambda: deque(maxlen=max(SMA_WINDOWS)))
+    log_returns: deque = field(default_factory=lambda: deque(maxlen=VOL_WINDOW))
+    typical_volume: deque = field(default_factory=lambda: deque(maxlen=VWAP_WINDOW))
+    volumes: deque = field(default_factory=lambda: deque(maxlen=VWAP_WINDOW))
+    garman_klass: deque = field(default_factory=lambda: deque(maxlen=VOL_WINDOW))
+    parkinson: deque = field(default_factory=lambda: deque(maxlen=VOL_WINDOW))
+
+    def _push(self, bar: Bar):
+        if self.prev_close is not None:
+            self.log_returns.append(math.log(bar.close / self.prev_close))
+        self.closes.append(bar.close)
+        self.typical_volume.append((bar.high + bar.low + bar.close) / 3 * bar.volume if bar.volume is not None else None)
+        self.volumes.append(bar.volume)
+        log_hl, log_co = math.log(bar.high / bar.low), math.log(bar.close / bar.open)
+        self.garman_klass.append(0.5 * log_hl ** 2 - (2 * math.log(2) - 1) * log_co ** 2)
+        self.parkinson.append(log_hl ** 2)
+        self.prev_close = bar.close
+
+    def seed(self, bars: Sequence[Bar]):
+        """Refill the ring buffers from the bars preceding the update point (EMAs untouched)"""
+        for bar in bars:
+            self._push(bar)
+
+    def update(self, bar: Bar) -> dict:
+        prev_close = self.prev_close
+        self._push(bar)
+        self.bar_count += 1
+        for span, ema in self.emas.items():
+            alpha = 2 / (span + 1)
+            self.emas[span] = bar.close if ema is None else alpha * bar.close + (1 - alpha) * ema
+
+        def ema(span):
+            return self.emas[span] if self.bar_count >= span else None
+
+        def window(buffer, n):
+            return list(buffer)[-n:] if len(buffer) >= n else None
+
+        def dist(ref):
+            return bar.close / ref - 1 if ref else None
+
+        row = {
+            "dist_ema_5": dist(ema(5)),
+            "dist_ema_10": dist(ema(10)),
+            "dist_ema_21": dist(ema(21)),
+        }
+        for n in SMA_WINDOWS:
+            w = window(self.closes, n)
+            row[f"dist_sma_{n}"] = dist(sum(w) / n) if w else None
+
+        w = window(self.closes, BB_WINDOW)
+        if w:
+            ma = sum(w) / BB_WINDOW
+            sd = math.sqrt(sum((x - ma) ** 2 for x in w) / (BB_WINDOW - 1))
+            upper, lower = ma + BB_STDDEVS * sd, ma - BB_STDDEVS * sd
+            row["bb_pct_b"] = _div(bar.close - lower, upper - lower)
+            row["bb_bandwidth"] = _div(upper - lower, ma)
+        else:
+            row["bb_pct_b"] = row["bb_bandwidth"] = None
+
+        e12, e26 = ema(12), ema(26)
+        row["ppo_12_26"] = (e12 - e26) / e26 * 100 if e12 is not None and e26 else None
+
+        tv, vol = window(self.typical_volume, VWAP_WINDOW), window(self.volumes, VWAP_WINDOW)
+        vwap = _div(sum(tv), sum(vol)) if tv and None not in tv and None not in vol else None
+        row["dist_vwap_21d"] = dist(vwap)
+
+        gk, pk = window(self.garman_klass, VOL_WINDOW), window(self.parkinson, VOL_WINDOW)
+        gk_mean = sum(gk) / VOL_WINDOW if gk else None
+        row["vol_garman_klass_annualized"] = (
+            math.sqrt(gk_mean) * math.sqrt(TRADING_DAYS) if gk_mean is not None and gk_mean >= 0 else None
+        )
+        row["vol_parkinson_annualized"] = (
+            math.sqrt(sum(pk) / VOL_WINDOW / (4 * math.log(2))) * math.sqrt(TRADING_DAYS) if pk else None
+        )
+        r = window(self.log_returns, VOL_WINDOW)
+        if r:
+            mean = sum(r) / VOL_WINDOW
+            row["vol_21d"] = math.sqrt(sum((x - mean) ** 2 for x in r) / (VOL_WINDOW - 1)) * math.sqrt(TRADING_DAYS)
+        else:
+            row["vol_21d"] = None
+
+        simple_ret = bar.close / prev_close - 1 if prev_close is not None else None
+        row["amihud_illiquidity"] = (
+            _div(abs(simple_ret), bar.volume * bar.close) if simple_ret is not None and bar.volume is not None else None
+        )
+        row["oi_volume_ratio"] = _div(bar.open_interest, bar.volume)
+
+        doy = bar.date.timetuple().tm_yday
+        row["doy_sin"] = math.sin(2 * math.pi * doy / 365)
+        row["doy_cos"] = math.cos(2 * math.pi * doy / 365)
+        return row
+
+
+def ensure_tables(con: duckdb.DuckDBPyConnection):
+    con.execute(TECHNICAL_DDL)
+    con.execute(STATE_DDL)
+    con.execute(SYNC_DDL)
+
+
+def _bars(con, symbol: str, where: str, params: list, order: str = "date", limit: str = "") -> List[Bar]:
+    rows = con.execute(
+        f"SELECT {BAR_COLUMNS} FROM {OHLCV_TABLE} WHERE symbol = ? AND {where} ORDER BY {order} {limit}",
+        [symbol, *params],
+    ).fetchall()
+    return [Bar(*r) for r in rows]
+
+
+def changed_since_sync(con: duckdb.DuckDBPyConnection, symbols: Optional[Sequence[str]] = None) -> Dict[str, tuple]:
+    """Per symbol with new, revised or deleted bars: (earliest changed date, latest updated_at)"""
+    in_symbols = f"IN ({', '.join('?' for _ in symbols)})" if symbols else ""
+    upserted_where = f"AND o.symbol {in_symbols}" if symbols else ""
+    deleted_where = f"WHERE t.symbol {in_symbols}" if symbols else ""
+    rows = con.execute(
+        f"""
+        WITH upserted AS (
+            SELECT o.symbol, MIN(o.date) AS start, MAX(o.updated_at) AS synced_at
+            FROM {OHLCV_TABLE} o LEFT JOIN {SYNC_TABLE} s ON o.symbol = s.symbol
+            WHERE (s.synced_at IS NULL OR o.updated_at > s.synced_at) {upserted_where}
+            GROUP BY o.symbol
+        ), deleted AS (
+            SELECT t.symbol, MIN(t.date) AS start
+            FROM {TECHNICAL_TABLE} t ANTI JOIN {OHLCV_TABLE} o ON t.symbol = o.symbol AND t.date = o.date
+            {deleted_where}
+            GROUP BY t.symbol
+        )
+        SELECT symbol, LEAST(u.start, d.start), COALESCE(u.synced_at, s.synced_at)
+        FROM upserted u FULL JOIN deleted d USING (symbol) LEFT JOIN {SYNC_TABLE} s USING (symbol)
+        """,
+        list(symbols or []) * 2,
+    ).fetchall()
+    return {symbol: (start, synced_at) for symbol, start, synced_at in rows}
+
+
+def rebuild_symbol(con: duckdb.DuckDBPyConnection, symbol: str, start: date) -> Tuple[date, int]:
+    """Restore state as of the bar before `start` and replay every bar from `start` on
+
+    Returns the date the replay actually started from (the full history when
+    no journal exists before `start`) and the number of bars replayed.
+    """
+    snapshot = con.execute(
+        f"SELECT bar_count, {', '.join(f'ema_{s}' for s in EMA_SPANS)} FROM {STATE_TABLE} "
+        f"WHERE symbol = ? AND date < ? ORDER BY date DESC LIMIT 1",
+        [symbol, start],
+    ).fetchone()
+    state = IndicatorState()
+    if snapshot:
+        state.bar_count = snapshot[0]
+        state.emas = dict(zip(EMA_SPANS, snapshot[1:]))
+        state.seed(_bars(con, symbol, "date < ?", [start], order="date DESC", limit=f"LIMIT {LOOKBACK_BARS}")[::-1])
+    else:
+        # No journal before `start`: replay the symbol's whole history
+        start = date.min
+
+    bars = _bars(con, symbol, "date >= ?", [start])
+    features, journal = [], []
+    for bar in bars:
+        row = state.update(bar)
+        features.append({"date": bar.date, "symbol": symbol, **row})
+        journal.append({"symbol": symbol, "date": bar.date, "bar_count": state.bar_count,
+                        **{f"ema_{s}": state.emas[s] for s in EMA_SPANS}})
+
+    con.execute(f"DELETE FROM {STATE_TABLE} WHERE symbol = ? AND date >= ?", [symbol, start])
+    con.execute(f"DELETE FROM {TECHNICAL_TABLE} WHERE symbol = ? AND date >= ?", [symbol, start])
+    if not bars:
+        return start, 0
+    # Only the tail can be a restore point; older snapshots would just accumulate
+    journal = journal[-JOURNAL_BARS:]
+
+    schema = {"date": pl.Date, "symbol": pl.Utf8, **{c: pl.Float64 for c in TECHNICAL_COLUMNS[2:]}}
+    feature_frame = pl.DataFrame(features, schema=schema).select(TECHNICAL_COLUMNS)
+    con.register("incremental_features", feature_frame.to_arrow())
+    con.register("incremental_state", pl.DataFrame(journal).to_arrow())
+    try:
+        con.execute(f"INSERT INTO {TECHNICAL_TABLE} SELECT {', '.join(TECHNICAL_COLUMNS)} FROM incremental_features")
+        con.execute(
+            f"INSERT INTO {STATE_TABLE} SELECT symbol, date, bar_count, "
+            f"{', '.join(f'ema_{s}' for s in EMA_SPANS)} FROM incremental_state"
+        )
+    finally:
+        con.unregister("incremental_features")
+        con.unregister("incremental_state")
+    con.execute(f"""
+        DELETE FROM {STATE_TABLE} WHERE symbol = $symbol AND date < (
+            SELECT date FROM {STATE_TABLE} WHERE symbol = $symbol ORDER BY date DESC LIMIT 1 OFFSET {JOURNAL_BARS - 1}
+        )
+    """, {"symbol": symbol})
+    return start, len(bars)
+
+
+def refresh_cross_asset(
+    con: duckdb.DuckDBPyConnection,
+    start: date,
+    base_symbol: str = BASE_SYMBOL,
+    ho_symbol: str = HO_SYMBOL,
+    brl_symbol: str = BRL_SYMBOL,
+) -> int:
+    """Recompute the ZL cross-asset columns for every ZL date from `start` on"""
+    lookback = start - timedelta(days=CROSS_LOOKBACK_DAYS) if start > date.min + timedelta(days=CROSS_LOOKBACK_DAYS) else date.min
+    bars = con.execute(
+        f"SELECT date, symbol, CAST(close AS DOUBLE) AS close FROM {OHLCV_TABLE} "
+        f"WHERE symbol IN (?, ?, ?) AND date >= ?",
+        [base_symbol, ho_symbol, brl_symbol, lookback],
+    ).pl()
+    cross = (
+        cross_asset_indicators(bars.lazy(), base_symbol, ho_symbol, brl_symbol)
+        .filter(pl.col("date") >= start)
+        .with_columns(pl.col(CROSS_COLUMNS).fill_nan(None))
+        .collect()
+    )
+    if cross.is_empty():
+        return 0
+    con.register("cross_features", cross.to_arrow())
+    try:
+        con.execute(f"""
+            UPDATE {TECHNICAL_TABLE} t
+            SET {', '.join(f'{c} = c.{c}' for c in CROSS_COLUMNS)}
+            FROM cross_features c
+            WHERE t.symbol = c.symbol AND t.date = c.date
+        """)
+    finally:
+        con.unregister("cross_features")
+    return cross.height
+
+
+def update_technical_indicators(
+    con: duckdb.DuckDBPyConnection,
+    symbols: Optional[Sequence[str]] = None,
+    base_symbol: str = BASE_SYMBOL,
+    ho_symbol: str = HO_SYMBOL,
+    brl_symbol: str = BRL_SYMBOL,
+) -> Dict[str, int]:
+    """Fold every new or revised OHLCV bar into the technical indicators; returns bars replayed per symbol"""
+    ensure_tables(con)
+    changed = changed_since_sync(con, symbols)
+    replayed = {}
+
+    con.begin()
+    try:
+        rebuilt_from = {}
+        for symbol, (start, _) in sorted(changed.items()):
+            rebuilt_from[symbol], replayed[symbol] = rebuild_symbol(con, symbol, start)
+            logger.info(f"  {symbol}: replayed {replayed[symbol]:,} bars from {rebuilt_from[symbol]}")
+
+        # A changed ZL, HO or BRL bar moves the ZL cross-asset columns from that date on
+        cross_starts = [rebuilt_from[s] for s in (base_symbol, ho_symbol, brl_symbol) if s in rebuilt_from]
+        if cross_starts:
+            refresh_cross_asset(con, min(cross_starts), base_symbol, ho_symbol, brl_symbol)
+
+        for symbol, (_, synced_at) in changed.items():
+            con.execute(
+                f"INSERT OR REPLACE INTO {SYNC_TABLE} SELECT ?, ?, MAX(date) FROM {OHLCV_TABLE} WHERE symbol = ?",
+                [symbol, synced_at, symbol],
+            )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    return replayed
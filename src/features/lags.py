@@ -0,0 +1,174 @@
+"""
+Zero-copy lag features (features.lagged_features_daily)
+Every lagged column is the same base series shifted by k bars within a
+symbol, so the base features are held once as a contiguous
+(features × rows) array and each lag is an offset view into it. Nothing is
+copied per lag: columns are only materialized one batch of rows at a time
+when written to DuckDB / Parquet, or on demand when a model asks for one, so
+peak memory stays close to the size of the base features.
+
+Lags count bars, not calendar days (LAG(x, k) OVER (PARTITION BY symbol
+ORDER BY date)); returns are log returns, as in the technical indicators.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+import duckdb
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+LAGGED_TABLE = "lagged_features_daily"
+LAGS = (1, 2, 3, 5, 10, 21)
+BASE_FEATURES = ("price", "return")
+DEFAULT_BATCH_ROWS = 65_536
+
+LAGGED_COLUMNS = ["date", "symbol", *[f"lag_{k}d_{b}" for b in BASE_FEATURES for k in LAGS]]
+
+LAGGED_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {LAGGED_TABLE} (
+        date DATE NOT NULL,
+        symbol VARCHAR NOT NULL,
+        {', '.join(f'{c} DOUBLE' for c in LAGGED_COLUMNS[2:])},
+        PRIMARY KEY (date, symbol)
+    )
+"""
+
+_LAG_COLUMN = re.compile(r"^lag_(\d+)d_(.+)$")
+
+
+def base_features(bars: pl.DataFrame) -> pl.DataFrame:
+    """price (close) and return (log return) per bar, sorted by symbol and date"""
+    return (
+        bars.lazy()
+        .sort("symbol", "date")
+        .select(
+            "date", "symbol",
+            pl.col("close").cast(pl.Float64).alias("price"),
+            (pl.col("close") / pl.col("close").shift(1)).log().over("symbol").cast(pl.Float64).alias("return"),
+        )
+        .collect()
+    )
+
+
+class LaggedFeatures:
+    """Lagged columns as offset views over one contiguous base array
+
+    `base` rows must be sorted by symbol then date. Column `lag_{k}d_{name}`
+    at row r is base[name][r - k] when row r - k is the same symbol, else NULL.
+    """
+
+    def __init__(self, base: pl.DataFrame, features: Sequence[str] = BASE_FEATURES, lags: Sequence[int] = LAGS):
+        self.dates = base["date"]
+        self.symbols = base["symbol"]
+        self.features = list(features)
+        self.lags = tuple(lags)
+        # One row per base feature, each contiguous, so every lag is a plain slice
+        self.values = np.ascontiguousarray(
+            np.vstack([base[f].cast(pl.Float64).fill_null(np.nan).to_numpy() for f in self.features])
+            if self.features else np.empty((0, base.height))
+        )
+        # Bars since the symbol's first row: lag k is valid where position >= k
+        symbol_codes = self.symbols.rle_id().to_numpy()
+        starts = np.flatnonzero(np.r_[True, symbol_codes[1:] != symbol_codes[:-1]]) if base.height else np.array([], dtype=np.int64)
+        lengths = np.diff(np.r_[starts, base.height])
+        self.position = (np.arange(base.height) - np.repeat(starts, lengths)).astype(np.int32)
+
+    @classmethod
+    def from_bars(cls, bars: pl.DataFrame, lags: Sequence[int] = LAGS) -> "LaggedFeatures":
+        return cls(base_features(bars), BASE_FEATURES, lags)
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def columns(self) -> List[str]:
+        return [f"lag_{k}d_{f}" for f in self.features for k in self.lags]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the base array and row index (lags add nothing)"""
+        return self.values.nbytes + self.position.nbytes
+
+    def _parse(self, column: str) -> Tuple[int, int]:
+        match = _LAG_COLUMN.match(column)
+        if not match or match.group(2) not in self.features:
+            raise KeyError(column)
+        return self.features.index(match.group(2)), int(match.group(1))
+
+    def view(self, column: str) -> Tuple[np.ndarray, int]:
+        """(read-only view of the source values, first row it aligns to), no copy
+
+        view[i] is the candidate value for row offset + i; rows whose source
+        crosses into the previous symbol still need masking (see column()).
+        """
+        feature, k = self._parse(column)
+        source = self.values[feature, :max(len(self) - k, 0)]
+        source.flags.writeable = False
+        return source, k
+
+    def column(self, column: str, start: int = 0, stop: int = None) -> np.ndarray:
+        """Materialize one lagged column for rows [start, stop)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        feature, k = self._parse(column)
+        out = np.full(max(stop - start, 0), np.nan)
+        rows = np.arange(max(start, k), stop)
+        rows = rows[self.position[rows] >= k]
+        out[rows - start] = self.values[feature, rows - k]
+        return out
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.column(column)
+
+    def batches(self, batch_rows: int = DEFAULT_BATCH_ROWS, columns: Sequence[str] = None) -> Iterator[pa.RecordBatch]:
+        """Arrow record batches of date, symbol and the lagged columns (NaN → NULL)"""
+        columns = list(columns or self.columns)
+        for start in range(0, len(self), batch_rows):
+            stop = min(start + batch_rows, len(self))
+            data: Dict[str, pa.Array] = {
+                "date": self.dates.slice(start, stop - start).to_arrow(),
+                "symbol": self.symbols.slice(start, stop - start).cast(pl.Utf8).to_arrow(),
+            }
+            for c in columns:
+                data[c] = pa.array(self.column(c, start, stop), type=pa.float64(), from_pandas=True)
+            yield pa.RecordBatch.from_pydict(data)
+
+    def to_frame(self, columns: Sequence[str] = None) -> pl.DataFrame:
+        """Fully materialized frame, for callers that really want every column"""
+        return pl.from_arrow(pa.Table.from_batches(list(self.batches(max(len(self), 1), columns))))
+
+    def write_parquet(self, path: Union[str, Path], batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+        """Stream batches to a Parquet file, one row group per batch"""
+        writer, rows = None, 0
+        try:
+            for batch in self.batches(batch_rows):
+                if writer is None:
+                    writer = pq.ParquetWriter(str(path), batch.schema)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write_duckdb(
+        self, con: duckdb.DuckDBPyConnection, table: str = LAGGED_TABLE, batch_rows: int = DEFAULT_BATCH_ROWS
+    ) -> int:
+        """Upsert batches into the local lagged features table"""
+        con.execute(LAGGED_DDL.replace(LAGGED_TABLE, table, 1))
+        names = ["date", "symbol", *self.columns]
+        total = 0
+        for batch in self.batches(batch_rows):
+            con.register("lagged_rows", batch)
+            try:
+                con.execute(f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) SELECT {', '.join(names)} FROM lagged_rows")
+                total += con.fetchone()[0]
+            finally:
+                con.unregister("lagged_rows")
+        logger.info(f"  {total:,} rows → {table}")
+        return total
@@ -0,0 +1,240 @@
+"""
+Local daily_ml_matrix builder (features.daily_ml_matrix)
+One row per trading date of the target symbol, with every source joined
+backward as of that date. Each source row is stamped with the first date it
+could have been known (its publication lag), so a value released after the
+close never leaks into that day's row, and values older than the source's
+staleness limit are left NULL instead of being carried forward forever.
+
+Sources are pivoted (one column per series / metric) and ASOF-joined inside
+DuckDB one date range at a time, so memory is bounded by the chunk and no
+warehouse scan is needed.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+MATRIX_TABLE = "daily_ml_matrix"
+OHLCV_TABLE = "zl_futures_ohlcv"
+TARGET_SYMBOL = "ZL"
+DEFAULT_CHUNK_DAYS = 366
+
+# Forecast horizons in trading days, matching the target_* columns
+TARGET_HORIZONS = {"1w": 5, "1m": 21, "3m": 63, "6m": 126}
+MATRIX_BASE_COLUMNS = ["date", "symbol", *[f"target_{h}_price" for h in TARGET_HORIZONS]]
+
+
+@dataclass(frozen=True)
+class MatrixSource:
+    """How one raw table is pivoted and when its rows become known"""
+    name: str                        # column prefix
+    table: str
+    date_column: str
+    key_columns: Tuple[str, ...]     # pivoted into one column per distinct key
+    value_columns: Tuple[str, ...]
+    lag_days: int                    # days from the row's date until it is usable
+    max_staleness_days: int          # older values are NULL rather than carried forward
+    aggregate: str = "AVG"           # for several rows per (date, key), e.g. weather stations
+    key_lag_days: Tuple[Tuple[str, int], ...] = ()   # lag_days overrides per first key value
+
+    @property
+    def max_lag_days(self) -> int:
+        return max([self.lag_days, *(lag for _, lag in self.key_lag_days)])
+
+    def lag_sql(self) -> str:
+        """Lag of a row in days, per key where overridden"""
+        if not self.key_lag_days:
+            return str(self.lag_days)
+        whens = " ".join(f"WHEN {_quote(key.upper())} THEN {lag}" for key, lag in self.key_lag_days)
+        return f"CASE UPPER({self.key_columns[0]}) {whens} ELSE {self.lag_days} END"
+
+
+# FRED dates monthly observations at the start of the reference month, so
+# they are released weeks after that date, not the next day
+FRED_RELEASE_LAGS = (
+    # Employment Situation: first Friday of the following month
+    ("UNRATE", 38),
+    # CPI: around mid-month after the reference month
+    ("CPIAUCSL", 46),
+    ("CPI", 46),
+    # Monthly effective fed funds average: first business days of the next month
+    ("FEDFUNDS", 35),
+)
+
+
+# Publication lags are conservative: a row is only used from the first
+# trading date on which it was public before the ZL close.
+MATRIX_SOURCES = [
+    # Settlement prices are known at that day's close
+    MatrixSource("px", OHLCV_TABLE, "date", ("symbol",), ("close",), lag_days=0, max_staleness_days=7),
+    # Daily FRED observations post the next business day; monthly series wait for their release
+    MatrixSource("fred", "fred_economic", "date", ("series_id",), ("value",), lag_days=1, max_staleness_days=45,
+                 key_lag_days=FRED_RELEASE_LAGS),
+    # COT positions are as of Tuesday, released Friday 3:30pm ET, after the close
+    MatrixSource("cot", "cftc_cot", "date", ("symbol", "category"), ("net_positions",), lag_days=6, max_staleness_days=14),
+    # USDA reports are stamped with their release date and land at noon ET; used from the next day
+    MatrixSource("usda", "usda_reports", "report_date", ("report_type", "commodity", "metric"), ("value",),
+                 lag_days=1, max_staleness_days=45),
+    # EIA weekly data for the week ending Friday is released the following Wednesday
+    MatrixSource("eia", "eia_biofuels", "date", ("series_id",), ("value",), lag_days=5, max_staleness_days=21),
+    # NOAA daily observations are available the next morning
+    MatrixSource("wx", "weather_noaa", "date", ("region", "metric"), ("value",), lag_days=1, max_staleness_days=7),
+]
+
+
+def _column_name(*parts) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", "_".join(str(p) for p in parts).lower()).strip("_")
+
+
+def _quote(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _table_exists(con: duckdb.DuckDBPyConnection, table: str) -> bool:
+    return con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [table]
+    ).fetchone()[0] > 0
+
+
+def source_keys(con: duckdb.DuckDBPyConnection, source: MatrixSource) -> List[tuple]:
+    """Distinct pivot keys, read once so every chunk has the same columns"""
+    keys = ", ".join(source.key_columns)
+    return con.execute(f"SELECT DISTINCT {keys} FROM {source.table} ORDER BY {keys}").fetchall()
+
+
+def _pivot_sql(source: MatrixSource, keys: List[tuple], columns: Dict[tuple, str]) -> str:
+    """Wide rows keyed by the date each value became usable, restricted to the chunk
+
+    Series publish on different days, so each column is carried forward on its
+    own together with the date it was last seen (`<column>__as_of`); the
+    staleness limit is then applied per column after the ASOF join.
+    """
+    selects, fills = [], []
+    for key in keys:
+        match = " AND ".join(f"{k} = {_quote(v)}" for k, v in zip(source.key_columns, key))
+        for value in source.value_columns:
+            column = columns[key + (value,)]
+            selects.append(f"{source.aggregate}({value}) FILTER (WHERE {match}) AS {column}")
+            fills.append(f"LAST_VALUE({column} IGNORE NULLS) OVER w AS {column}")
+            fills.append(
+                f"LAST_VALUE(CASE WHEN {column} IS NOT NULL THEN available_date END IGNORE NULLS) OVER w AS {column}__as_of"
+            )
+    return f"""
+        SELECT available_date, {', '.join(fills)}
+        FROM (
+            SELECT CAST({source.date_column} + to_days(CAST({source.lag_sql()} AS INTEGER)) AS DATE) AS available_date,
+                   {', '.join(selects)}
+            FROM {source.table}
+            WHERE {source.date_column} >= CAST($lookback AS DATE) - INTERVAL {source.max_lag_days + source.max_staleness_days} DAY
+              AND {source.date_column} < CAST($end AS DATE)
+            GROUP BY 1
+        )
+        WINDOW w AS (ORDER BY available_date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+    """
+
+
+class MatrixBuilder:
+    def __init__(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        sources: Sequence[MatrixSource] = MATRIX_SOURCES,
+        symbol: str = TARGET_SYMBOL,
+        table: str = MATRIX_TABLE,
+    ):
+        self.con = con
+        self.symbol = symbol
+        self.table = table
+        self.sources = []
+        self.columns: Dict[str, Dict[tuple, str]] = {}
+        self.keys: Dict[str, List[tuple]] = {}
+        for source in sources:
+            if not _table_exists(con, source.table):
+                logger.warning(f"  ⚠️  {source.name}: table {source.table} not found locally, skipped")
+                continue
+            keys = source_keys(con, source)
+            self.sources.append(source)
+            self.keys[source.name] = keys
+            self.columns[source.name] = {
+                key + (value,): _column_name(source.name, *key, value)
+                for key in keys for value in source.value_columns
+            }
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return [c for s in self.sources for c in self.columns[s.name].values()]
+
+    def _chunk_sql(self) -> str:
+        ctes = [f"""
+        spine AS (
+            SELECT date, symbol,
+                   {', '.join(f'LEAD(CAST(close AS DOUBLE), {n}) OVER w AS target_{h}_price' for h, n in TARGET_HORIZONS.items())}
+            FROM {OHLCV_TABLE}
+            WHERE symbol = $symbol
+            WINDOW w AS (ORDER BY date)
+        )"""]
+        joins, selects = [], []
+        for i, source in enumerate(self.sources):
+            alias = f"s{i}"
+            ctes.append(f"{alias} AS ({_pivot_sql(source, self.keys[source.name], self.columns[source.name])})")
+            joins.append(f"ASOF LEFT JOIN {alias} ON m.date >= {alias}.available_date")
+            selects += [
+                f"CASE WHEN m.date - {alias}.{c}__as_of <= {source.max_staleness_days} THEN {alias}.{c} END AS {c}"
+                for c in self.columns[source.name].values()
+            ]
+
+        return f"""
+        WITH {', '.join(ctes)}
+        SELECT {', '.join(f'm.{c}' for c in MATRIX_BASE_COLUMNS)}{''.join(', ' + s for s in selects)}
+        FROM (SELECT * FROM spine WHERE date >= $start AND date < $end) m
+        {' '.join(joins)}
+        ORDER BY m.date
+        """
+
+    def _create_table(self):
+        columns = [
+            "date DATE NOT NULL", "symbol VARCHAR NOT NULL",
+            *[f"target_{h}_price DOUBLE" for h in TARGET_HORIZONS],
+            *[f"{c} DOUBLE" for c in self.feature_columns],
+        ]
+        self.con.execute(f"DROP TABLE IF EXISTS {self.table}")
+        self.con.execute(f"CREATE TABLE {self.table} ({', '.join(columns)}, PRIMARY KEY (date, symbol))")
+
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        return self.con.execute(
+            f"SELECT MIN(date), MAX(date) FROM {OHLCV_TABLE} WHERE symbol = ?", [self.symbol]
+        ).fetchone()
+
+    def build(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        chunk_days: int = DEFAULT_CHUNK_DAYS,
+        rebuild: bool = True,
+    ) -> int:
+        """Write matrix rows for [start, end] one chunk of dates at a time"""
+        first, last = self.date_range()
+        if first is None:
+            logger.warning(f"  ⚠️  No {self.symbol} bars in {OHLCV_TABLE}")
+            return 0
+        start, end = start or first, (end or last) + timedelta(days=1)
+        if rebuild or not _table_exists(self.con, self.table):
+            self._create_table()
+
+        sql = self._chunk_sql()
+        total = 0
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            params = {"symbol": self.symbol, "start": chunk_start, "end": chunk_end, "lookback": chunk_start}
+            self.con.execute(f"INSERT OR REPLACE INTO {self.table} {sql}", params)
+            rows = self.con.fetchone()[0]
+            total += rows
+            logger.info(f"  {chunk_start} → {chunk_end}: {rows:,} rows")
+            chunk_start = chunk_end
+        return total
@@ -0,0 +1,204 @@
+"""
+Local engine for the 19 technical indicators
+(features.technical_indicators_us_oil_solutions)
+Computes the full indicator set from zl_futures_ohlcv in one lazy Polars
+pass, windowed per symbol, so features can be rebuilt on the DuckDB side
+without a warehouse run. Formulas follow docs/features/276-features-complete.md.
+
+Conventions (shared with the parity check in scripts/check_technical_parity.py):
+- EMAs use alpha = 2 / (span + 1), seeded with the first close, and are null
+  until `span` bars have been seen
+- SMAs, rolling STDDEVs (sample, ddof=1) and rolling sums are null until the
+  window is full
+- returns are log returns, except Amihud which uses the absolute simple return
+- boho_spread, corr_zl_brl_60d and terms_of_trade_zl_brl are cross-asset ZL
+  features; they are filled on ZL rows only, joined to HO / 6L by date, and
+  the correlation runs over the last 60 dates with both returns present
+"""
+import logging
+import math
+from typing import Optional, Sequence
+
+import duckdb
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+OHLCV_TABLE = "zl_futures_ohlcv"
+TECHNICAL_TABLE = "technical_indicators_us_oil_solutions"
+
+BASE_SYMBOL = "ZL"
+HO_SYMBOL = "HO"
+BRL_SYMBOL = "6L"
+
+TRADING_DAYS = 252
+BB_WINDOW = 20
+BB_STDDEVS = 2.0
+VWAP_WINDOW = 21
+VOL_WINDOW = 21
+CORR_WINDOW = 60
+
+# Output columns, in features.technical_indicators_us_oil_solutions order
+TECHNICAL_COLUMNS = [
+    "date", "symbol",
+    "dist_ema_5", "dist_ema_10", "dist_ema_21", "dist_sma_63", "dist_sma_200",
+    "bb_pct_b", "bb_bandwidth", "ppo_12_26", "dist_vwap_21d",
+    "vol_garman_klass_annualized", "vol_parkinson_annualized", "vol_21d",
+    "amihud_illiquidity", "oi_volume_ratio", "boho_spread",
+    "corr_zl_brl_60d", "terms_of_trade_zl_brl", "doy_sin", "doy_cos",
+]
+
+TECHNICAL_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {TECHNICAL_TABLE} (
+        date DATE NOT NULL,
+        symbol VARCHAR NOT NULL,
+        {', '.join(f'{c} DOUBLE' for c in TECHNICAL_COLUMNS[2:])},
+        PRIMARY KEY (date, symbol)
+    )
+"""
+
+
+def _ema(col: pl.Expr, span: int) -> pl.Expr:
+    return col.ewm_mean(span=span, adjust=False, min_samples=span)
+
+
+def _safe_div(num: pl.Expr, den: pl.Expr) -> pl.Expr:
+    return pl.when(den != 0).then(num / den).otherwise(None)
+
+
+def load_ohlcv(
+    con: duckdb.DuckDBPyConnection,
+    table: str = OHLCV_TABLE,
+    symbols: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
+    """Read OHLCV bars as Float64 columns, sorted by symbol and date"""
+    where = f"WHERE symbol IN ({', '.join('?' for _ in symbols)})" if symbols else ""
+    return con.execute(
+        f"""
+        SELECT date, symbol,
+               CAST(open AS DOUBLE) AS open, CAST(high AS DOUBLE) AS high,
+               CAST(low AS DOUBLE) AS low, CAST(close AS DOUBLE) AS close,
+               CAST(volume AS DOUBLE) AS volume, CAST(open_interest AS DOUBLE) AS open_interest
+        FROM {table} {where}
+        ORDER BY symbol, date
+        """,
+        list(symbols or []),
+    ).pl()
+
+
+def per_symbol_indicators(ohlcv: pl.LazyFrame) -> pl.LazyFrame:
+    """The single-symbol indicators, windowed per symbol; input sorted by symbol, date"""
+    close, high, low, open_ = pl.col("close"), pl.col("high"), pl.col("low"), pl.col("open")
+    by = "symbol"
+
+    log_ret = (close / close.shift(1)).log()
+    simple_ret = close / close.shift(1) - 1
+    log_hl = (high / low).log()
+    log_co = (close / open_).log()
+    typical = (high + low + close) / 3
+
+    sma_bb = close.rolling_mean(BB_WINDOW, min_samples=BB_WINDOW)
+    std_bb = close.rolling_std(BB_WINDOW, min_samples=BB_WINDOW, ddof=1)
+    upper, lower = sma_bb + BB_STDDEVS * std_bb, sma_bb - BB_STDDEVS * std_bb
+    ema_12, ema_26 = _ema(close, 12), _ema(close, 26)
+    vwap = (
+        (typical * pl.col("volume")).rolling_sum(VWAP_WINDOW, min_samples=VWAP_WINDOW)
+        / pl.col("volume").rolling_sum(VWAP_WINDOW, min_samples=VWAP_WINDOW)
+    )
+    gk_var = 0.5 * log_hl ** 2 - (2 * math.log(2) - 1) * log_co ** 2
+    doy = pl.col("date").dt.ordinal_day().cast(pl.Float64)
+
+    return ohlcv.with_columns(
+        (close / _ema(close, 5) - 1).over(by).alias("dist_ema_5"),
+        (close / _ema(close, 10) - 1).over(by).alias("dist_ema_10"),
+        (close / _ema(close, 21) - 1).over(by).alias("dist_ema_21"),
+        (close / close.rolling_mean(63, min_samples=63) - 1).over(by).alias("dist_sma_63"),
+        (close / close.rolling_mean(200, min_samples=200) - 1).over(by).alias("dist_sma_200"),
+        _safe_div(close - lower, upper - lower).over(by).alias("bb_pct_b"),
+        ((upper - lower) / sma_bb).over(by).alias("bb_bandwidth"),
+        ((ema_12 - ema_26) / ema_26 * 100).over(by).alias("ppo_12_26"),
+        (close / vwap - 1).over(by).alias("dist_vwap_21d"),
+        (gk_var.rolling_mean(VOL_WINDOW, min_samples=VOL_WINDOW).sqrt() * math.sqrt(TRADING_DAYS))
+        .over(by).alias("vol_garman_klass_annualized"),
+        ((log_hl ** 2).rolling_mean(VOL_WINDOW, min_samples=VOL_WINDOW) / (4 * math.log(2))).sqrt()
+        .mul(math.sqrt(TRADING_DAYS)).over(by).alias("vol_parkinson_annualized"),
+        (log_ret.rolling_std(VOL_WINDOW, min_samples=VOL_WINDOW, ddof=1) * math.sqrt(TRADING_DAYS))
+        .over(by).alias("vol_21d"),
+        _safe_div(simple_ret.abs(), pl.col("volume") * close).over(by).alias("amihud_illiquidity"),
+        _safe_div(pl.col("open_interest"), pl.col("volume")).alias("oi_volume_ratio"),
+        (2 * math.pi * doy / 365).sin().alias("doy_sin"),
+        (2 * math.pi * doy / 365).cos().alias("doy_cos"),
+    )
+
+
+def cross_asset_indicators(
+    ohlcv: pl.LazyFrame,
+    base_symbol: str = BASE_SYMBOL,
+    ho_symbol: str = HO_SYMBOL,
+    brl_symbol: str = BRL_SYMBOL,
+) -> pl.LazyFrame:
+    """ZL-vs-HO/BRL features for base_symbol rows, keyed by (date, symbol)"""
+    def closes(symbol, name):
+        return ohlcv.filter(pl.col("symbol") == symbol).select("date", pl.col("close").alias(name))
+
+    zl = closes(base_symbol, "zl_close")
+    brl = closes(brl_symbol, "brl_close")
+    joined = zl.join(closes(ho_symbol, "ho_close"), on="date", how="left").join(brl, on="date", how="left")
+    # BRL returns are taken on BRL's own calendar, then aligned to ZL dates. The
+    # correlation window is the last CORR_WINDOW dates where both returns exist.
+    brl_ret = brl.sort("date").select("date", (pl.col("brl_close") / pl.col("brl_close").shift(1)).log().alias("brl_ret"))
+    zl_ret = (pl.col("zl_close") / pl.col("zl_close").shift(1)).log()
+    joined = joined.join(brl_ret, on="date", how="left").sort("date").with_columns(zl_ret.alias("zl_ret"))
+    corr = (
+        joined.filter(pl.col("zl_ret").is_not_null() & pl.col("brl_ret").is_not_null())
+        .select(
+            "date",
+            pl.rolling_corr("zl_ret", "brl_ret", window_size=CORR_WINDOW, min_samples=CORR_WINDOW)
+            .alias("corr_zl_brl_60d"),
+        )
+    )
+    return (
+        joined.join(corr, on="date", how="left")
+        .select(
+            "date",
+            pl.lit(base_symbol).alias("symbol"),
+            (pl.col("zl_close") / 100 * 7.5 - pl.col("ho_close")).alias("boho_spread"),
+            "corr_zl_brl_60d",
+            _safe_div(pl.col("zl_close"), pl.col("brl_close")).alias("terms_of_trade_zl_brl"),
+        )
+    )
+
+
+def compute_technical_indicators(
+    ohlcv: pl.DataFrame,
+    base_symbol: str = BASE_SYMBOL,
+    ho_symbol: str = HO_SYMBOL,
+    brl_symbol: str = BRL_SYMBOL,
+) -> pl.DataFrame:
+    """All 19 indicators for every (date, symbol) in `ohlcv`, in TECHNICAL_COLUMNS order"""
+    bars = ohlcv.lazy().sort("symbol", "date")
+    cross = cross_asset_indicators(bars, base_symbol, ho_symbol, brl_symbol)
+    return (
+        per_symbol_indicators(bars)
+        .join(cross, on=["date", "symbol"], how="left")
+        .select(TECHNICAL_COLUMNS)
+        # Divisions on degenerate bars (e.g. zero range) can yield NaN; store as NULL
+        .with_columns(pl.col(pl.Float64).fill_nan(None))
+        .collect()
+    )
+
+
+def write_technical_indicators(
+    con: duckdb.DuckDBPyConnection, features: pl.DataFrame, table: str = TECHNICAL_TABLE
+) -> int:
+    """Upsert feature rows into the local technical indicators table"""
+    con.execute(TECHNICAL_DDL.replace(TECHNICAL_TABLE, table, 1))
+    con.register("technical_features", features.select(TECHNICAL_COLUMNS).to_arrow())
+    try:
+        con.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(TECHNICAL_COLUMNS)}) "
+            f"SELECT {', '.join(TECHNICAL_COLUMNS)} FROM technical_features"
+        )
+        return con.fetchone()[0]
+    finally:
+        con.unregister("technical_features")
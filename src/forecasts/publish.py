@@ -0,0 +1,282 @@
+"""
+Batched forecast publishing (forecasts.zl_predictions_<horizon>)
+A model sweep adds predictions for every model and horizon to one
+ForecastBatch, which is published in a single pass:
+
+- BigQuery: the batch is loaded once as Parquet into a staging table, then
+  one multi-statement job runs a MERGE per horizon inside a transaction
+  (load + script + drop, however many models and horizons)
+- DuckDB / MotherDuck: the batch is registered as an Arrow view and each
+  horizon is upserted with INSERT OR REPLACE in one transaction
+
+Rows are keyed on (date, model_type); every row carries the run_id that
+wrote it. Publishing the same run again replaces its rows, and rows that
+run wrote earlier but no longer produces (within the batch's date range)
+are deleted, so reruns never duplicate or leave stale forecasts behind. A
+horizon the rerun omits altogether loses every row the run wrote there.
+"""
+import io
+import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.features.matrix import TARGET_HORIZONS
+from src.ingestion.sink import dedupe, to_parquet
+from src.utils.bigquery import PROJECT_ID
+from src.utils.query_guard import get_gateway
+
+logger = logging.getLogger(__name__)
+
+DATASET = "forecasts"
+TABLE = "zl_predictions_{horizon}"
+KEY_COLUMNS = ("date", "model_type")
+VALUE_COLUMNS = ("prediction", "lower_bound", "upper_bound", "confidence")
+
+PREDICTION_SCHEMA = pa.schema([
+    ("horizon", pa.string()),
+    ("date", pa.date32()),
+    ("model_type", pa.string()),
+    ("prediction", pa.float64()),
+    ("lower_bound", pa.float64()),
+    ("upper_bound", pa.float64()),
+    ("confidence", pa.float64()),
+    ("run_id", pa.string()),
+    ("published_at", pa.timestamp("us", tz="UTC")),
+])
+TABLE_COLUMNS = [f.name for f in PREDICTION_SCHEMA if f.name != "horizon"]
+
+PREDICTIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        date DATE NOT NULL,
+        model_type VARCHAR NOT NULL,
+        prediction DOUBLE,
+        lower_bound DOUBLE,
+        upper_bound DOUBLE,
+        confidence DOUBLE,
+        run_id VARCHAR,
+        published_at TIMESTAMPTZ,
+        PRIMARY KEY (date, model_type)
+    )
+"""
+
+_RUN_ID = re.compile(r"^[A-Za-z0-9_.:-]{1,128}$")
+
+Rows = Union[pd.DataFrame, pa.Table, Sequence[dict]]
+
+
+@dataclass
+class PublishStats:
+    run_id: str
+    rows: Dict[str, int] = field(default_factory=dict)   # rows published per horizon
+    models: int = 0
+    statements: int = 0                                  # jobs / DML statements issued
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        per_horizon = ", ".join(f"{h}: {n:,}" for h, n in self.rows.items())
+        return (f"run {self.run_id}: {sum(self.rows.values()):,} rows from {self.models} models "
+                f"({per_horizon}) in {self.statements} statements, {self.seconds:.2f}s")
+
+
+class ForecastBatch:
+    """Predictions of one run, across every model and horizon"""
+
+    def __init__(self, run_id: str):
+        if not _RUN_ID.match(run_id):
+            raise ValueError(f"run_id must match {_RUN_ID.pattern}, got {run_id!r}")
+        self.run_id = run_id
+        self._tables: List[pa.Table] = []
+        self._rows: List[dict] = []
+
+    @staticmethod
+    def _check_horizon(horizon: str):
+        if horizon not in TARGET_HORIZONS:
+            raise ValueError(f"Unknown horizon {horizon!r}, expected one of {list(TARGET_HORIZONS)}")
+
+    def add_prediction(
+        self,
+        model_type: str,
+        horizon: str,
+        date: date,
+        prediction: float,
+        lower_bound: Optional[float] = None,
+        upper_bound: Optional[float] = None,
+        confidence: Optional[float] = None,
+    ):
+        self._check_horizon(horizon)
+        self._rows.append({
+            "horizon": horizon, "date": date, "model_type": model_type, "prediction": prediction,
+            "lower_bound": lower_bound, "upper_bound": upper_bound, "confidence": confidence,
+        })
+
+    def add(self, model_type: str, horizon: str, rows: Rows):
+        """One model's predictions for one horizon: date, prediction and optional bounds / confidence"""
+        self._check_horizon(horizon)
+        if isinstance(rows, pd.DataFrame):
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+        elif isinstance(rows, pa.Table):
+            table = rows
+        else:
+            table = pa.Table.from_pylist(list(rows))
+        n = table.num_rows
+        columns = {
+            "horizon": pa.array([horizon] * n, pa.string()),
+            "date": table["date"],
+            "model_type": pa.array([model_type] * n, pa.string()),
+        }
+        for name in VALUE_COLUMNS:
+            columns[name] = table[name] if name in table.column_names else pa.nulls(n, pa.float64())
+        self._tables.append(pa.table(columns))
+
+    def to_arrow(self) -> pa.Table:
+        """Every prediction in PREDICTION_SCHEMA, last one winning per (horizon, date, model_type)"""
+        published_at = datetime.now(timezone.utc)
+        tables = list(self._tables)
+        if self._rows:
+            tables.append(pa.Table.from_pylist(self._rows))
+        schema = pa.schema([f for f in PREDICTION_SCHEMA if f.name not in ("run_id", "published_at")])
+        if tables:
+            table = pa.concat_tables([t.select(schema.names).cast(schema) for t in tables])
+        else:
+            table = schema.empty_table()
+        table = dedupe(table, ("horizon", *KEY_COLUMNS))
+        table = table.append_column("run_id", pa.array([self.run_id] * table.num_rows, pa.string()))
+        table = table.append_column(
+            "published_at", pa.array([published_at] * table.num_rows, PREDICTION_SCHEMA.field("published_at").type)
+        )
+        if table.num_rows and table["prediction"].null_count:
+            raise ValueError(f"{table['prediction'].null_count} predictions are null")
+        return table
+
+    def __len__(self) -> int:
+        return sum(t.num_rows for t in self._tables) + len(self._rows)
+
+    def publish(self, backend) -> PublishStats:
+        started = time.perf_counter()
+        table = self.to_arrow()
+        stats = PublishStats(run_id=self.run_id, models=len(pc.unique(table["model_type"])))
+        if table.num_rows:
+            for horizon in TARGET_HORIZONS:
+                n = int(pc.sum(pc.equal(table["horizon"], horizon)).as_py() or 0)
+                if n:
+                    stats.rows[horizon] = n
+            stats.statements = backend.publish(table, self.run_id, list(stats.rows))
+        stats.seconds = time.perf_counter() - started
+        logger.debug(f"  Published {stats.summary()}")
+        return stats
+
+
+def _date_range(table: pa.Table, horizon: str):
+    dates = table.filter(pc.equal(table["horizon"], horizon))["date"]
+    return pc.min(dates).as_py(), pc.max(dates).as_py()
+
+
+class BigQueryForecastBackend:
+    """One Parquet load into a staging table, then every horizon's MERGE in one transaction"""
+
+    def __init__(self, client, project: str = PROJECT_ID, dataset: str = DATASET):
+        self.client = client
+        self.project = project
+        self.dataset = dataset
+
+    def _table_id(self, horizon: str) -> str:
+        return f"{self.project}.{self.dataset}.{TABLE.format(horizon=horizon)}"
+
+    def _merge(self, staging: str, horizon: str) -> str:
+        updates = ", ".join(f"{c} = s.{c}" for c in TABLE_COLUMNS if c not in KEY_COLUMNS)
+        columns = ", ".join(TABLE_COLUMNS)
+        # The date bounds on the target keep the MERGE inside the batch's partitions
+        return f"""
+        MERGE `{self._table_id(horizon)}` t
+        USING (SELECT * EXCEPT (horizon) FROM `{staging}` WHERE horizon = '{horizon}') s
+        ON t.date = s.date AND t.model_type = s.model_type
+           AND t.date BETWEEN @start_{horizon} AND @end_{horizon}
+        WHEN MATCHED THEN UPDATE SET {updates}
+        WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({', '.join(f's.{c}' for c in TABLE_COLUMNS)})
+        WHEN NOT MATCHED BY SOURCE AND t.run_id = @run_id
+             AND t.date BETWEEN @start_{horizon} AND @end_{horizon} THEN DELETE;
+        """
+
+    def _clear(self, horizon: str) -> str:
+        return f"DELETE FROM `{self._table_id(horizon)}` WHERE run_id = @run_id;\n"
+
+    def publish(self, table: pa.Table, run_id: str, horizons: Sequence[str]) -> int:
+        from google.cloud import bigquery
+
+        staging = f"{self.project}.{self.dataset}._publish_{re.sub(r'[^A-Za-z0-9_]', '_', run_id)}_{uuid.uuid4().hex[:8]}"
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE",
+        )
+        try:
+            self.client.load_table_from_file(io.BytesIO(to_parquet(table)), staging, job_config=job_config).result()
+            params = [bigquery.ScalarQueryParameter("run_id", "STRING", run_id)]
+            for horizon in horizons:
+                start, end = _date_range(table, horizon)
+                params += [bigquery.ScalarQueryParameter(f"start_{horizon}", "DATE", start),
+                           bigquery.ScalarQueryParameter(f"end_{horizon}", "DATE", end)]
+            # Horizons the run no longer produces lose everything it wrote there
+            statements = [self._merge(staging, h) if h in horizons else self._clear(h) for h in TARGET_HORIZONS]
+            script = "BEGIN TRANSACTION;\n" + "".join(statements) + "COMMIT TRANSACTION;"
+            get_gateway(self.project, self.client).query(
+                script, job_config=bigquery.QueryJobConfig(query_parameters=params),
+                allow_full_scan=True, label=f"publish {run_id}",
+            )
+        finally:
+            self.client.delete_table(staging, not_found_ok=True)
+        # load job, MERGE script, staging drop
+        return 3
+
+
+class DuckDBForecastBackend:
+    """INSERT OR REPLACE per horizon from the registered batch, in one transaction"""
+
+    def __init__(self, con: duckdb.DuckDBPyConnection):
+        self.con = con
+        for horizon in TARGET_HORIZONS:
+            con.execute(PREDICTIONS_DDL.format(table=TABLE.format(horizon=horizon)))
+
+    def publish(self, table: pa.Table, run_id: str, horizons: Sequence[str]) -> int:
+        statements = 0
+        columns = ", ".join(TABLE_COLUMNS)
+        self.con.register("forecast_batch", table)
+        self.con.begin()
+        try:
+            for horizon in TARGET_HORIZONS:
+                target = TABLE.format(horizon=horizon)
+                if horizon not in horizons:
+                    # A horizon the run no longer produces at all
+                    self.con.execute(f"DELETE FROM {target} WHERE run_id = $run_id", {"run_id": run_id})
+                    statements += 1
+                    continue
+                start, end = _date_range(table, horizon)
+                # Rows this run wrote before but no longer produces
+                self.con.execute(f"""
+                    DELETE FROM {target} t
+                    WHERE t.run_id = $run_id AND t.date BETWEEN $start AND $end
+                      AND NOT EXISTS (
+                          SELECT 1 FROM forecast_batch s
+                          WHERE s.horizon = $horizon AND s.date = t.date AND s.model_type = t.model_type
+                      )
+                """, {"run_id": run_id, "start": start, "end": end, "horizon": horizon})
+                self.con.execute(f"""
+                    INSERT OR REPLACE INTO {target} ({columns})
+                    SELECT {columns} FROM forecast_batch WHERE horizon = $horizon
+                """, {"horizon": horizon})
+                statements += 2
+            self.con.commit()
+        except Exception:
+            self.con.rollback()
+            raise
+        finally:
+            self.con.unregister("forecast_batch")
+        return statements
@@ -0,0 +1,110 @@
+"""
+Arrow load path from Databento into DuckDB/MotherDuck
+Decoded records stay in Arrow record batches built straight from the DBN
+structured arrays and are streamed into DuckDB through a RecordBatchReader.
+Fixed-point prices, nanosecond timestamps and the instrument_id → symbol
+mapping are resolved in SQL with explicit column names and casts, so nothing
+goes through pandas and nothing depends on column order.
+"""
+import logging
+from typing import Iterator
+
+import databento as db
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = 65_536
+
+# Databento fixed-point prices are int64 in units of 1e-9; INT64_MAX means unset
+UNDEF_PRICE = np.iinfo(np.int64).max
+
+OHLCV_ARROW_SCHEMA = pa.schema([
+    ("instrument_id", pa.uint32()),
+    ("ts_event", pa.timestamp("ns")),
+    ("open", pa.int64()),
+    ("high", pa.int64()),
+    ("low", pa.int64()),
+    ("close", pa.int64()),
+    ("volume", pa.uint64()),
+])
+
+SYMBOL_MAP_SCHEMA = pa.schema([
+    ("instrument_id", pa.uint32()),
+    ("start_date", pa.date32()),
+    ("end_date", pa.date32()),
+    ("symbol", pa.string()),
+])
+
+
+def _record_batch(records: np.ndarray) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(records["instrument_id"]),
+            pa.array(records["ts_event"].view("int64")).cast(pa.timestamp("ns")),
+            pa.array(records["open"]),
+            pa.array(records["high"]),
+            pa.array(records["low"]),
+            pa.array(records["close"]),
+            pa.array(records["volume"]),
+        ],
+        schema=OHLCV_ARROW_SCHEMA,
+    )
+
+
+def ohlcv_batches(store: db.DBNStore, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+    """Decode the store `batch_rows` records at a time into Arrow batches"""
+    for records in store.to_ndarray(count=batch_rows):
+        if len(records):
+            yield _record_batch(records)
+
+
+def symbol_map_table(store: db.DBNStore) -> pa.Table:
+    """Instrument ID → requested symbol intervals from the store's symbology"""
+    rows = {name: [] for name in SYMBOL_MAP_SCHEMA.names}
+    for symbol, intervals in store.mappings.items():
+        for interval in intervals:
+            if not interval["symbol"]:
+                continue
+            rows["instrument_id"].append(int(interval["symbol"]))
+            rows["start_date"].append(interval["start_date"])
+            rows["end_date"].append(interval["end_date"])
+            rows["symbol"].append(symbol)
+    return pa.Table.from_pydict(rows, schema=SYMBOL_MAP_SCHEMA)
+
+
+def load_ohlcv_arrow(
+    con: duckdb.DuckDBPyConnection,
+    store: db.DBNStore,
+    table: str,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> int:
+    """Upsert every OHLCV record in `store` into `table`, returning rows written"""
+    reader = pa.RecordBatchReader.from_batches(OHLCV_ARROW_SCHEMA, ohlcv_batches(store, batch_rows))
+    con.register("ohlcv_arrow", reader)
+    con.register("ohlcv_symbols", symbol_map_table(store))
+    try:
+        con.execute(f"""
+            INSERT OR REPLACE INTO {table} (date, symbol, open, high, low, close, volume, updated_at)
+            SELECT
+                CAST(b.ts_event AS DATE) AS date,
+                m.symbol AS symbol,
+                CAST(NULLIF(b.open, {UNDEF_PRICE}) / 1e9 AS DECIMAL(10, 2)) AS open,
+                CAST(NULLIF(b.high, {UNDEF_PRICE}) / 1e9 AS DECIMAL(10, 2)) AS high,
+                CAST(NULLIF(b.low, {UNDEF_PRICE}) / 1e9 AS DECIMAL(10, 2)) AS low,
+                CAST(NULLIF(b.close, {UNDEF_PRICE}) / 1e9 AS DECIMAL(10, 2)) AS close,
+                CAST(b.volume AS BIGINT) AS volume,
+                CURRENT_TIMESTAMP AS updated_at
+            FROM ohlcv_arrow b
+            JOIN ohlcv_symbols m
+              ON b.instrument_id = m.instrument_id
+             AND CAST(b.ts_event AS DATE) >= m.start_date
+             AND CAST(b.ts_event AS DATE) < m.end_date
+        """)
+        # The reader is consumed by the INSERT; the returned changes count is its size
+        return con.fetchone()[0]
+    finally:
+        con.unregister("ohlcv_arrow")
+        con.unregister("ohlcv_symbols")
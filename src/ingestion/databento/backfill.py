@@ -0,0 +1,222 @@
+"""
+Chunked, resumable Databento backfill
+Splits a date range into fixed windows, writes each window to the sink and
+checkpoints after every window so a failed run resumes where it stopped.
+Peak memory is bounded by one window of records, not the full history.
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator, Optional, Sequence, Tuple
+
+import databento as db
+
+logger = logging.getLogger(__name__)
+
+DATASET = "GLBX.MDP3"
+SCHEMA = "ohlcv-1d"
+STYPE_IN = "continuous"
+DEFAULT_WINDOW_DAYS = 365
+
+
+@dataclass(frozen=True)
+class BackfillRequest:
+    """What to pull: one dataset/schema/symbology over [start, end)"""
+    symbols: Tuple[str, ...]
+    start: date
+    end: date
+    dataset: str = DATASET
+    schema: str = SCHEMA
+    stype_in: str = STYPE_IN
+
+    @property
+    def key(self) -> str:
+        """Checkpoint key; the date range is deliberately excluded so reruns resume"""
+        return f"{self.dataset}/{self.schema}/{self.stype_in}/{','.join(sorted(self.symbols))}"
+
+
+def iter_windows(start: date, end: date, window_days: int) -> Iterator[Tuple[date, date]]:
+    """Yield half-open [window_start, window_end) ranges covering [start, end)"""
+    if window_days <= 0:
+        raise ValueError(f"window_days must be positive, got {window_days}")
+    cursor = start
+    while cursor < end:
+        window_end = min(cursor + timedelta(days=window_days), end)
+        yield cursor, window_end
+        cursor = window_end
+
+
+def utc_today() -> date:
+    """Today in UTC, the calendar Databento bars are dated in"""
+    return datetime.now(timezone.utc).date()
+
+
+def _to_ns(d: date) -> int:
+    return int(datetime.combine(d, time.min, tzinfo=timezone.utc).timestamp()) * 1_000_000_000
+
+
+class HistoricalSource:
+    """Fetches windows from the live Databento Historical API"""
+
+    def __init__(self, client: db.Historical):
+        self.client = client
+
+    def fetch(self, request: BackfillRequest, start: date, end: date) -> db.DBNStore:
+        return self.client.timeseries.get_range(
+            dataset=request.dataset,
+            symbols=list(request.symbols),
+            schema=request.schema,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            stype_in=request.stype_in,
+        )
+
+
+class DBNFileSource:
+    """Serves windows from local DBN files (fixtures or previously saved pulls)
+
+    Records are streamed from each file and only those whose ts_event falls in
+    the requested window are re-encoded, so a window never holds more than its
+    own records in memory. Files may overlap: a bar is taken from the first
+    file that has it, and the symbol intervals of every file are coalesced so
+    each bar maps to its symbol exactly once.
+    """
+
+    def __init__(self, paths: Sequence[os.PathLike]):
+        self.paths = [Path(p) for p in paths]
+
+    def fetch(self, request: BackfillRequest, start: date, end: date) -> db.DBNStore:
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        metadata = None
+        mappings = {}
+        chunks = []
+        seen = set()
+        for path in self.paths:
+            store = db.DBNStore.from_file(path)
+            if store.dataset != request.dataset or str(store.schema) != request.schema:
+                continue
+            metadata = metadata or store.metadata
+            instrument_ids = set()
+            for symbol in request.symbols:
+                for interval in store.mappings.get(symbol, []):
+                    if interval["symbol"]:
+                        instrument_ids.add(int(interval["symbol"]))
+                        mappings.setdefault(symbol, []).append(interval)
+            for record in store:
+                if record.instrument_id in instrument_ids and start_ns <= record.ts_event < end_ns:
+                    key = (record.instrument_id, record.ts_event)
+                    if key not in seen:
+                        seen.add(key)
+                        chunks.append(bytes(record))
+
+        if metadata is None:
+            raise FileNotFoundError(
+                f"No DBN file matches {request.dataset} {request.schema} in {self.paths}"
+            )
+        mappings = {symbol: _coalesce(intervals) for symbol, intervals in mappings.items()}
+        return db.DBNStore.from_bytes(bytes(_with_mappings(metadata, mappings)) + b"".join(chunks))
+
+
+def _coalesce(intervals: Sequence[dict]) -> list:
+    """Merge overlapping or touching intervals of the same instrument"""
+    merged = []
+    for interval in sorted(intervals, key=lambda i: (i["symbol"], i["start_date"])):
+        last = merged[-1] if merged else None
+        if last and last["symbol"] == interval["symbol"] and interval["start_date"] <= last["end_date"]:
+            last["end_date"] = max(last["end_date"], interval["end_date"])
+        else:
+            merged.append(dict(interval))
+    return sorted(merged, key=lambda i: i["start_date"])
+
+
+def _with_mappings(metadata, mappings: dict):
+    """Copy of `metadata` carrying the symbol mappings merged from several files"""
+    # Metadata only accepts attribute-style mapping objects, not dicts
+    return type(metadata)(
+        dataset=metadata.dataset,
+        start=metadata.start,
+        end=metadata.end,
+        stype_in=metadata.stype_in,
+        stype_out=metadata.stype_out,
+        schema=metadata.schema,
+        symbols=list(mappings),
+        partial=[],
+        not_found=[],
+        mappings=[
+            SimpleNamespace(raw_symbol=symbol, intervals=[SimpleNamespace(**i) for i in intervals])
+            for symbol, intervals in mappings.items()
+        ],
+    )
+
+
+class BackfillCheckpoint:
+    """JSON checkpoint of the last fully-written window per request key"""
+
+    def __init__(self, path: os.PathLike):
+        self.path = Path(path)
+        self._state = self._load()
+        # Concurrent backfills of different keys share one file
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def completed_through(self, key: str) -> Optional[date]:
+        entry = self._state.get(key)
+        return date.fromisoformat(entry["completed_through"]) if entry else None
+
+    def advance(self, key: str, window_end: date, rows: int):
+        """Record that everything before `window_end` has been written"""
+        with self._lock:
+            entry = self._state.setdefault(key, {"rows": 0})
+            entry["completed_through"] = window_end.isoformat()
+            entry["rows"] += rows
+            entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+            # Write-then-rename so a crash mid-write never leaves a torn checkpoint
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def clear(self, key: str):
+        with self._lock:
+            if self._state.pop(key, None) is not None:
+                with open(self.path, "w") as f:
+                    json.dump(self._state, f, indent=2, sort_keys=True)
+
+
+def run_backfill(
+    source,
+    sink,
+    request: BackfillRequest,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    checkpoint: Optional[BackfillCheckpoint] = None,
+) -> int:
+    """Load `request` window by window, resuming from the checkpoint if present"""
+    resume_from = checkpoint.completed_through(request.key) if checkpoint else None
+    start = request.start
+    if resume_from and resume_from > start:
+        logger.info(f"Resuming {request.key} from {resume_from} (checkpoint {checkpoint.path})")
+        start = resume_from
+
+    total = 0
+    for window_start, window_end in iter_windows(start, request.end, window_days):
+        store = source.fetch(request, window_start, window_end)
+        rows = sink.write(store)
+        total += rows
+        if checkpoint:
+            checkpoint.advance(request.key, window_end, rows)
+        logger.info(f"  ✅ {window_start} → {window_end}: {rows:,} rows")
+        del store
+
+    return total
@@ -0,0 +1,276 @@
+"""
+Local on-disk cache in front of the Databento Historical API
+Raw DBN payloads are stored as content-addressed segments keyed on
+(dataset, schema, symbols, stype, start, end). A request that overlaps cached
+segments is served by joining them and fetching only the uncovered gaps, so
+re-running backfills and feature builds costs no API calls or transfer.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time as _time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import databento as db
+
+from src.ingestion.databento.backfill import BackfillRequest, _to_ns, _with_mappings, utc_today
+
+logger = logging.getLogger(__name__)
+
+# Bars this close to today can still be revised, so they are never cached
+DEFAULT_SETTLE_DAYS = 3
+
+
+@dataclass
+class Segment:
+    start: str
+    end: str
+    file: str
+    bytes: int
+    created_at: float
+    last_access: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    partial_hits: int = 0
+    misses: int = 0
+    api_calls: int = 0
+    bytes_fetched: int = 0
+    bytes_saved: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def segment_key(request: BackfillRequest, start: date, end: date) -> str:
+    """Content address of one cached range"""
+    raw = json.dumps([
+        request.dataset, request.schema, sorted(request.symbols), request.stype_in,
+        start.isoformat(), end.isoformat(),
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class DatabentoCache:
+    """Segment store with size- and age-based eviction"""
+
+    def __init__(
+        self,
+        cache_path: os.PathLike,
+        max_bytes: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+    ):
+        self.root = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.stats = CacheStats()
+        # Re-entrant: put() evicts and saves while holding it
+        self._lock = threading.RLock()
+        # Segment files an in-flight fetch is about to read; never evicted
+        self._pins: Counter = Counter()
+        (self.root / "segments").mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        self._index: Dict[str, List[Segment]] = self._load_index()
+
+    def _load_index(self) -> Dict[str, List[Segment]]:
+        if not self._index_path.exists():
+            return {}
+        with open(self._index_path) as f:
+            raw = json.load(f)
+        return {series: [Segment(**s) for s in segments] for series, segments in raw.items()}
+
+    def _save_index(self):
+        tmp = self._index_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({k: [asdict(s) for s in v] for k, v in self._index.items()}, f)
+        os.replace(tmp, self._index_path)
+
+    def segments(self, request: BackfillRequest, start: date, end: date) -> List[Segment]:
+        """Cached segments of this series overlapping [start, end), sorted by start"""
+        with self._lock:
+            found = [
+                s for s in self._index.get(request.key, [])
+                if date.fromisoformat(s.start) < end and date.fromisoformat(s.end) > start
+            ]
+        return sorted(found, key=lambda s: s.start)
+
+    def gaps(
+        self, request: BackfillRequest, start: date, end: date, segments: Optional[List[Segment]] = None,
+    ) -> List[Tuple[date, date]]:
+        """Sub-ranges of [start, end) not covered by `segments` (default: every cached segment)"""
+        missing = []
+        cursor = start
+        if segments is None:
+            segments = self.segments(request, start, end)
+        for segment in sorted(segments, key=lambda s: s.start):
+            seg_start, seg_end = date.fromisoformat(segment.start), date.fromisoformat(segment.end)
+            if seg_start > cursor:
+                missing.append((cursor, seg_start))
+            cursor = max(cursor, seg_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def put(self, request: BackfillRequest, start: date, end: date, store: db.DBNStore, pin: bool = False) -> Segment:
+        """Store a fetched range as a new segment, optionally pinned before anything is evicted"""
+        key = segment_key(request, start, end)
+        path = self.root / "segments" / f"{key}.dbn"
+        store.to_file(path)
+        now = _time.time()
+        segment = Segment(
+            start=start.isoformat(), end=end.isoformat(), file=path.name,
+            bytes=path.stat().st_size, created_at=now, last_access=now,
+        )
+        with self._lock:
+            self._index.setdefault(request.key, []).append(segment)
+            if pin:
+                self._pins[segment.file] += 1
+            self.evict()
+            self._save_index()
+        return segment
+
+    def pin(self, request: BackfillRequest, start: date, end: date) -> List[Segment]:
+        """segments(), protected from eviction until unpin()"""
+        with self._lock:
+            found = self.segments(request, start, end)
+            self._pins.update(s.file for s in found)
+        return found
+
+    def unpin(self, segments: Iterable[Segment]):
+        with self._lock:
+            self._pins.subtract(s.file for s in segments)
+            self._pins += Counter()
+
+    def record(self, **counts: int):
+        """Add to the stats counters (shared by every thread using this cache)"""
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + n)
+
+    def save(self):
+        with self._lock:
+            self._save_index()
+
+    def read(self, segment: Segment) -> db.DBNStore:
+        with self._lock:
+            segment.last_access = _time.time()
+        return db.DBNStore.from_file(self.root / "segments" / segment.file)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(s.bytes for segments in self._index.values() for s in segments)
+
+    def evict(self):
+        """Drop unpinned segments past max_age_days, then least-recently-used until under max_bytes"""
+        with self._lock:
+            now = _time.time()
+            if self.max_age_days is not None:
+                cutoff = now - self.max_age_days * 86400
+                for series, segments in self._index.items():
+                    for segment in [s for s in segments if s.created_at < cutoff and not self._pins[s.file]]:
+                        self._remove(series, segment)
+
+            if self.max_bytes is not None:
+                by_access = sorted(
+                    ((s.last_access, series, s) for series, segs in self._index.items() for s in segs),
+                    key=lambda item: item[0],
+                )
+                total = self.total_bytes()
+                for _, series, segment in by_access:
+                    if total <= self.max_bytes:
+                        break
+                    if self._pins[segment.file]:
+                        continue
+                    total -= segment.bytes
+                    self._remove(series, segment)
+
+    def _remove(self, series: str, segment: Segment):
+        self._index[series].remove(segment)
+        (self.root / "segments" / segment.file).unlink(missing_ok=True)
+        self.stats.evictions += 1
+
+
+def _merge_mappings(stores: Iterable[db.DBNStore]) -> Dict[str, List[dict]]:
+    """Symbol -> instrument intervals across several stores, overlapping intervals coalesced
+
+    A source may clip its mappings to the range it was asked for, so every
+    segment's intervals are needed to map the whole stitched range.
+    """
+    by_instrument: Dict[Tuple[str, str], List[dict]] = {}
+    for store in stores:
+        for symbol, intervals in store.mappings.items():
+            for interval in intervals:
+                by_instrument.setdefault((symbol, interval["symbol"]), []).append(interval)
+
+    mappings: Dict[str, List[dict]] = {}
+    for (symbol, instrument), intervals in by_instrument.items():
+        merged: List[dict] = []
+        for interval in sorted(intervals, key=lambda i: i["start_date"]):
+            if merged and interval["start_date"] <= merged[-1]["end_date"]:
+                merged[-1]["end_date"] = max(merged[-1]["end_date"], interval["end_date"])
+            else:
+                merged.append(dict(interval))
+        mappings.setdefault(symbol, []).extend(merged)
+    return mappings
+
+
+class CachedSource:
+    """Wraps any backfill source (see backfill.HistoricalSource) with a DatabentoCache"""
+
+    def __init__(self, source, cache: DatabentoCache, settle_days: int = DEFAULT_SETTLE_DAYS):
+        self.source = source
+        self.cache = cache
+        self.settle_days = settle_days
+
+    def fetch(self, request: BackfillRequest, start: date, end: date) -> db.DBNStore:
+        settled = min(end, utc_today() - timedelta(days=self.settle_days))
+        cache = self.cache
+        # Pinned so another thread's put() cannot evict what this request reads
+        cached_segments = cache.pin(request, start, settled) if settled > start else []
+        segments = list(cached_segments)
+        try:
+            gaps = cache.gaps(request, start, settled, cached_segments) if settled > start else []
+            for gap_start, gap_end in gaps:
+                store = self.source.fetch(request, gap_start, gap_end)
+                cache.record(api_calls=1, bytes_fetched=store.nbytes)
+                segments.append(cache.put(request, gap_start, gap_end, store, pin=True))
+
+            if settled > start:
+                if not gaps:
+                    cache.record(hits=1)
+                elif cached_segments:
+                    cache.record(partial_hits=1)
+                else:
+                    cache.record(misses=1)
+
+            # Join cached segments (now covering [start, settled)) with the unsettled tail
+            stores = []
+            chunks = []
+            start_ns, settled_ns = _to_ns(start), _to_ns(settled)
+            for segment in sorted(segments, key=lambda s: s.start):
+                store = cache.read(segment)
+                if segment in cached_segments:
+                    cache.record(bytes_saved=segment.bytes)
+                stores.append(store)
+                chunks.extend(bytes(r) for r in store if start_ns <= r.ts_event < settled_ns)
+        finally:
+            cache.unpin(segments)
+
+        if settled < end:
+            tail = self.source.fetch(request, max(start, settled), end)
+            cache.record(api_calls=1, bytes_fetched=tail.nbytes)
+            stores.append(tail)
+            chunks.extend(bytes(r) for r in tail)
+
+        cache.save()
+        metadata = _with_mappings(stores[0].metadata, _merge_mappings(stores))
+        return db.DBNStore.from_bytes(bytes(metadata) + b"".join(chunks))
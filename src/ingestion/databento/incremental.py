@@ -0,0 +1,149 @@
+"""
+Watermark-based incremental sync for zl_futures_ohlcv
+Reads each symbol's high-water mark, refetches only the bars after it (plus a
+short overlap so revised bars are picked up) and upserts just those rows.
+Symbols with no rows yet fall back to a full windowed backfill.
+
+When an ingestion ledger is passed, watermarks come from its latest record
+per symbol (O(1) per source) and the table is only queried for symbols the
+ledger has never seen.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+import duckdb
+
+from src.ingestion.databento.backfill import (
+    DEFAULT_WINDOW_DAYS,
+    BackfillCheckpoint,
+    BackfillRequest,
+    run_backfill,
+)
+from src.ingestion.databento.motherduck import TABLE
+from src.ops.ingestion_ledger import CompletionRecord
+
+logger = logging.getLogger(__name__)
+
+# Databento can revise the last few daily bars (settlement corrections), so
+# every incremental pull re-reads a short tail that is already in the table.
+DEFAULT_OVERLAP_DAYS = 3
+
+# Logical size of one upserted row, counted the way BigQuery sizes columns:
+# date, volume and updated_at 8 bytes each, four NUMERIC prices 16 each and
+# the symbol STRING 2 + its length
+ROW_BYTES_SQL = "90 + strlen(symbol)"
+
+
+def ledger_source(symbol: str) -> str:
+    """Ledger source name for one symbol, e.g. ZL -> databento_zl"""
+    return "databento_" + symbol.lower().replace(".", "_")
+
+
+def read_watermarks(
+    con: duckdb.DuckDBPyConnection, symbols: Sequence[str], table: str = TABLE, ledger=None
+) -> Dict[str, Optional[date]]:
+    """Return the high-water mark per symbol, None for symbols with no rows"""
+    watermarks: Dict[str, Optional[date]] = {}
+    if ledger is not None:
+        latest = ledger.latest(ledger_source(s) for s in symbols)
+        for symbol in symbols:
+            rec = latest.get(ledger_source(symbol))
+            if rec is not None and rec.watermark_date is not None:
+                watermarks[symbol] = rec.watermark_date
+
+    missing = [s for s in symbols if s not in watermarks]
+    if missing:
+        placeholders = ", ".join("?" for _ in missing)
+        rows = con.execute(
+            f"SELECT symbol, MAX(date) FROM {table} WHERE symbol IN ({placeholders}) GROUP BY symbol",
+            missing,
+        ).fetchall()
+        found = dict(rows)
+        watermarks.update({symbol: found.get(symbol) for symbol in missing})
+    return {symbol: watermarks[symbol] for symbol in symbols}
+
+
+def run_started_at(con: duckdb.DuckDBPyConnection) -> datetime:
+    """Database-clock timestamp to pass to record_runs() after the load"""
+    return con.execute("SELECT CAST(CURRENT_TIMESTAMP AS TIMESTAMP)").fetchone()[0]
+
+
+def record_runs(
+    ledger,
+    con: duckdb.DuckDBPyConnection,
+    symbols: Sequence[str],
+    started_at: datetime,
+    duration_seconds: float,
+    table: str = TABLE,
+    errors: Optional[Dict[str, str]] = None,
+):
+    """Append one ledger record per symbol with its watermark, rows and bytes upserted this run"""
+    errors = errors or {}
+    placeholders = ", ".join("?" for _ in symbols)
+    # updated_at is reset by every INSERT OR REPLACE, so it identifies this run's rows
+    rows = con.execute(
+        f"""
+        SELECT symbol, MAX(date),
+               COUNT(*) FILTER (WHERE updated_at >= ?),
+               COALESCE(SUM({ROW_BYTES_SQL}) FILTER (WHERE updated_at >= ?), 0)
+        FROM {table} WHERE symbol IN ({placeholders}) GROUP BY symbol
+        """,
+        [started_at, started_at, *symbols],
+    ).fetchall()
+    summary: Dict[str, Tuple[date, int, int]] = {r[0]: (r[1], r[2], r[3]) for r in rows}
+
+    for symbol in symbols:
+        watermark, written, size = summary.get(symbol, (None, 0, 0))
+        ledger.record(CompletionRecord(
+            source=ledger_source(symbol),
+            table_name=table,
+            status="failed" if symbol in errors else "success",
+            watermark_date=watermark,
+            rows_ingested=written,
+            bytes_written=int(size),
+            duration_seconds=duration_seconds,
+            error_message=errors.get(symbol),
+        ))
+
+
+def run_incremental(
+    source,
+    sink,
+    con: duckdb.DuckDBPyConnection,
+    symbols: Sequence[str],
+    full_start: date,
+    end: date,
+    overlap_days: int = DEFAULT_OVERLAP_DAYS,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    checkpoint: Optional[BackfillCheckpoint] = None,
+    ledger=None,
+) -> int:
+    """Bring every symbol up to `end`, returning the number of rows upserted"""
+    watermarks = read_watermarks(con, symbols, sink.table, ledger=ledger)
+
+    # Group symbols sharing a start date so they go out as one API request
+    by_start = defaultdict(list)
+    for symbol, watermark in watermarks.items():
+        if watermark is None:
+            logger.info(f"  {symbol}: no rows yet, falling back to full backfill from {full_start}")
+            by_start[full_start].append(symbol)
+        else:
+            start = max(watermark - timedelta(days=overlap_days), full_start)
+            logger.info(f"  {symbol}: watermark {watermark}, syncing from {start}")
+            by_start[start].append(symbol)
+
+    total = 0
+    for start, group in sorted(by_start.items()):
+        if start >= end:
+            continue
+        request = BackfillRequest(symbols=tuple(group), start=start, end=end)
+        # Only full backfills are worth checkpointing; a short tail is just refetched
+        is_full = start == full_start
+        total += run_backfill(
+            source, sink, request,
+            window_days=window_days,
+            checkpoint=checkpoint if is_full else None,
+        )
+    return total
@@ -0,0 +1,112 @@
+"""
+MotherDuck / DuckDB target for Databento OHLCV bars
+"""
+import logging
+from typing import Optional
+
+import databento as db
+import duckdb
+import pandas as pd
+
+from src.ingestion.databento.arrow_loader import load_ohlcv_arrow
+
+logger = logging.getLogger(__name__)
+
+DATABASE = "usoil_intelligence"
+TABLE = "zl_futures_ohlcv"
+
+# Columns written by the loader, in table order. source and open_interest are
+# left to the table defaults; updated_at is set explicitly because INSERT OR
+# REPLACE only overwrites the columns it names.
+OHLCV_COLUMNS = ["date", "symbol", "open", "high", "low", "close", "volume"]
+
+
+def ohlcv_ddl(table: str = TABLE, temporary: bool = False) -> str:
+    """CREATE TABLE for `table` with the zl_futures_ohlcv columns and key"""
+    return f"""
+    CREATE {'TEMP ' if temporary else ''}TABLE IF NOT EXISTS {table} (
+        date DATE NOT NULL,
+        symbol VARCHAR NOT NULL,
+        open DECIMAL(10, 2),
+        high DECIMAL(10, 2),
+        low DECIMAL(10, 2),
+        close DECIMAL(10, 2) NOT NULL,
+        volume BIGINT,
+        open_interest BIGINT,
+        source VARCHAR DEFAULT 'databento',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (date, symbol)
+    )
+"""
+
+
+ZL_OHLCV_DDL = ohlcv_ddl()
+
+
+def connect(token: Optional[str] = None, database: Optional[str] = None) -> duckdb.DuckDBPyConnection:
+    """Connect to MotherDuck, or to a local DuckDB file when `database` is given"""
+    if database:
+        con = duckdb.connect(database)
+    else:
+        con = duckdb.connect(f"md:?motherduck_token={token}")
+        con.execute(f"CREATE DATABASE IF NOT EXISTS {DATABASE}")
+        con.execute(f"USE {DATABASE}")
+    con.execute(ZL_OHLCV_DDL)
+    return con
+
+
+def ohlcv_frame(store: db.DBNStore) -> pd.DataFrame:
+    """Map decoded OHLCV records onto the zl_futures_ohlcv columns"""
+    df = store.to_df()
+    if df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    return pd.DataFrame({
+        "date": df.index.date,
+        "symbol": df["symbol"].to_numpy(),
+        "open": df["open"].to_numpy(),
+        "high": df["high"].to_numpy(),
+        "low": df["low"].to_numpy(),
+        "close": df["close"].to_numpy(),
+        "volume": df["volume"].astype("int64").to_numpy(),
+    })
+
+
+class MotherDuckSink:
+    """Upserts decoded Databento windows into zl_futures_ohlcv
+
+    `loader="arrow"` (default) streams records through Arrow record batches;
+    `loader="pandas"` is the original DataFrame path, kept for comparison.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, table: str = TABLE, loader: str = "arrow"):
+        if loader not in ("arrow", "pandas"):
+            raise ValueError(f"Unknown loader: {loader}")
+        self.con = con
+        self.table = table
+        self.loader = loader
+
+    def write(self, store: db.DBNStore) -> int:
+        """Upsert one window of bars, returning the number of rows written"""
+        if self.loader == "arrow":
+            return load_ohlcv_arrow(self.con, store, self.table)
+
+        frame = ohlcv_frame(store)
+        if frame.empty:
+            return 0
+
+        columns = ", ".join(OHLCV_COLUMNS)
+        self.con.register("ohlcv_window", frame)
+        try:
+            self.con.execute(f"""
+                INSERT OR REPLACE INTO {self.table} ({columns}, updated_at)
+                SELECT {columns}, CURRENT_TIMESTAMP FROM ohlcv_window
+            """)
+        finally:
+            self.con.unregister("ohlcv_window")
+        return len(frame)
+
+    def summary(self):
+        """Return (row_count, min_date, max_date) for the target table"""
+        return self.con.execute(
+            f"SELECT COUNT(*), MIN(date), MAX(date) FROM {self.table}"
+        ).fetchone()
@@ -0,0 +1,230 @@
+"""
+Concurrent multi-symbol Databento ingestion
+Each symbol is synced from its own watermark on a bounded worker pool, with a
+per-provider rate limit and per-symbol retries of transient errors. Symbols
+without history get the same windowed, checkpointed backfill as
+backfill.run_backfill, so a new symbol never turns into one multi-year
+request. Every window is inserted as soon as it arrives into a temporary
+staging table on the shared connection (writes are serialized), so memory
+stays bounded by the windows in flight, and the staged rows are merged into
+the target table in one transaction at the end of the cycle. A failing
+symbol is reported in its own result instead of failing the cycle: its
+staged rows are dropped before the merge, and checkpoints only advance once
+the merge has committed, so the next cycle refetches it from its last
+committed watermark or checkpoint.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import duckdb
+import requests
+from databento.common.error import BentoHttpError, BentoServerError
+
+from src.ingestion.databento.backfill import (
+    DEFAULT_WINDOW_DAYS,
+    BackfillCheckpoint,
+    BackfillRequest,
+    run_backfill,
+)
+from src.ingestion.databento.incremental import DEFAULT_OVERLAP_DAYS, read_watermarks
+from src.ingestion.databento.motherduck import OHLCV_COLUMNS, MotherDuckSink, ohlcv_ddl
+from src.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+# Databento Historical allows a modest request rate per key; stay well under it
+PROVIDER_LIMITS = {
+    "databento": RateLimiter(rate=5, burst=5),
+}
+
+# Timeouts, rate limiting and server errors clear up on their own; other
+# client errors (auth, unknown symbol, bad range) will not
+RETRY_STATUSES = {408, 429}
+
+
+@dataclass
+class SymbolResult:
+    symbol: str
+    status: str  # "ok" | "failed"
+    rows: int = 0
+    attempts: int = 0
+    start: Optional[date] = None
+    end: Optional[date] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, BentoHttpError):
+        return isinstance(error, BentoServerError) or error.http_status in RETRY_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout))
+
+
+class _RetryingSource:
+    """Rate-limited source that retries transient errors, counting attempts on `result`"""
+
+    def __init__(self, source, limiter: RateLimiter, retries: int, backoff: float, result: SymbolResult):
+        self.source = source
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.result = result
+
+    def fetch(self, request: BackfillRequest, start: date, end: date):
+        for attempt in range(1, self.retries + 1):
+            self.result.attempts += 1
+            self.limiter.acquire()
+            try:
+                return self.source.fetch(request, start, end)
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1) * (1 + random.random())
+                logger.warning(f"  {request.symbols[0]}: attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+
+class _SymbolSink:
+    """Writes one symbol's windows through the shared staging sink, one at a time, counting rows"""
+
+    def __init__(self, sink, lock: threading.Lock, result: SymbolResult):
+        self.sink = sink
+        self.table = sink.table
+        self.lock = lock
+        self.result = result
+
+    def write(self, store) -> int:
+        # The DuckDB connection is shared by every worker
+        with self.lock:
+            rows = self.sink.write(store)
+        self.result.rows += rows
+        return rows
+
+    def discard(self):
+        """Drop everything this symbol staged"""
+        with self.lock:
+            self.sink.con.execute(f"DELETE FROM {self.table} WHERE symbol = ?", [self.result.symbol])
+        self.result.rows = 0
+
+
+class _PendingCheckpoint:
+    """Checkpoint view that holds advances back until the cycle's merge commits"""
+
+    def __init__(self, checkpoint: BackfillCheckpoint):
+        self.checkpoint = checkpoint
+        self.path = checkpoint.path
+        self.advances = []
+
+    def completed_through(self, key: str) -> Optional[date]:
+        return self.checkpoint.completed_through(key)
+
+    def advance(self, key: str, window_end: date, rows: int):
+        self.advances.append((key, window_end, rows))
+
+    def commit(self):
+        for key, window_end, rows in self.advances:
+            self.checkpoint.advance(key, window_end, rows)
+
+
+def _merge(con: duckdb.DuckDBPyConnection, staging: str, table: str):
+    """Move every staged row into `table` in one transaction"""
+    columns = ", ".join(OHLCV_COLUMNS + ["updated_at"])
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(f"INSERT OR REPLACE INTO {table} ({columns}) SELECT {columns} FROM {staging}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+
+def run_cycle(
+    source,
+    sink,
+    con: duckdb.DuckDBPyConnection,
+    symbols: Sequence[str],
+    full_start: date,
+    end: date,
+    provider: str = "databento",
+    max_workers: int = DEFAULT_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+    overlap_days: int = DEFAULT_OVERLAP_DAYS,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    checkpoint: Optional[BackfillCheckpoint] = None,
+    ledger=None,
+) -> List[SymbolResult]:
+    """Sync every symbol up to `end` and return one result per symbol"""
+    limiter = PROVIDER_LIMITS[provider]
+    watermarks = read_watermarks(con, symbols, sink.table, ledger=ledger)
+    write_lock = threading.Lock()
+    staging = f"{sink.table}_cycle"
+    con.execute(f"DROP TABLE IF EXISTS {staging}")
+    con.execute(ohlcv_ddl(staging, temporary=True))
+    staging_sink = MotherDuckSink(con, staging, loader=sink.loader)
+    sinks: Dict[str, _SymbolSink] = {}
+    pending: Dict[str, _PendingCheckpoint] = {}
+
+    results: Dict[str, SymbolResult] = {}
+    requests_by_symbol = {}
+    for symbol in symbols:
+        watermark = watermarks[symbol]
+        start = full_start if watermark is None else max(watermark - timedelta(days=overlap_days), full_start)
+        results[symbol] = SymbolResult(symbol=symbol, status="ok", start=start, end=end)
+        if start < end:
+            requests_by_symbol[symbol] = BackfillRequest(symbols=(symbol,), start=start, end=end)
+            sinks[symbol] = _SymbolSink(staging_sink, write_lock, results[symbol])
+            # Only full backfills are worth checkpointing; a short tail is just refetched
+            if checkpoint is not None and watermark is None:
+                pending[symbol] = _PendingCheckpoint(checkpoint)
+
+    def sync(symbol):
+        result = results[symbol]
+        started = time.perf_counter()
+        if watermarks[symbol] is None:
+            logger.info(f"  {symbol}: no rows yet, windowed backfill from {full_start}")
+        try:
+            run_backfill(
+                _RetryingSource(source, limiter, retries, backoff, result),
+                sinks[symbol],
+                requests_by_symbol[symbol],
+                window_days=window_days,
+                checkpoint=pending.get(symbol),
+            )
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            sinks[symbol].discard()
+            pending.pop(symbol, None)
+            logger.error(f"  ❌ {symbol}: {e}")
+        finally:
+            result.seconds = time.perf_counter() - started
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(sync, requests_by_symbol))
+        _merge(con, staging, sink.table)
+    except Exception as e:
+        logger.error(f"  ❌ Cycle merge into {sink.table} failed: {e}")
+        for symbol in requests_by_symbol:
+            result = results[symbol]
+            if result.status == "ok":
+                result.status, result.error, result.rows = "failed", f"merge failed: {e}", 0
+        return [results[symbol] for symbol in symbols]
+    finally:
+        con.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    for symbol, view in pending.items():
+        if results[symbol].status == "ok":
+            view.commit()
+    return [results[symbol] for symbol in symbols]
@@ -0,0 +1,169 @@
+"""
+Async paginated fetcher for the Glide events API
+Pages are requested by offset over one pooled aiohttp session, with at most
+`concurrency` pages in flight. Each page is handed to the caller as soon as
+it arrives, so memory is bounded by the in-flight pages rather than the size
+of the catalog. Transient failures (connection errors, timeouts, 429, 5xx)
+are retried with exponential backoff and full jitter, honouring Retry-After.
+
+The base URL is a parameter (or GLIDE_API_URL), so the fetcher can be pointed
+at a local HTTP stand-in.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+GLIDE_API_URL = os.getenv("GLIDE_API_URL", "https://api.glide.app/api/v1")
+EVENTS_PATH = "/events"
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Hard stop for a catalog that never returns a short page
+DEFAULT_MAX_PAGES = 10_000
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GlideAPIError(Exception):
+    """A page could not be fetched after all retries (or failed permanently)"""
+
+
+class _TransientStatus(Exception):
+    def __init__(self, status: int, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status}")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Page:
+    offset: int
+    records: List[dict]
+    attempts: int = 1
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF_SECONDS, cap: float = MAX_BACKOFF_SECONDS) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    offset: int,
+    page_size: int,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+) -> Page:
+    """GET one page of records, retrying transient failures"""
+    params = {"limit": page_size, "offset": offset}
+    for attempt in range(1, retries + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status in RETRY_STATUSES:
+                    raise _TransientStatus(response.status, _retry_after(response))
+                if response.status >= 400:
+                    # Auth / bad request errors will not fix themselves
+                    raise GlideAPIError(f"HTTP {response.status} at offset {offset}: {await response.text()}")
+                payload = await response.json(content_type=None)
+                return Page(offset, (payload or {}).get("data") or [], attempt)
+        except (aiohttp.ClientError, asyncio.TimeoutError, _TransientStatus) as e:
+            if attempt == retries:
+                raise GlideAPIError(f"offset {offset}: {e!r} after {attempt} attempts") from e
+            wait = max(getattr(e, "retry_after", None) or 0.0, backoff_delay(attempt - 1, backoff))
+            logger.warning(f"  offset {offset}: attempt {attempt} failed ({e!r}), retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
+    raise GlideAPIError(f"offset {offset}: no attempts made")
+
+
+async def iter_pages(
+    api_key: str,
+    base_url: str = GLIDE_API_URL,
+    path: str = EVENTS_PATH,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    headers: Optional[Dict[str, str]] = None,
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> AsyncIterator[Page]:
+    """Yield non-empty pages as they complete (not in offset order)
+
+    A sliding window keeps `concurrency` offsets in flight; the first short
+    page marks the end of the catalog and nothing past it is scheduled.
+    Paging also stops at a page larger than `page_size` (the API ignored the
+    limit), at a page identical to the one before it (the API ignored the
+    offset) and after `max_pages` pages.
+    """
+    url = base_url.rstrip("/") + path
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    session_headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", **(headers or {})}
+    async with aiohttp.ClientSession(
+        connector=connector, headers=session_headers, timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as session:
+        in_flight = set()
+        next_offset = 0
+        end_offset = max_pages * page_size
+        digests: Dict[int, str] = {}
+
+        def stop_at(offset: int, reason: str):
+            nonlocal end_offset
+            if offset < end_offset:
+                logger.warning(f"⚠️  Stopping at offset {offset}: {reason}")
+                end_offset = offset
+
+        def schedule():
+            nonlocal next_offset
+            while len(in_flight) < concurrency and next_offset < end_offset:
+                in_flight.add(asyncio.create_task(fetch_page(session, url, next_offset, page_size, retries, backoff)))
+                next_offset += page_size
+
+        try:
+            schedule()
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    page = task.result()
+                    if len(page.records) < page_size:
+                        end_offset = min(end_offset, page.offset + len(page.records))
+                    elif len(page.records) > page_size:
+                        # Nothing after this page can be trusted to be new
+                        stop_at(page.offset + 1, f"{len(page.records)} records for a limit of {page_size}")
+                    else:
+                        digest = hashlib.sha1(json.dumps(page.records, sort_keys=True, default=str).encode()).hexdigest()
+                        digests[page.offset] = digest
+                        for neighbour in (page.offset - page_size, page.offset + page_size):
+                            if digests.get(neighbour) == digest:
+                                stop_at(max(page.offset, neighbour), "page repeats the previous one")
+                    if page.records and page.offset < end_offset:
+                        yield page
+                schedule()
+            if next_offset >= max_pages * page_size and end_offset == max_pages * page_size:
+                logger.warning(f"⚠️  Stopped at the {max_pages:,}-page cap; the catalog may be incomplete")
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
@@ -0,0 +1,309 @@
+"""
+Buffered bulk-write sink shared by the ingesters
+Producers hand rows (dicts or Arrow tables) to a BulkSink, which buffers them
+into batches bounded by rows, bytes and age, drops duplicate natural keys
+within each batch (last write wins) and hands every batch to one backend:
+
+- BigQueryLoadBackend: batch serialized to NDJSON or Parquet and loaded with
+  a load job (no streaming-insert charges); with key columns it loads into a
+  staging table and MERGEs, so re-collected rows update instead of duplicating
+- DuckDBBackend: INSERT OR REPLACE straight from the Arrow batch
+- MotherDuckBackend: the DuckDB backend on its own MotherDuck connection
+
+Batches are written on a background thread. At most `max_pending` full
+batches wait for it; beyond that write() blocks, which is the backpressure
+that keeps a fast producer from outrunning the backend.
+"""
+import io
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.utils.query_guard import get_gateway
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ROWS = 50_000
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+DEFAULT_MAX_SECONDS = 30.0
+DEFAULT_MAX_PENDING = 2
+
+Rows = Union[Sequence[dict], pa.Table, pa.RecordBatch]
+
+_STOP = object()
+
+
+@dataclass
+class SinkStats:
+    rows_in: int = 0
+    rows_written: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    bytes_written: int = 0
+    write_seconds: float = 0.0
+
+
+def dedupe(table: pa.Table, key_columns: Sequence[str]) -> pa.Table:
+    """Keep the last row per natural key, in the order those rows arrived"""
+    if not key_columns or table.num_rows < 2:
+        return table
+    indexed = table.append_column("__row", pa.array(range(table.num_rows), pa.int64()))
+    last = indexed.group_by(list(key_columns), use_threads=False).aggregate([("__row", "max")])["__row_max"]
+    if len(last) == table.num_rows:
+        return table
+    return table.take(pc.take(last, pc.sort_indices(last)))
+
+
+def to_ndjson(table: pa.Table) -> bytes:
+    return "".join(json.dumps(row, default=str) + "\n" for row in table.to_pylist()).encode("utf-8")
+
+
+def to_parquet(table: pa.Table) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+class BigQueryLoadBackend:
+    """Load jobs into a BigQuery table, MERGEd on the natural key when one is given"""
+
+    def __init__(self, client, table_id: str, source_format: str = "NDJSON"):
+        if source_format not in ("NDJSON", "PARQUET"):
+            raise ValueError(f"Unknown source format: {source_format}")
+        self.client = client
+        self.table_id = table_id
+        self.source_format = source_format
+        self._schema = None
+
+    def _load(self, table: pa.Table, table_id: str, disposition: str):
+        from google.cloud import bigquery
+
+        if self._schema is None:
+            self._schema = self.client.get_table(self.table_id).schema
+        payload = to_parquet(table) if self.source_format == "PARQUET" else to_ndjson(table)
+        job_config = bigquery.LoadJobConfig(
+            source_format=(bigquery.SourceFormat.PARQUET if self.source_format == "PARQUET"
+                           else bigquery.SourceFormat.NEWLINE_DELIMITED_JSON),
+            write_disposition=disposition,
+            schema=self._schema,
+            ignore_unknown_values=True,
+        )
+        self.client.load_table_from_file(io.BytesIO(payload), table_id, job_config=job_config).result()
+        return len(payload)
+
+    def write(self, table: pa.Table, key_columns: Sequence[str] = ()) -> int:
+        if not key_columns:
+            return self._load(table, self.table_id, "WRITE_APPEND")
+
+        staging = f"{self.table_id}__sink_{uuid.uuid4().hex[:12]}"
+        try:
+            size = self._load(table, staging, "WRITE_TRUNCATE")
+            columns = [f.name for f in self._schema if f.name in table.column_names]
+            on = " AND ".join(f"t.{k} = s.{k}" for k in key_columns)
+            # The MERGE reads the whole target; it still goes through the guard's estimate and ledger
+            get_gateway(self.table_id.split(".")[0], self.client).query(f"""
+                MERGE `{self.table_id}` t
+                USING `{staging}` s
+                ON {on}
+                WHEN MATCHED THEN UPDATE SET {', '.join(f'{c} = s.{c}' for c in columns if c not in key_columns)}
+                WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join(f's.{c}' for c in columns)})
+            """, allow_full_scan=True, label=f"merge {self.table_id}")
+            return size
+        finally:
+            self.client.delete_table(staging, not_found_ok=True)
+
+
+class DuckDBBackend:
+    """INSERT OR REPLACE into a DuckDB table with a primary key
+
+    By default writes go through a cursor of `con`, which is safe to use from
+    the sink's writer thread; pass cursor=False for a synchronous sink that
+    should write inside the caller's transaction.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, table: str, cursor: bool = True):
+        self.con = con.cursor() if cursor else con
+        self.table = table
+
+    def write(self, table: pa.Table, key_columns: Sequence[str] = ()) -> int:
+        columns = ", ".join(table.column_names)
+        verb = "INSERT OR REPLACE" if key_columns else "INSERT"
+        self.con.register("sink_batch", table)
+        try:
+            self.con.execute(f"{verb} INTO {self.table} ({columns}) SELECT {columns} FROM sink_batch")
+        finally:
+            self.con.unregister("sink_batch")
+        return table.nbytes
+
+
+class MotherDuckBackend(DuckDBBackend):
+    """DuckDB backend on a dedicated MotherDuck connection"""
+
+    def __init__(self, token: str, table: str, database: Optional[str] = None):
+        from src.ingestion.databento.motherduck import DATABASE
+
+        con = duckdb.connect(f"md:?motherduck_token={token}")
+        con.execute(f"CREATE DATABASE IF NOT EXISTS {database or DATABASE}")
+        con.execute(f"USE {database or DATABASE}")
+        super().__init__(con, table, cursor=False)
+
+
+class BulkSink:
+    """Buffers rows into bounded, deduplicated batches for one backend
+
+    Use as a context manager (or call close()) so the last partial batch is
+    written; errors from the writer thread are re-raised on the next
+    write(), flush() or close().
+    """
+
+    def __init__(
+        self,
+        backend,
+        key_columns: Sequence[str] = (),
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        background: bool = True,
+    ):
+        self.backend = backend
+        self.key_columns = tuple(key_columns)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.stats = SinkStats()
+
+        self._buffer = []
+        self._buffer_rows = 0
+        self._buffer_bytes = 0
+        self._buffer_since = None
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._queue: Optional[queue.Queue] = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, name="bulk-sink", daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, rows: Rows):
+        """Add rows; blocks while the writer is `max_pending` batches behind"""
+        self._raise_pending_error()
+        if isinstance(rows, pa.RecordBatch):
+            table = pa.Table.from_batches([rows])
+        elif isinstance(rows, pa.Table):
+            table = rows
+        else:
+            if not rows:
+                return
+            table = pa.Table.from_pylist(list(rows))
+        if not table.num_rows:
+            return
+
+        with self._lock:
+            self._buffer.append(table)
+            self._buffer_rows += table.num_rows
+            self._buffer_bytes += table.nbytes
+            self._buffer_since = self._buffer_since or time.monotonic()
+            self.stats.rows_in += table.num_rows
+            batch = self._cut() if self._full() else None
+        if batch is not None:
+            self._submit(batch)
+
+    def _full(self) -> bool:
+        return (
+            self._buffer_rows >= self.max_rows
+            or self._buffer_bytes >= self.max_bytes
+            or (self._buffer_since is not None and time.monotonic() - self._buffer_since >= self.max_seconds)
+        )
+
+    def _cut(self) -> Optional[pa.Table]:
+        """Take the buffer as one table (call with the lock held)"""
+        if not self._buffer:
+            return None
+        batch = pa.concat_tables(self._buffer, promote_options="permissive")
+        self._buffer, self._buffer_rows, self._buffer_bytes, self._buffer_since = [], 0, 0, None
+        return batch
+
+    def _submit(self, batch: pa.Table):
+        if self._queue is None:
+            self._write_batch(batch)
+        else:
+            self._queue.put(batch)
+
+    def _write_batch(self, batch: pa.Table):
+        started = time.perf_counter()
+        unique = dedupe(batch, self.key_columns)
+        written = self.backend.write(unique, self.key_columns)
+        self.stats.duplicates += batch.num_rows - unique.num_rows
+        self.stats.rows_written += unique.num_rows
+        self.stats.bytes_written += written or 0
+        self.stats.batches += 1
+        self.stats.write_seconds += time.perf_counter() - started
+        logger.info(f"  {unique.num_rows:,} rows flushed ({batch.num_rows - unique.num_rows} duplicates dropped)")
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=max(self.max_seconds, 0.1))
+            except queue.Empty:
+                # Idle producer: write out a buffer that has aged past max_seconds
+                with self._lock:
+                    item = self._cut() if self._buffer and self._full() else None
+                if item is not None:
+                    self._write_safely(item)
+                continue
+            try:
+                if item is _STOP:
+                    return
+                self._write_safely(item)
+            finally:
+                self._queue.task_done()
+
+    def _write_safely(self, batch: pa.Table):
+        if self._error is not None:
+            return  # a batch already failed; the error is raised to the producer
+        try:
+            self._write_batch(batch)
+        except BaseException as e:
+            logger.error(f"  ❌ Bulk write failed: {e}")
+            self._error = e
+
+    def flush(self):
+        """Write everything buffered so far and wait until it is stored"""
+        with self._lock:
+            batch = self._cut()
+        if batch is not None:
+            self._submit(batch)
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_pending_error()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join()
@@ -0,0 +1,231 @@
+"""
+Keyword bucket assignment for news posts (theme_primary, is_trump_related,
+policy_axis on raw.scrapecreators_news_buckets)
+Every keyword of every bucket is compiled into one Aho-Corasick automaton, so
+a post is tagged for all buckets in a single pass however long the keyword
+lists grow. The automaton runs over word tokens rather than characters: the
+tokenizer is one C-level regex scan, keywords only match on word boundaries
+("rin" never fires inside "bring"), and multi-word phrases such as
+"panama canal" are just longer patterns. Keywords and text go through the
+same tokenizer, which folds plural endings to the singular ("tariffs",
+"crops", "duties"), so keyword lists only need the singular form.
+
+Buckets follow docs/features/news-bucket-deep-review.md: 7 thematic buckets,
+plus a Trump tag with a policy axis instead of a separate Trump bucket.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Thematic buckets, in tie-break order for theme_primary
+THEME_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "SUPPLY_WEATHER": ("drought", "flood", "harvest", "yield", "usda", "wasde", "crop", "planting", "frost", "la nina", "el nino"),
+    "DEMAND_BIOFUELS": ("biodiesel", "renewable diesel", "rfs", "rvo", "rin", "renewable fuel", "45z", "sustainable aviation fuel", "crush"),
+    "TRADE_GEO": ("tariff", "sanction", "export", "import", "quota", "trade", "trade war", "ustr", "section 301", "china"),
+    "MACRO_FX": ("fed", "cpi", "dollar", "dxy", "rate", "inflation", "brl", "recession"),
+    "LOGISTICS": ("panama canal", "mississippi", "port", "freight", "barge", "shipping", "rail", "strike"),
+    "POSITIONING": ("cftc", "cot", "positioning", "speculator", "managed money", "net long", "net short"),
+    "IDIOSYNCRATIC": ("adm", "bunge", "wilmar", "cargill", "fire", "outage", "explosion", "plant closure"),
+}
+
+TRUMP_KEYWORDS: Tuple[str, ...] = ("trump", "white house", "truth social", "president trump", "trump administration")
+
+# Policy axes for Trump-related posts, in tie-break order
+POLICY_AXIS_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "TRADE_CHINA": ("china", "beijing", "xi", "phase one", "chinese"),
+    "TRADE_TARIFFS": ("tariff", "section 301", "duty", "trade war", "retaliation"),
+    "BIOFUELS_RFS": ("rfs", "rvo", "biodiesel", "renewable fuel", "rin", "small refinery exemption", "45z"),
+    "EPA_REGS": ("epa", "emission", "regulation", "waiver"),
+    "AGRICULTURE_SUBSIDY": ("subsidy", "farm aid", "bailout", "ccc", "farmer", "farm bill"),
+    "GEOPOLITICS_SOY_ROUTE": ("brazil", "argentina", "panama", "red sea", "strait", "sanction"),
+}
+
+TRUMP_BUCKET = "TRUMP"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# -ies -> -y, -es after ch / sh / ss / x / z, else a final -s (not -ss, -us,
+# -is); stems shorter than three characters ("us", "gas", "rfs") are kept
+_PLURAL = re.compile(r"\b([a-z0-9]{3,}?)(?:(ies)|(?<=ch|sh|ss)es|(?<=[xz])es|(?<![sui])s)\b")
+
+
+def _singular(m: re.Match) -> str:
+    return m.group(1) + "y" if m.group(2) else m.group(1)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with plural endings folded to the singular"""
+    return _TOKEN.findall(_PLURAL.sub(_singular, text.lower()))
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over word tokens; each pattern carries a label"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        self.labels: List[str] = []      # pattern id -> label
+        self.keywords: List[str] = []    # pattern id -> keyword
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword, label in patterns:
+            state = 0
+            for token in tokenize(keyword):
+                nxt = goto[state].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][token] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            if state:
+                outputs[state].append(len(self.labels))
+                self.labels.append(label)
+                self.keywords.append(keyword)
+
+        # Failure links breadth-first; outputs inherit along them so a match
+        # of "trade war" also reports the shorter pattern "war" when one exists
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for token, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(token, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(o) for o in outputs]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def matches(self, tokens: Sequence[str]) -> List[int]:
+        """Pattern ids matched in `tokens` (with repeats), in one pass"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        root = goto[0]
+        state, found = 0, []
+        for token in tokens:
+            if state:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            else:
+                # Most tokens of ordinary prose miss at the root
+                state = root.get(token, 0)
+                if not state:
+                    continue
+            if outputs[state]:
+                found.extend(outputs[state])
+        return found
+
+
+@dataclass
+class BucketAssignment:
+    theme_primary: Optional[str]
+    themes: Tuple[str, ...]              # every thematic bucket that matched
+    is_trump_related: bool
+    policy_axis: Optional[str]
+    hits: Dict[str, int] = field(default_factory=dict)   # keyword hits per bucket / axis
+
+
+@dataclass
+class BucketStats:
+    posts: int = 0
+    unassigned: int = 0
+    bucket_posts: Counter = field(default_factory=Counter)   # posts tagged per bucket / axis
+    keyword_hits: Counter = field(default_factory=Counter)   # raw matches per keyword
+    seconds: float = 0.0
+
+    @property
+    def posts_per_second(self) -> float:
+        return self.posts / self.seconds if self.seconds else 0.0
+
+
+def _ranked(hits: Counter, order: Sequence[str]) -> Optional[str]:
+    """Label with the most hits, earlier in `order` on ties"""
+    ranked = [label for label in order if hits.get(label)]
+    return max(ranked, key=lambda label: hits[label]) if ranked else None
+
+
+class BucketClassifier:
+    """Assigns theme, Trump tag and policy axis with one automaton pass per post"""
+
+    def __init__(
+        self,
+        themes: Dict[str, Sequence[str]] = THEME_KEYWORDS,
+        trump: Sequence[str] = TRUMP_KEYWORDS,
+        policy_axes: Dict[str, Sequence[str]] = POLICY_AXIS_KEYWORDS,
+    ):
+        self.theme_order = list(themes)
+        self.axis_order = list(policy_axes)
+        patterns = [(kw, ("theme", name)) for name, kws in themes.items() for kw in kws]
+        patterns += [(kw, ("trump", TRUMP_BUCKET)) for kw in trump]
+        patterns += [(kw, ("axis", name)) for name, kws in policy_axes.items() for kw in kws]
+        self.automaton = KeywordAutomaton(patterns)
+        self.stats = BucketStats()
+
+    def classify_text(self, text: str) -> BucketAssignment:
+        # Counter() tallies the raw matches in C; the Python loop below only
+        # sees distinct patterns, usually a handful per post
+        matched = Counter(self.automaton.matches(tokenize(text)))
+        labels, keywords = self.automaton.labels, self.automaton.keywords
+        themes, axes = Counter(), Counter()
+        trump = 0
+        for pid, n in matched.items():
+            kind, name = labels[pid]
+            if kind == "theme":
+                themes[name] += n
+            elif kind == "axis":
+                axes[name] += n
+            else:
+                trump += n
+            self.stats.keyword_hits[keywords[pid]] += n
+
+        is_trump = trump > 0
+        assignment = BucketAssignment(
+            theme_primary=_ranked(themes, self.theme_order),
+            themes=tuple(t for t in self.theme_order if themes[t]),
+            is_trump_related=is_trump,
+            policy_axis=_ranked(axes, self.axis_order) if is_trump else None,
+            hits={**themes, **({TRUMP_BUCKET: trump} if is_trump else {}), **(axes if is_trump else {})},
+        )
+        stats = self.stats
+        stats.posts += 1
+        if assignment.themes:
+            stats.bucket_posts.update(assignment.themes)
+        elif not is_trump:
+            stats.unassigned += 1
+        if is_trump:
+            stats.bucket_posts[TRUMP_BUCKET] += 1
+            if assignment.policy_axis:
+                stats.bucket_posts[assignment.policy_axis] += 1
+        return assignment
+
+    def classify_batch(self, posts: Sequence[dict], fields: Sequence[str] = ("headline", "content")) -> List[BucketAssignment]:
+        """One assignment per post, from the concatenated text `fields`"""
+        started = time.perf_counter()
+        out = [self.classify_text(" ".join(post.get(f) or "" for f in fields)) for post in posts]
+        self.stats.seconds += time.perf_counter() - started
+        return out
+
+    def classify_stream(
+        self, batches: Iterable[Sequence[dict]], fields: Sequence[str] = ("headline", "content")
+    ) -> Iterator[List[BucketAssignment]]:
+        """Lazily classify an iterable of post batches, one result list per batch"""
+        for batch in batches:
+            yield self.classify_batch(batch, fields)
+
+    def report(self) -> str:
+        lines = [f"{self.stats.posts:,} posts, {self.stats.posts_per_second:,.0f} posts/s, "
+                 f"{self.stats.unassigned:,} unassigned"]
+        for bucket in [*self.theme_order, TRUMP_BUCKET, *self.axis_order]:
+            if self.stats.bucket_posts[bucket]:
+                lines.append(f"  {bucket:<24} {self.stats.bucket_posts[bucket]:>8,}")
+        return "\n".join(lines)
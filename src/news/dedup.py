@@ -0,0 +1,277 @@
+"""
+Near-duplicate detection for syndicated news and Trump posts
+Each document is reduced to a MinHash signature over word shingles and
+looked up in an LSH index (signature split into bands, one hash table per
+band), so a lookup costs `bands` dictionary probes however large the index
+grows. Candidates sharing a band are confirmed by estimated Jaccard
+similarity; a match joins the existing cluster, anything else founds a new
+one with itself as the canonical document. Documents without any words are
+their own cluster and are never indexed (all empty texts would match), and a
+doc_id that was already assigned is returned as-is rather than counted again.
+
+Clusters (canonical id, count, signature) and memberships persist in DuckDB.
+On startup the band tables are rebuilt from the stored signatures of
+clusters seen within `retention_days` of the newest one (syndication
+happens within days), which keeps memory bounded by recent clusters rather
+than all history.
+"""
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import duckdb
+import numpy as np
+
+from src.news.buckets import tokenize
+
+logger = logging.getLogger(__name__)
+
+CLUSTERS_TABLE = "news_dedup_clusters"
+MEMBERS_TABLE = "news_dedup_members"
+
+NUM_PERM = 128
+BANDS = 32                 # 32 bands x 4 rows: ~99% of pairs at Jaccard 0.6 become candidates
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.6    # estimated Jaccard to the canonical copy needed to join a cluster
+DEFAULT_RETENTION_DAYS = 30
+
+_PRIME = np.uint64((1 << 31) - 1)
+_SEED = 20251128           # fixed: signatures must be comparable across runs
+
+DEDUP_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CLUSTERS_TABLE} (
+        cluster_id VARCHAR PRIMARY KEY,      -- canonical document id
+        doc_count INTEGER,
+        first_seen TIMESTAMP,
+        last_seen TIMESTAMP,
+        signature BLOB
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {MEMBERS_TABLE} (
+        doc_id VARCHAR PRIMARY KEY,
+        cluster_id VARCHAR,
+        is_duplicate BOOLEAN,
+        similarity DOUBLE,
+        seen_at TIMESTAMP
+    )
+    """,
+]
+
+
+@dataclass
+class DedupResult:
+    doc_id: str
+    cluster_id: str
+    is_duplicate: bool
+    similarity: float          # estimated Jaccard to the canonical document (1.0 for canonicals)
+    cluster_count: int
+
+
+@dataclass
+class DedupStats:
+    docs: int = 0
+    duplicates: int = 0
+    new_clusters: int = 0
+    candidates: int = 0        # signatures compared after the LSH probe
+    empty: int = 0             # no words to compare; always their own cluster
+    repeated: int = 0          # doc_ids already assigned, not counted again
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.docs if self.docs else 0.0
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, stable across processes"""
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE, seed: int = _SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+        self.shingle_size = shingle_size
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        k = self.shingle_size
+        grams = [" ".join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))]
+        # crc32, not hash(): Python string hashes are salted per process
+        return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)))
+
+    def signature(self, text: str) -> np.ndarray:
+        x = self.shingles(text) % _PRIME
+        # a, x < 2^31, so a * x + b stays inside uint64
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Streaming MinHash/LSH clustering with a DuckDB-backed signature index"""
+
+    def __init__(
+        self,
+        con: Optional[duckdb.DuckDBPyConnection] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.con = con
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.stats = DedupStats()
+
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._first_seen: Dict[str, datetime] = {}
+        self._last_seen: Dict[str, datetime] = {}
+        self._pending_members: List[tuple] = []
+        self._dirty: set = set()
+        # Assignments not yet flushed (all of them without a connection)
+        self._assigned: Dict[str, DedupResult] = {}
+        if con is not None:
+            for ddl in DEDUP_DDL:
+                con.execute(ddl)
+            self._load(retention_days)
+
+    def _load(self, retention_days: int):
+        # Anchored on the newest stored cluster, not the wall clock, so a
+        # historical backfill still sees its own recent clusters
+        latest = self.con.execute(f"SELECT MAX(last_seen) FROM {CLUSTERS_TABLE}").fetchone()[0]
+        if latest is None:
+            return
+        since = latest - timedelta(days=retention_days)
+        rows = self.con.execute(
+            f"SELECT cluster_id, doc_count, first_seen, last_seen, signature FROM {CLUSTERS_TABLE} WHERE last_seen >= ?",
+            [since],
+        ).fetchall()
+        for cluster_id, count, first_seen, last_seen, blob in rows:
+            self._insert(cluster_id, np.frombuffer(blob, dtype=np.uint32), count, first_seen, last_seen)
+        logger.info(f"  Loaded {len(rows):,} clusters seen since {since:%Y-%m-%d}")
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, cluster_id: str, signature: np.ndarray, count: int, first_seen, last_seen):
+        self._signatures[cluster_id] = signature
+        self._counts[cluster_id] = count
+        self._first_seen[cluster_id] = first_seen
+        self._last_seen[cluster_id] = last_seen
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(cluster_id)
+
+    def _best_match(self, signature: np.ndarray) -> Tuple[Optional[str], float]:
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        self.stats.candidates += len(candidates)
+        best, best_similarity = None, 0.0
+        for cluster_id in candidates:
+            similarity = float(np.mean(self._signatures[cluster_id] == signature))
+            if similarity > best_similarity:
+                best, best_similarity = cluster_id, similarity
+        return (best, best_similarity) if best_similarity >= self.threshold else (None, best_similarity)
+
+    def add(self, doc_id: str, text: str, seen_at: Optional[datetime] = None) -> DedupResult:
+        """Assign one document to a cluster (the earliest copy is the canonical one)"""
+        known = self._assigned.get(doc_id)
+        if known is not None:
+            self.stats.repeated += 1
+            return known
+        seen_at = seen_at or datetime.utcnow()
+        self.stats.docs += 1
+        if not tokenize(text or ""):
+            self.stats.empty += 1
+            self.stats.new_clusters += 1
+            # Membership only: an indexed empty signature would match every other empty document
+            result = DedupResult(doc_id, doc_id, False, 1.0, 1)
+            self._pending_members.append((doc_id, doc_id, False, 1.0, seen_at))
+            self._assigned[doc_id] = result
+            return result
+        signature = self.hasher.signature(text)
+        cluster_id, similarity = self._best_match(signature)
+        if cluster_id is None:
+            cluster_id, similarity, duplicate = doc_id, 1.0, False
+            self._insert(doc_id, signature, 1, seen_at, seen_at)
+            self.stats.new_clusters += 1
+        else:
+            duplicate = True
+            self._counts[cluster_id] += 1
+            self._last_seen[cluster_id] = max(self._last_seen[cluster_id], seen_at)
+            self.stats.duplicates += 1
+        self._dirty.add(cluster_id)
+        self._pending_members.append((doc_id, cluster_id, duplicate, similarity, seen_at))
+        result = DedupResult(doc_id, cluster_id, duplicate, similarity, self._counts[cluster_id])
+        self._assigned[doc_id] = result
+        return result
+
+    def _load_assigned(self, doc_ids: Sequence[str]):
+        """Stored memberships of `doc_ids`, so documents from earlier runs are not counted again"""
+        rows = self.con.execute(f"""
+            SELECT m.doc_id, m.cluster_id, m.is_duplicate, m.similarity, COALESCE(c.doc_count, 1)
+            FROM {MEMBERS_TABLE} m LEFT JOIN {CLUSTERS_TABLE} c USING (cluster_id)
+            WHERE m.doc_id IN (SELECT UNNEST($1))
+        """, [list(doc_ids)]).fetchall()
+        for doc_id, cluster_id, duplicate, similarity, count in rows:
+            self._assigned.setdefault(doc_id, DedupResult(doc_id, cluster_id, duplicate, similarity, count))
+
+    def add_batch(
+        self,
+        docs: Sequence[dict],
+        id_field: str = "article_id",
+        fields: Sequence[str] = ("headline", "content"),
+        time_field: Optional[str] = None,
+    ) -> List[DedupResult]:
+        if self.con is not None:
+            self._load_assigned([str(doc[id_field]) for doc in docs])
+        results = [
+            self.add(str(doc[id_field]), " ".join(doc.get(f) or "" for f in fields), doc.get(time_field) if time_field else None)
+            for doc in docs
+        ]
+        self.flush()
+        return results
+
+    def stream(self, batches: Iterable[Sequence[dict]], **kwargs) -> Iterator[List[DedupResult]]:
+        """Cluster batches as they arrive, persisting after each batch"""
+        for batch in batches:
+            yield self.add_batch(batch, **kwargs)
+
+    def flush(self):
+        """Write new memberships and touched clusters to DuckDB"""
+        if self.con is None:
+            return
+        # Everything assigned so far is in the tables once this returns
+        self._assigned = {}
+        if not (self._pending_members or self._dirty):
+            return
+        members, self._pending_members = self._pending_members, []
+        dirty, self._dirty = self._dirty, set()
+        clusters = [
+            (c, self._counts[c], self._first_seen[c], self._last_seen[c], self._signatures[c].tobytes())
+            for c in dirty
+        ]
+        self.con.begin()
+        try:
+            self.con.execute(
+                f"INSERT OR REPLACE INTO {MEMBERS_TABLE} SELECT UNNEST($1), UNNEST($2), UNNEST($3), UNNEST($4), UNNEST($5)",
+                [list(col) for col in zip(*members)] if members else [[], [], [], [], []],
+            )
+            self.con.execute(
+                f"INSERT OR REPLACE INTO {CLUSTERS_TABLE} SELECT UNNEST($1), UNNEST($2), UNNEST($3), UNNEST($4), UNNEST($5)",
+                [list(col) for col in zip(*clusters)] if clusters else [[], [], [], [], []],
+            )
+            self.con.commit()
+        except Exception:
+            self.con.rollback()
+            raise
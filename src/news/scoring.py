@@ -0,0 +1,318 @@
+"""
+Batched, cached sentiment scoring for news buckets and Trump posts
+(raw.scrapecreators_news_buckets sentiment columns)
+Texts are hashed first and only unseen content reaches the model, so
+re-ingested or duplicated posts are never scored twice. The rest are
+tokenized once, sorted by token length and cut into batches that are padded
+only to their own longest text (dynamic padding), then run on a worker pool.
+Probabilities map onto ZL sentiment per bucket as described in
+docs/features/sentiment-implementation.md.
+
+The model is anything with `name`, `labels`, `pad_id`, `encode()` and
+`predict()`: FinBERTModel in production, LexiconModel as a dependency-free
+stand-in for tests and dry runs.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FINBERT_MODEL = "ProsusAI/finbert"
+FINBERT_LABELS = ("positive", "negative", "neutral")
+MAX_TOKENS = 512
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_WORKERS = 2
+CACHE_TABLE = "sentiment_score_cache"
+
+# FinBERT probability above which a text counts as positive / negative
+SENTIMENT_THRESHOLD = 0.5
+
+
+class SentimentModel(Protocol):
+    name: str                 # part of the cache key: a new model never reuses old scores
+    labels: Sequence[str]     # must include positive, negative and neutral
+    pad_id: int
+
+    def encode(self, texts: Sequence[str]) -> List[List[int]]:
+        """Token ids per text, truncated to the model's maximum length"""
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Class probabilities, batch × labels"""
+
+
+class FinBERTModel:
+    """ProsusAI/finbert on CPU via transformers (imported on first use)"""
+
+    labels = FINBERT_LABELS
+
+    def __init__(self, model: str = FINBERT_MODEL, max_length: int = MAX_TOKENS, threads: Optional[int] = None):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.name = model
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model).eval()
+        self.pad_id = self.tokenizer.pad_token_id or 0
+        # Label order comes from the checkpoint config, not an assumption
+        id2label = self.model.config.id2label
+        self.labels = tuple(id2label[i].lower() for i in range(len(id2label)))
+        if threads:
+            torch.set_num_threads(threads)
+        self._torch = torch
+
+    def encode(self, texts: Sequence[str]) -> List[List[int]]:
+        return self.tokenizer(list(texts), truncation=True, max_length=self.max_length)["input_ids"]
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        torch = self._torch
+        with torch.inference_mode():
+            logits = self.model(
+                input_ids=torch.from_numpy(input_ids), attention_mask=torch.from_numpy(attention_mask)
+            ).logits
+            return torch.softmax(logits, dim=-1).numpy()
+
+
+class LexiconModel:
+    """Word-list scorer with the model interface; no ML dependencies"""
+
+    name = "lexicon-v1"
+    labels = FINBERT_LABELS
+    pad_id = 0
+
+    POSITIVE = ("approve", "boost", "bullish", "demand", "gain", "higher", "increase", "purchase", "rally", "record", "strong", "surge")
+    NEGATIVE = ("ban", "bearish", "cancel", "cut", "decline", "drop", "fall", "lower", "loss", "retaliation", "tariff", "weak")
+
+    def __init__(self, max_length: int = MAX_TOKENS):
+        self.max_length = max_length
+        self._ids = {w: i + 1 for i, w in enumerate(self.POSITIVE + self.NEGATIVE)}
+        self._unknown = len(self._ids) + 1
+
+    def encode(self, texts: Sequence[str]) -> List[List[int]]:
+        return [
+            [self._ids.get(w, self._unknown) for w in re.findall(r"[a-z]+", t.lower())][:self.max_length] or [self._unknown]
+            for t in texts
+        ]
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        n_pos = len(self.POSITIVE)
+        pos = ((input_ids >= 1) & (input_ids <= n_pos)).sum(axis=1)
+        neg = ((input_ids > n_pos) & (input_ids < self._unknown)).sum(axis=1)
+        logits = np.stack([pos, neg, np.full_like(pos, 1)], axis=1).astype(np.float64)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def content_hash(text: str, model_name: str) -> str:
+    """Cache key: model plus whitespace-normalized text"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """Probabilities by content hash, in memory and optionally in a DuckDB file"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self._memory: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._con = None
+        if path is not None:
+            import duckdb
+
+            self._con = duckdb.connect(str(path))
+            self._con.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+                    content_hash VARCHAR PRIMARY KEY,
+                    model VARCHAR,
+                    probs DOUBLE[],
+                    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, tuple]:
+        with self._lock:
+            found = {k: self._memory[k] for k in keys if k in self._memory}
+            missing = [k for k in set(keys) if k not in found]
+            if missing and self._con is not None:
+                rows = self._con.execute(
+                    f"SELECT content_hash, probs FROM {CACHE_TABLE} WHERE content_hash IN (SELECT UNNEST(?))", [missing]
+                ).fetchall()
+                for key, probs in rows:
+                    self._memory[key] = found[key] = tuple(probs)
+        return found
+
+    def put_many(self, model: str, scores: Dict[str, tuple]):
+        if not scores:
+            return
+        with self._lock:
+            self._memory.update(scores)
+            if self._con is not None:
+                # One set-based insert; executemany is row-at-a-time in DuckDB
+                self._con.execute(
+                    f"INSERT OR REPLACE INTO {CACHE_TABLE} (content_hash, model, probs) "
+                    f"SELECT UNNEST($keys), $model, UNNEST($probs)",
+                    {"keys": list(scores), "model": model, "probs": [list(v) for v in scores.values()]},
+                )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self):
+        if self._con is not None:
+            self._con.close()
+
+
+@dataclass
+class ScoringStats:
+    docs: int = 0
+    cache_hits: int = 0
+    duplicates: int = 0      # repeats within the same call, scored once
+    scored: int = 0
+    batches: int = 0
+    tokens: int = 0
+    padded_tokens: int = 0   # tokens fed to the model including padding
+    seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.docs / self.seconds if self.seconds else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache_hits / self.docs if self.docs else 0.0
+
+    @property
+    def padding_overhead(self) -> float:
+        return self.padded_tokens / self.tokens - 1 if self.tokens else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.docs:,} docs in {self.seconds:.2f}s ({self.docs_per_second:,.0f} docs/s), "
+            f"cache hit rate {self.hit_rate:.1%}, {self.scored:,} scored in {self.batches} batches, "
+            f"padding overhead {self.padding_overhead:.1%}"
+        )
+
+
+def length_batches(lengths: Sequence[int], batch_size: int) -> List[np.ndarray]:
+    """Index batches of similar length: sort by length, cut every `batch_size`"""
+    order = np.argsort(np.asarray(lengths), kind="stable")
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def pad_batch(token_ids: Sequence[List[int]], pad_id: int):
+    """(input_ids, attention_mask) padded to the batch's own longest sequence"""
+    width = max(len(t) for t in token_ids)
+    input_ids = np.full((len(token_ids), width), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(token_ids), width), dtype=np.int64)
+    for i, ids in enumerate(token_ids):
+        input_ids[i, :len(ids)] = ids
+        attention_mask[i, :len(ids)] = 1
+    return input_ids, attention_mask
+
+
+class SentimentScorer:
+    """Scores texts through a cache, length-bucketed batches and a worker pool"""
+
+    def __init__(
+        self,
+        model: SentimentModel,
+        cache: Optional[ScoreCache] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        self.model = model
+        self.cache = cache if cache is not None else ScoreCache()
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stats = ScoringStats()
+        self._index = {label: i for i, label in enumerate(model.labels)}
+
+    def score(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """Label probabilities per text, in input order"""
+        started = time.perf_counter()
+        keys = [content_hash(t or "", self.model.name) for t in texts]
+        cached = self.cache.get_many(keys)
+
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text or ""
+        hits = sum(1 for k in keys if k in cached)
+        self.stats.docs += len(texts)
+        self.stats.cache_hits += hits
+        self.stats.duplicates += len(texts) - hits - len(pending)
+
+        if pending:
+            cached.update(self._run_model(list(pending), list(pending.values())))
+        self.stats.seconds += time.perf_counter() - started
+        return [dict(zip(self.model.labels, cached[k])) for k in keys]
+
+    def _run_model(self, keys: List[str], texts: List[str]) -> Dict[str, tuple]:
+        token_ids = self.model.encode(texts)
+        batches = length_batches([len(t) for t in token_ids], self.batch_size)
+
+        def run(batch: np.ndarray):
+            input_ids, attention_mask = pad_batch([token_ids[i] for i in batch], self.model.pad_id)
+            return batch, input_ids.size, self.model.predict(input_ids, attention_mask)
+
+        scores: Dict[str, tuple] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for batch, padded, probs in pool.map(run, batches):
+                self.stats.batches += 1
+                self.stats.padded_tokens += padded
+                for i, row in zip(batch, probs):
+                    scores[keys[i]] = tuple(float(p) for p in row)
+        self.stats.tokens += sum(len(t) for t in token_ids)
+        self.stats.scored += len(keys)
+        self.cache.put_many(self.model.name, scores)
+        return scores
+
+    def score_buckets(self, items: Sequence[dict], text_field: str = "content") -> List[dict]:
+        """zl_sentiment / sentiment_confidence / sentiment_raw_score for news bucket rows"""
+        probs = self.score([(item.get("headline") or "") + "\n" + (item.get(text_field) or "") for item in items])
+        return [
+            map_to_zl_sentiment(p, item.get("theme_primary") or "", item.get(text_field) or "")
+            for item, p in zip(items, probs)
+        ]
+
+
+UCO_IMPORT_TERMS = ("uco", "used cooking oil", "biodiesel import", "chinese import")
+US_EXPORT_TERMS = ("us export", "retaliation", "trade war", "china tariff")
+
+
+def map_to_zl_sentiment(probs: Dict[str, float], bucket: str, text: str = "") -> dict:
+    """Bucket-aware mapping from FinBERT probabilities to ZL sentiment
+
+    Tariff news is context dependent: tariffs on Chinese UCO / biodiesel
+    imports protect US biofuel demand (bullish), retaliation against US
+    exports destroys demand (bearish), anything else defaults to bearish.
+    Every other bucket maps positive → BULLISH_ZL and negative → BEARISH_ZL.
+    """
+    positive, negative, neutral = probs["positive"], probs["negative"], probs["neutral"]
+
+    def result(sentiment, score):
+        return {"zl_sentiment": sentiment, "sentiment_confidence": score, "sentiment_raw_score": score}
+
+    if bucket.lower() in ("tariffs_trade_policy", "trade_geo"):
+        lowered = text.lower()
+        if any(term in lowered for term in UCO_IMPORT_TERMS):
+            return result("BULLISH_ZL", positive) if positive > SENTIMENT_THRESHOLD else result("BEARISH_ZL", negative)
+        if any(term in lowered for term in US_EXPORT_TERMS):
+            return result("BEARISH_ZL", positive) if positive > SENTIMENT_THRESHOLD else result("BULLISH_ZL", negative)
+        return result("BEARISH_ZL", max(positive, negative))
+
+    if positive > SENTIMENT_THRESHOLD:
+        return result("BULLISH_ZL", positive)
+    if negative > SENTIMENT_THRESHOLD:
+        return result("BEARISH_ZL", negative)
+    return result("NEUTRAL", neutral)
@@ -0,0 +1,41 @@
+"""
+Run independent health checks concurrently and collect structured results
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_WORKERS = 16
+
+
+@dataclass
+class CheckResult:
+    name: str
+    ok: bool
+    detail: Any = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+def _run_one(name: str, check: Callable[[], Any]) -> CheckResult:
+    started = time.perf_counter()
+    try:
+        detail = check()
+        # Checks may return a bool, or (ok, detail) to carry extra information
+        if isinstance(detail, tuple) and len(detail) == 2 and isinstance(detail[0], bool):
+            ok, detail = detail
+        else:
+            ok = detail is not False
+        return CheckResult(name=name, ok=ok, detail=detail, seconds=time.perf_counter() - started)
+    except Exception as e:
+        return CheckResult(name=name, ok=False, error=str(e), seconds=time.perf_counter() - started)
+
+
+def run_checks(checks: Dict[str, Callable[[], Any]], max_workers: int = DEFAULT_WORKERS) -> Dict[str, CheckResult]:
+    """Run every check on a thread pool; results keep the input order"""
+    if not checks:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(checks))) as pool:
+        futures = {name: pool.submit(_run_one, name, check) for name, check in checks.items()}
+        return {name: future.result() for name, future in futures.items()}
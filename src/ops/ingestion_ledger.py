@@ -0,0 +1,199 @@
+"""
+Ingestion watermark ledger (ops.ingestion_completion)
+Every ingester appends one compact record per run: source, table, watermark
+date, rows, bytes, duration and status. Status tools, incremental loaders and
+feature builds read the latest successful record per source instead of
+scanning the data tables.
+
+BigQueryLedger writes to cbi-v15.ops.ingestion_completion; DuckDBLedger keeps
+the same table in any DuckDB/MotherDuck connection for local and offline use.
+MirroredLedger reads from one ledger and also records to others, so loaders
+that keep a local ledger (Databento → MotherDuck) still show up in
+ops.ingestion_completion.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from src.utils.query_guard import get_gateway
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ID = "cbi-v15"
+LEDGER_TABLE = "ops.ingestion_completion"
+
+# Latest-record lookups only look this far back, so BigQuery prunes to a
+# handful of date partitions and the per-source cost stays constant
+LOOKBACK_DAYS = 30
+
+COLUMNS = [
+    "date", "source", "completed_at", "status", "rows_ingested", "error_message",
+    "table_name", "watermark_date", "bytes_written", "duration_seconds",
+]
+
+
+@dataclass
+class CompletionRecord:
+    source: str
+    table_name: str
+    status: str = "success"  # "success" | "failed"
+    watermark_date: Optional[date] = None
+    rows_ingested: int = 0
+    bytes_written: int = 0
+    duration_seconds: float = 0.0
+    error_message: Optional[str] = None
+    date: date = field(default_factory=lambda: datetime.now(timezone.utc).date())
+    completed_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class BigQueryLedger:
+    def __init__(self, client, project: str = PROJECT_ID, gateway=None):
+        self.client = client
+        self.table_id = f"{project}.{LEDGER_TABLE}"
+        self.gateway = gateway or get_gateway(project, client)
+
+    def record(self, rec: CompletionRecord):
+        from google.cloud import bigquery
+
+        types = {
+            "date": "DATE", "source": "STRING", "completed_at": "TIMESTAMP", "status": "STRING",
+            "rows_ingested": "INT64", "error_message": "STRING", "table_name": "STRING",
+            "watermark_date": "DATE", "bytes_written": "INT64", "duration_seconds": "FLOAT64",
+        }
+        values = asdict(rec)
+        # DML rather than streaming inserts: one tiny statement per run, and the
+        # row is immediately visible to the latest() query
+        query = f"""
+        INSERT INTO `{self.table_id}` ({', '.join(COLUMNS)})
+        VALUES ({', '.join('@' + c for c in COLUMNS)})
+        """
+        params = [bigquery.ScalarQueryParameter(c, types[c], values[c]) for c in COLUMNS]
+        self.gateway.query(query, job_config=bigquery.QueryJobConfig(query_parameters=params),
+                           label=f"ledger record {rec.source}")
+
+    def latest(self, sources: Iterable[str]) -> Dict[str, CompletionRecord]:
+        """Latest successful record per source"""
+        from google.cloud import bigquery
+
+        query = f"""
+        SELECT * EXCEPT(rn) FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY completed_at DESC) AS rn
+            FROM `{self.table_id}`
+            WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {LOOKBACK_DAYS} DAY)
+              AND source IN UNNEST(@sources)
+              AND status = 'success'
+        )
+        WHERE rn = 1
+        """
+        config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ArrayQueryParameter("sources", "STRING", list(sources)),
+        ])
+        rows = self.gateway.query(query, job_config=config, label="ledger latest").result()
+        return {r.source: CompletionRecord(**{c: r[c] for c in COLUMNS}) for r in rows}
+
+
+class DuckDBLedger:
+    def __init__(self, con, table: str = "ingestion_completion"):
+        self.con = con
+        self.table = table
+        con.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                date DATE,
+                source VARCHAR,
+                completed_at TIMESTAMP,  -- UTC
+                status VARCHAR,
+                rows_ingested BIGINT,
+                error_message VARCHAR,
+                table_name VARCHAR,
+                watermark_date DATE,
+                bytes_written BIGINT,
+                duration_seconds DOUBLE
+            )
+        """)
+
+    def record(self, rec: CompletionRecord):
+        values = asdict(rec)
+        # Stored as naive UTC so reads don't need timezone support in the client
+        values["completed_at"] = rec.completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        self.con.execute(
+            f"INSERT INTO {self.table} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+            [values[c] for c in COLUMNS],
+        )
+
+    def latest(self, sources: Iterable[str]) -> Dict[str, CompletionRecord]:
+        sources = list(sources)
+        if not sources:
+            return {}
+        rows = self.con.execute(f"""
+            SELECT {', '.join(COLUMNS)} FROM {self.table}
+            WHERE source IN ({', '.join('?' for _ in sources)}) AND status = 'success'
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY source ORDER BY completed_at DESC) = 1
+        """, sources).fetchall()
+        return {r[1]: CompletionRecord(**dict(zip(COLUMNS, r))) for r in rows}
+
+
+class MirroredLedger:
+    """Reads from `primary`; records go to `primary` and, best effort, every mirror"""
+
+    def __init__(self, primary, *mirrors):
+        self.primary = primary
+        self.mirrors = mirrors
+
+    def record(self, rec: CompletionRecord):
+        self.primary.record(rec)
+        for mirror in self.mirrors:
+            _safe_record(mirror, rec)
+
+    def latest(self, sources: Iterable[str]) -> Dict[str, CompletionRecord]:
+        return self.primary.latest(sources)
+
+
+def mirror_to_bigquery(ledger, project: str = PROJECT_ID):
+    """`ledger` mirrored to ops.ingestion_completion, or `ledger` alone if BigQuery is unavailable"""
+    try:
+        from src.utils.bigquery import get_client
+        mirror = BigQueryLedger(get_client(project), project=project)
+    except Exception as e:
+        logger.warning(f"⚠️  BigQuery ledger unavailable ({str(e)[:80]}), recording locally only")
+        return ledger
+    return MirroredLedger(ledger, mirror)
+
+
+@dataclass
+class RunTracker:
+    """Mutable run state filled in by the ingester inside track_run()"""
+    rows: int = 0
+    bytes: int = 0
+    watermark: Optional[date] = None
+
+
+@contextmanager
+def track_run(ledger, source: str, table_name: str):
+    """Time an ingestion run and append its completion record, success or failure"""
+    run = RunTracker()
+    started = time.perf_counter()
+    try:
+        yield run
+    except Exception as e:
+        _safe_record(ledger, CompletionRecord(
+            source=source, table_name=table_name, status="failed",
+            watermark_date=run.watermark, rows_ingested=run.rows, bytes_written=run.bytes,
+            duration_seconds=time.perf_counter() - started, error_message=str(e)[:1000],
+        ))
+        raise
+    _safe_record(ledger, CompletionRecord(
+        source=source, table_name=table_name, status="success",
+        watermark_date=run.watermark, rows_ingested=run.rows, bytes_written=run.bytes,
+        duration_seconds=time.perf_counter() - started,
+    ))
+
+
+def _safe_record(ledger, rec: CompletionRecord):
+    # A ledger outage must never fail (or mask the error of) the ingestion itself
+    try:
+        ledger.record(rec)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not write ingestion ledger record for {rec.source}: {e}")
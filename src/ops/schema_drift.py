@@ -0,0 +1,180 @@
+"""
+Schema drift between the skeleton DDL and live BigQuery tables
+create_skeleton_tables_complete.sql is parsed into an expected schema model
+(columns, types, partition field, clustering). Live table metadata is fetched
+concurrently and diffed against it in one pass, producing a flat list of
+drift items that can be printed as JSON.
+"""
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.ops.checks import run_checks
+
+PROJECT_ID = "cbi-v15"
+
+SKELETON_DDL = Path(__file__).parent.parent.parent / "cbi-v15-scripts" / "setup" / "create_skeleton_tables_complete.sql"
+
+# The API reports legacy type names; the DDL uses standard SQL names
+TYPE_ALIASES = {
+    "INTEGER": "INT64",
+    "FLOAT": "FLOAT64",
+    "BOOLEAN": "BOOL",
+    "RECORD": "STRUCT",
+}
+
+_CREATE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`(?:[\w-]+\.)?(\w+)\.(\w+)`\s*\((.*?)\)\s*"
+    r"(?:PARTITION\s+BY\s+(.*?)\s*)?(?:CLUSTER\s+BY\s+(.*?)\s*)?(?:OPTIONS\s*\(.*?\)\s*)?;",
+    re.IGNORECASE | re.DOTALL,
+)
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_PARTITION_FIELD = re.compile(r"(?:DATE|TIMESTAMP_TRUNC|DATE_TRUNC)?\s*\(?\s*(\w+)", re.IGNORECASE)
+
+
+@dataclass
+class TableSpec:
+    table_id: str  # "dataset.table"
+    columns: Dict[str, str] = field(default_factory=dict)  # name -> type
+    partition_field: Optional[str] = None
+    clustering: List[str] = field(default_factory=list)
+
+    @property
+    def partitioned(self) -> bool:
+        return self.partition_field is not None
+
+
+@dataclass
+class Drift:
+    table: str
+    kind: str  # missing_table | missing_column | extra_column | type_mismatch | partitioning | clustering | unpartitioned | error
+    severity: str = "error"  # "error" | "warning"
+    column: Optional[str] = None
+    expected: Optional[str] = None
+    actual: Optional[str] = None
+
+
+def normalize_type(type_name: str) -> str:
+    type_name = re.sub(r"\s+", "", type_name.upper())
+    return TYPE_ALIASES.get(type_name, type_name)
+
+
+def _split_columns(body: str) -> List[str]:
+    # Split on top-level commas only, so ARRAY<STRUCT<a, b>> stays intact
+    parts, depth, current = [], 0, []
+    for ch in body:
+        if ch in "<(":
+            depth += 1
+        elif ch in ">)":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_skeleton_ddl(sql: str) -> Dict[str, TableSpec]:
+    """Expected schema per "dataset.table" from CREATE TABLE statements"""
+    specs = {}
+    # Comments go first: a ");" or a commented-out column inside one would end or extend a match
+    sql = _COMMENT.sub(" ", sql)
+    for dataset, table, body, partition, cluster in _CREATE.findall(sql):
+        spec = TableSpec(table_id=f"{dataset}.{table}")
+        for column in _split_columns(body):
+            name, type_name = column.split(None, 1)
+            # Drop NOT NULL / OPTIONS(...) etc. after the type
+            type_name = re.split(r"\s+(?:NOT\s+NULL|OPTIONS|DEFAULT)\b", type_name, flags=re.IGNORECASE)[0]
+            spec.columns[name.strip("`")] = normalize_type(type_name)
+        if partition:
+            spec.partition_field = _PARTITION_FIELD.match(partition.strip()).group(1)
+        if cluster:
+            spec.clustering = [c.strip().strip("`") for c in cluster.split(",")]
+        specs[spec.table_id] = spec
+    return specs
+
+
+def load_skeleton_specs(path: Path = SKELETON_DDL) -> Dict[str, TableSpec]:
+    return parse_skeleton_ddl(Path(path).read_text())
+
+
+def _field_type(schema_field) -> str:
+    type_name = normalize_type(schema_field.field_type)
+    if type_name == "STRUCT":
+        type_name = f"STRUCT<{', '.join(f'{f.name} {_field_type(f)}' for f in schema_field.fields)}>"
+    return f"ARRAY<{type_name}>" if schema_field.mode == "REPEATED" else type_name
+
+
+def spec_from_table(table_id: str, table) -> TableSpec:
+    """Actual schema model from a google.cloud.bigquery.Table"""
+    partition_field = None
+    if table.time_partitioning is not None:
+        partition_field = table.time_partitioning.field or "_PARTITIONTIME"
+    elif getattr(table, "range_partitioning", None) is not None:
+        partition_field = table.range_partitioning.field
+    return TableSpec(
+        table_id=table_id,
+        columns={f.name: _field_type(f) for f in table.schema},
+        partition_field=partition_field,
+        clustering=list(table.clustering_fields or []),
+    )
+
+
+def diff_table(expected: TableSpec, actual: TableSpec) -> List[Drift]:
+    drift = []
+    t = expected.table_id
+    for name, type_name in expected.columns.items():
+        if name not in actual.columns:
+            drift.append(Drift(t, "missing_column", column=name, expected=type_name))
+        elif actual.columns[name] != type_name:
+            drift.append(Drift(t, "type_mismatch", column=name, expected=type_name, actual=actual.columns[name]))
+    for name, type_name in actual.columns.items():
+        if name not in expected.columns:
+            # Additive columns are allowed (e.g. Dataform-added features), but reported
+            drift.append(Drift(t, "extra_column", severity="warning", column=name, actual=type_name))
+    if expected.partition_field != actual.partition_field:
+        drift.append(Drift(t, "partitioning", expected=expected.partition_field, actual=actual.partition_field))
+    if expected.clustering != actual.clustering:
+        drift.append(Drift(t, "clustering", expected=",".join(expected.clustering) or None,
+                           actual=",".join(actual.clustering) or None))
+    drift.extend(unpartitioned_drift(actual))
+    return drift
+
+
+def unpartitioned_drift(spec: TableSpec) -> List[Drift]:
+    """Flag unpartitioned tables; those with a `date` column get full scans on every date filter"""
+    if spec.partitioned:
+        return []
+    severity = "error" if "date" in spec.columns else "warning"
+    return [Drift(spec.table_id, "unpartitioned", severity=severity, column="date" if severity == "error" else None)]
+
+
+def collect_drift(client, expected: Dict[str, TableSpec], project: str = PROJECT_ID) -> List[Drift]:
+    """Fetch every expected table's metadata concurrently and diff it against the DDL model"""
+    results = run_checks({
+        table_id: (lambda t=table_id: client.get_table(f"{project}.{t}"))
+        for table_id in expected
+    })
+    drift = []
+    for table_id, result in results.items():
+        if not result.ok:
+            not_found = result.error and ("Not found" in result.error or "404" in result.error)
+            drift.append(Drift(table_id, "missing_table" if not_found else "error", actual=None if not_found else result.error))
+            continue
+        drift.extend(diff_table(expected[table_id], spec_from_table(table_id, result.detail)))
+    return drift
+
+
+def drift_report(expected: Dict[str, TableSpec], drift: List[Drift]) -> dict:
+    """Machine-readable summary: counts plus one entry per drift item"""
+    errors = [d for d in drift if d.severity == "error"]
+    return {
+        "tables_checked": len(expected),
+        "tables_with_drift": len({d.table for d in errors}),
+        "errors": len(errors),
+        "warnings": len(drift) - len(errors),
+        "drift": [asdict(d) for d in drift],
+    }
@@ -0,0 +1,196 @@
+"""
+Dashboard HTTP API over the in-memory serving snapshots
+  GET /v1/{view}?symbol=ZL&after=<cursor>&limit=1000&start=2024-01-01&end=...
+  GET /v1/{view}/latest[?symbol=ZL]
+  GET /health, /stats
+
+The partition filter is named after the view's partition column (symbol for
+prices / features, horizon for forecasts). Pages are keyset-paginated: each
+response carries `next_cursor`, which is passed back as `after`.
+
+Responses are cheap three ways over:
+- ETag = snapshot version + normalized query, known before any work is
+  done, so If-None-Match revalidations return 304 immediately
+- encoded bodies are kept in an LRU keyed on that ETag; a refresh changes
+  the version, so bodies of a replaced snapshot just age out
+- concurrent identical misses share one encode (request coalescing), which
+  runs on the executor so the event loop keeps answering cached requests
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+from aiohttp import web
+
+from src.serving.store import DEFAULT_PAGE_LIMIT, ServingStore, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE = 4096
+LATENCY_WINDOW = 10_000
+
+
+@dataclass
+class ServingStats:
+    requests: int = 0
+    not_modified: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    encoded: int = 0
+    errors: int = 0
+
+
+def _day(value: Optional[str]) -> Optional[int]:
+    """ISO date -> days since epoch (the order key of date-keyed views)"""
+    if value is None:
+        return None
+    return (date.fromisoformat(value) - date(1970, 1, 1)).days
+
+
+class ResponseCache:
+    """Encoded bodies by ETag, LRU-bounded, with coalescing of concurrent misses"""
+
+    def __init__(self, max_entries: int = DEFAULT_RESPONSE_CACHE):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, etag: str, encode, stats: ServingStats) -> bytes:
+        body = self._bodies.get(etag)
+        if body is not None:
+            self._bodies.move_to_end(etag)
+            stats.cache_hits += 1
+            return body
+        pending = self._inflight.get(etag)
+        if pending is not None:
+            stats.coalesced += 1
+            return await pending
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[etag] = future
+        try:
+            body = await asyncio.get_running_loop().run_in_executor(None, encode)
+            stats.encoded += 1
+            self._bodies[etag] = body
+            if len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+            future.set_result(body)
+            return body
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the error; nobody else awaits this future otherwise
+            future.exception()
+            raise
+        finally:
+            del self._inflight[etag]
+
+
+class DashboardAPI:
+    def __init__(self, store: ServingStore, page_limit: int = DEFAULT_PAGE_LIMIT, response_cache: int = DEFAULT_RESPONSE_CACHE):
+        self.store = store
+        self.page_limit = page_limit
+        self.cache = ResponseCache(response_cache)
+        self.stats = ServingStats()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def _snapshot(self, request: web.Request):
+        view = request.match_info["view"]
+        snapshot = self.store.snapshot(view)
+        if snapshot is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": f"unknown view {view!r}"}), content_type="application/json")
+        return snapshot
+
+    async def _respond(self, request: web.Request, snapshot, params: Tuple, encode) -> web.Response:
+        etag = '"' + hashlib.blake2b(repr((snapshot.version, params)).encode(), digest_size=12).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("If-None-Match", ""):
+            self.stats.not_modified += 1
+            return web.Response(status=304, headers=headers)
+        body = await self.cache.get(etag, encode, self.stats)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    @staticmethod
+    def _envelope(snapshot, rows, next_cursor: Optional[str] = None) -> bytes:
+        return json.dumps({
+            "view": snapshot.spec.name,
+            "version": snapshot.version,
+            "as_of": snapshot.built_at.isoformat(),
+            "count": rows.num_rows,
+            "next_cursor": next_cursor,
+            "data": rows.to_pylist(),
+        }, separators=(",", ":")).encode()
+
+    async def page(self, request: web.Request) -> web.Response:
+        snapshot = self._snapshot(request)
+        query = request.query
+        partition = query.get(snapshot.spec.partition)
+        if partition is None:
+            raise web.HTTPBadRequest(text=json.dumps({"error": f"{snapshot.spec.partition} is required"}),
+                                     content_type="application/json")
+        try:
+            limit = min(int(query.get("limit", self.page_limit)), self.page_limit)
+            after = decode_cursor(query["after"]) if "after" in query else None
+            start, end = _day(query.get("start")), _day(query.get("end"))
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=json.dumps({"error": str(e)}), content_type="application/json")
+        if limit < 1:
+            raise web.HTTPBadRequest(text=json.dumps({"error": "limit must be positive"}), content_type="application/json")
+
+        def encode() -> bytes:
+            rows, next_cursor = snapshot.page(partition, after=after, limit=limit, start=start, end=end)
+            return self._envelope(snapshot, rows, next_cursor)
+
+        return await self._respond(request, snapshot, ("page", partition, after, limit, start, end), encode)
+
+    async def latest(self, request: web.Request) -> web.Response:
+        snapshot = self._snapshot(request)
+        partition = request.query.get(snapshot.spec.partition)
+        return await self._respond(
+            request, snapshot, ("latest", partition),
+            lambda: self._envelope(snapshot, snapshot.latest(partition)),
+        )
+
+    async def health(self, request: web.Request) -> web.Response:
+        views = {
+            name: {"version": s.version, "rows": s.rows, "as_of": s.built_at.isoformat()}
+            for name in self.store.views if (s := self.store.snapshot(name)) is not None
+        }
+        return web.json_response({"status": "ok" if views else "loading", "views": views})
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        latencies = np.array(self._latencies) * 1000
+        percentiles = {f"p{p}_ms": round(float(np.percentile(latencies, p)), 3) for p in (50, 99)} if len(latencies) else {}
+        return web.json_response({**asdict(self.stats), **percentiles, "cached_bodies": len(self.cache._bodies)})
+
+    @web.middleware
+    async def timing(self, request: web.Request, handler):
+        started = time.perf_counter()
+        self.stats.requests += 1
+        try:
+            return await handler(request)
+        except web.HTTPException:
+            raise
+        except Exception:
+            self.stats.errors += 1
+            logger.exception(f"❌ {request.path_qs}")
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+
+
+def create_app(store: ServingStore, page_limit: int = DEFAULT_PAGE_LIMIT) -> web.Application:
+    api = DashboardAPI(store, page_limit=page_limit)
+    app = web.Application(middlewares=[api.timing])
+    app.add_routes([
+        web.get("/health", api.health),
+        web.get("/stats", api.stats_handler),
+        web.get("/v1/{view}", api.page),
+        web.get("/v1/{view}/latest", api.latest),
+    ])
+    return app
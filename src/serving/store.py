@@ -0,0 +1,247 @@
+"""
+In-memory columnar snapshots behind the dashboard API (the `api` dataset)
+Each view is pre-aggregated from DuckDB / MotherDuck by a background refresh
+(dashboard.cache_ttl_minutes) into an immutable Arrow snapshot sorted by
+(partition, order key). Requests only ever read the current snapshot: a page
+is a binary search on the order keys plus a zero-copy slice, and the
+snapshot's content hash doubles as the ETag version, so a refresh that
+changes nothing keeps every client cache valid.
+
+Views:
+- prices:    zl_futures_ohlcv history, per symbol, keyed on date
+- features:  latest daily_ml_matrix row per symbol
+- forecasts: zl_predictions_<horizon> tables collapsed to one ensemble row
+             per (horizon, date): mean prediction, widest band, model count
+"""
+import base64
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.features.matrix import MATRIX_TABLE, TARGET_HORIZONS
+from src.ingestion.databento.motherduck import TABLE as OHLCV_TABLE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 5 * 60
+DEFAULT_PAGE_LIMIT = 1000
+FORECAST_TABLE = "zl_predictions_{horizon}"
+
+
+@dataclass(frozen=True)
+class ViewSpec:
+    name: str
+    build: Callable[[duckdb.DuckDBPyConnection], Optional[pa.Table]]
+    partition: str          # request filter column (symbol, horizon)
+    order: str              # keyset column, unique within a partition
+
+
+def _tables(con: duckdb.DuckDBPyConnection) -> set:
+    return {r[0] for r in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+
+
+def _prices(con) -> Optional[pa.Table]:
+    if OHLCV_TABLE not in _tables(con):
+        return None
+    return con.execute(f"""
+        SELECT symbol, date, open::DOUBLE AS open, high::DOUBLE AS high, low::DOUBLE AS low,
+               close::DOUBLE AS close, volume, open_interest
+        FROM {OHLCV_TABLE}
+    """).to_arrow_table()
+
+
+def _features(con) -> Optional[pa.Table]:
+    if MATRIX_TABLE not in _tables(con):
+        return None
+    return con.execute(f"""
+        SELECT * FROM {MATRIX_TABLE}
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) = 1
+    """).to_arrow_table()
+
+
+def _forecasts(con) -> Optional[pa.Table]:
+    existing = _tables(con)
+    parts = [
+        f"SELECT '{h}' AS horizon, * FROM {FORECAST_TABLE.format(horizon=h)}"
+        for h in TARGET_HORIZONS if FORECAST_TABLE.format(horizon=h) in existing
+    ]
+    if not parts:
+        return None
+    union = "\nUNION ALL\n".join(parts)
+    return con.execute(f"""
+        SELECT horizon, date,
+               AVG(prediction) AS prediction,
+               MIN(lower_bound) AS lower_bound,
+               MAX(upper_bound) AS upper_bound,
+               AVG(confidence) AS confidence,
+               COUNT(DISTINCT model_type) AS models
+        FROM ({union})
+        GROUP BY horizon, date
+    """).to_arrow_table()
+
+
+VIEWS: Tuple[ViewSpec, ...] = (
+    ViewSpec("prices", _prices, partition="symbol", order="date"),
+    ViewSpec("features", _features, partition="symbol", order="date"),
+    ViewSpec("forecasts", _forecasts, partition="horizon", order="date"),
+)
+
+
+def encode_cursor(key: int) -> str:
+    return base64.urlsafe_b64encode(str(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}") from None
+
+
+def _order_keys(column: pa.ChunkedArray) -> np.ndarray:
+    """Sortable int64 keys for a date / timestamp / integer column"""
+    if pa.types.is_date(column.type):
+        column = column.cast(pa.date32()).cast(pa.int32())
+    elif pa.types.is_timestamp(column.type):
+        column = column.cast(pa.int64())
+    return column.to_numpy().astype(np.int64)
+
+
+def _jsonable(table: pa.Table) -> pa.Table:
+    """Dates / timestamps as ISO strings and decimals as floats, so to_pylist() feeds json directly"""
+    for i, f in enumerate(table.schema):
+        if pa.types.is_date(f.type) or pa.types.is_timestamp(f.type):
+            table = table.set_column(i, f.name, pc.cast(table[f.name], pa.string()))
+        elif pa.types.is_decimal(f.type):
+            table = table.set_column(i, f.name, pc.cast(table[f.name], pa.float64()))
+    return table
+
+
+class ViewSnapshot:
+    """One immutable, sorted copy of a view with per-partition keyset indexes"""
+
+    def __init__(self, spec: ViewSpec, table: pa.Table):
+        self.spec = spec
+        self.built_at = datetime.now(timezone.utc)
+        table = table.sort_by([(spec.partition, "ascending"), (spec.order, "ascending")]).combine_chunks()
+        keys = _order_keys(table[spec.order])
+        self.table = _jsonable(table)
+        self.rows = table.num_rows
+
+        digest = hashlib.sha256()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        digest.update(sink.getvalue())
+        self.version = digest.hexdigest()[:16]
+
+        # partition value -> (first row, order keys of its rows)
+        self.partitions: Dict[str, Tuple[int, np.ndarray]] = {}
+        values = table[spec.partition].to_pylist()
+        start = 0
+        for i in range(1, len(values) + 1):
+            if i == len(values) or values[i] != values[start]:
+                self.partitions[str(values[start])] = (start, keys[start:i])
+                start = i
+
+    def page(
+        self,
+        partition: str,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Tuple[pa.Table, Optional[str]]:
+        """Rows of `partition` with order key > after (and within [start, end]), plus the next cursor"""
+        if partition not in self.partitions:
+            return self.table.slice(0, 0), None
+        offset, keys = self.partitions[partition]
+        lo = 0
+        if after is not None:
+            lo = int(np.searchsorted(keys, after, side="right"))
+        if start is not None:
+            lo = max(lo, int(np.searchsorted(keys, start, side="left")))
+        hi = len(keys) if end is None else int(np.searchsorted(keys, end, side="right"))
+        stop = min(hi, lo + limit)
+        rows = self.table.slice(offset + lo, max(stop - lo, 0))
+        return rows, (encode_cursor(int(keys[stop - 1])) if stop < hi else None)
+
+    def latest(self, partition: Optional[str] = None) -> pa.Table:
+        """Last row of one partition, or of every partition"""
+        wanted = [partition] if partition is not None else list(self.partitions)
+        indices = [self.partitions[p][0] + len(self.partitions[p][1]) - 1 for p in wanted if p in self.partitions]
+        return self.table.take(pa.array(indices, pa.int64()))
+
+
+class ServingStore:
+    """Current snapshot per view, rebuilt in the background every `refresh_seconds`"""
+
+    def __init__(
+        self,
+        connect: Callable[[], duckdb.DuckDBPyConnection],
+        views: Sequence[ViewSpec] = VIEWS,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+    ):
+        self.connect = connect
+        self.views = {v.name: v for v in views}
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: Dict[str, ViewSnapshot] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self, view: str) -> Optional[ViewSnapshot]:
+        return self._snapshots.get(view)
+
+    def refresh(self) -> List[str]:
+        """Rebuild every view; returns the views whose content changed"""
+        changed = []
+        con = self.connect()
+        try:
+            for name, spec in self.views.items():
+                started = time.perf_counter()
+                try:
+                    table = spec.build(con)
+                except duckdb.Error as e:
+                    logger.warning(f"⚠️  {name}: refresh failed, keeping previous snapshot: {e}")
+                    continue
+                if table is None:
+                    logger.warning(f"⚠️  {name}: source tables missing, view not served")
+                    continue
+                snapshot = ViewSnapshot(spec, table)
+                previous = self._snapshots.get(name)
+                if previous is None or previous.version != snapshot.version:
+                    # A plain reference swap: in-flight requests keep the snapshot they started on
+                    self._snapshots[name] = snapshot
+                    changed.append(name)
+                logger.info(f"  {name}: {snapshot.rows:,} rows, {len(snapshot.partitions)} partitions, "
+                            f"version {snapshot.version} ({time.perf_counter() - started:.2f}s)")
+        finally:
+            con.close()
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Snapshot refresh failed: {e}")
+
+    def start(self):
+        """Load every view now, then keep refreshing on a daemon thread"""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="serving-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,33 @@
+"""
+Process-wide pooled BigQuery client
+Every ops script shares one client per (project, location) so credentials,
+HTTP sessions and connections are set up once and reused across threads.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+PROJECT_ID = "cbi-v15"
+LOCATION = "us-central1"
+
+# Sized to the widest thread pool the ops scripts use, so concurrent checks
+# never wait on (or discard) pooled connections
+POOL_SIZE = 32
+
+_clients: Dict[Tuple[str, Optional[str]], "bigquery.Client"] = {}
+_lock = threading.Lock()
+
+
+def get_client(project: str = PROJECT_ID, location: Optional[str] = None):
+    """Return the shared client for `project`, creating it on first use"""
+    key = (project, location)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            from google.cloud import bigquery
+            from requests.adapters import HTTPAdapter
+
+            client = bigquery.Client(project=project, location=location)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            client._http.mount("https://", adapter)
+            _clients[key] = client
+    return client
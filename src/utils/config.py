@@ -0,0 +1,15 @@
+"""
+Load the shared cost optimization config
+"""
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "cbi-v15-scripts" / "optimization" / "cost_optimization_config.yaml"
+
+
+def load_optimization_config(path: Optional[Path] = None) -> dict:
+    """Return the `optimization` block of cost_optimization_config.yaml"""
+    with open(path or CONFIG_PATH) as f:
+        return yaml.safe_load(f)["optimization"]
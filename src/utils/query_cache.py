@@ -0,0 +1,234 @@
+"""
+Persistent query result cache (enable_query_cache / cache_ttl_hours)
+Results are stored as Arrow IPC files keyed on the normalized SQL plus the
+version (last-modified stamp) of every table the query reads, so a source
+table change simply produces a new key; the superseded entry is dropped the
+next time the same query is cached. Entries also expire after `ttl_hours`,
+and least-recently-used entries are evicted above `max_bytes`.
+
+A hit is a local memory-mapped read: no dry run, no job, no bytes scanned.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time as _time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "query_results"
+DEFAULT_TTL_HOURS = 24
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(`[^`]+`|[\w-]+(?:\.[\w-]+){0,2})", re.IGNORECASE)
+_CTE = re.compile(r"(?:\bWITH|,)\s*(\w+)\s+AS\s*\(", re.IGNORECASE)
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    sql_hash: str
+    file: str
+    bytes: int
+    rows: int
+    versions: Dict[str, str]
+    bytes_billed: int           # what the original run cost; saved on every hit
+    created_at: float
+    last_access: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    uncacheable: int = 0        # a referenced table had no version stamp
+    invalidations: int = 0      # entries superseded by a source table change
+    expirations: int = 0
+    evictions: int = 0
+    bytes_served: int = 0
+    bytes_saved: int = 0        # scan bytes not billed thanks to hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+def normalize_sql(sql: str) -> str:
+    """Comments stripped and whitespace collapsed (literals are left alone)"""
+    return " ".join(_COMMENT.sub(" ", sql).split()).rstrip(";").strip()
+
+
+def referenced_tables(sql: str) -> List[str]:
+    """Table references after FROM / JOIN, minus CTE names, in order of appearance"""
+    ctes = {name.lower() for name in _CTE.findall(sql)}
+    refs = [ref.strip("`") for ref in _TABLE_REF.findall(_COMMENT.sub(" ", sql))]
+    return list(dict.fromkeys(ref for ref in refs if ref.lower() not in ctes))
+
+
+def cache_key(sql: str, versions: Dict[str, str]) -> str:
+    raw = json.dumps([normalize_sql(sql), sorted(versions.items())])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class QueryResultCache:
+    """Arrow IPC result store with TTL and LRU size eviction"""
+
+    def __init__(
+        self,
+        cache_path: os.PathLike = DEFAULT_CACHE_PATH,
+        ttl_hours: Optional[float] = DEFAULT_TTL_HOURS,
+        max_bytes: Optional[int] = None,
+    ):
+        self.root = Path(cache_path)
+        self.ttl_hours = ttl_hours
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        (self.root / "results").mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        self._index: Dict[str, CacheEntry] = self._load_index()
+
+    def _load_index(self) -> Dict[str, CacheEntry]:
+        if not self._index_path.exists():
+            return {}
+        with open(self._index_path) as f:
+            raw = json.load(f)
+        return {key: CacheEntry(**entry) for key, entry in raw.items()}
+
+    def _save_index(self):
+        tmp = self._index_path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({k: asdict(e) for k, e in self._index.items()}, f)
+        os.replace(tmp, self._index_path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def total_bytes(self) -> int:
+        return sum(e.bytes for e in self._index.values())
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl_hours is not None and now - entry.created_at > self.ttl_hours * 3600
+
+    def get(self, key: str) -> Optional[pa.Table]:
+        """Cached result for `key` (memory-mapped), or None on a miss"""
+        now = _time.time()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(entry)
+                self.stats.expirations += 1
+                self._save_index()
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            try:
+                with pa.memory_map(str(self.root / "results" / entry.file)) as source:
+                    table = pa.ipc.open_file(source).read_all()
+            except (OSError, pa.ArrowInvalid) as e:
+                logger.warning(f"⚠️  Dropping unreadable cache entry {entry.file}: {e}")
+                self._remove(entry)
+                self._save_index()
+                self.stats.misses += 1
+                return None
+            entry.last_access = now
+            self.stats.hits += 1
+            self.stats.bytes_served += entry.bytes
+            self.stats.bytes_saved += entry.bytes_billed
+            return table
+
+    def store(
+        self,
+        key: str,
+        sql: str,
+        versions: Dict[str, str],
+        batches: Iterable[pa.RecordBatch],
+        bytes_billed: int = 0,
+    ) -> Iterator[pa.RecordBatch]:
+        """Pass `batches` through while writing them to the cache
+
+        The entry is only indexed once the stream is fully consumed; a reader
+        that stops early (or fails) leaves nothing behind.
+        """
+        path = self.root / "results" / f"{key}.arrow"
+        tmp = path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+        writer, rows = None, 0
+        try:
+            for batch in batches:
+                if writer is None:
+                    writer = pa.ipc.new_file(str(tmp), batch.schema)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                yield batch
+            if writer is None:
+                return
+            writer.close()
+            writer = None
+            os.replace(tmp, path)
+            self._add(key, sql, versions, path, rows, bytes_billed)
+        finally:
+            if writer is not None:
+                writer.close()
+            tmp.unlink(missing_ok=True)
+
+    def _add(self, key: str, sql: str, versions: Dict[str, str], path: Path, rows: int, bytes_billed: int):
+        now = _time.time()
+        sql_hash = hashlib.sha256(normalize_sql(sql).encode()).hexdigest()
+        with self._lock:
+            # Same query against older table versions can never hit again
+            for stale in [e for e in self._index.values() if e.sql_hash == sql_hash and e.key != key]:
+                self._remove(stale)
+                self.stats.invalidations += 1
+            self._index[key] = CacheEntry(
+                key=key, sql_hash=sql_hash, file=path.name, bytes=path.stat().st_size, rows=rows,
+                versions=dict(versions), bytes_billed=bytes_billed, created_at=now, last_access=now,
+            )
+            self.evict()
+            self._save_index()
+
+    def invalidate(self, table_id: str) -> int:
+        """Drop every entry that read `table_id`; returns how many"""
+        with self._lock:
+            stale = [e for e in self._index.values() if table_id in e.versions]
+            for entry in stale:
+                self._remove(entry)
+            self.stats.invalidations += len(stale)
+            self._save_index()
+        return len(stale)
+
+    def save(self):
+        """Persist last-access times (LRU order) after a run"""
+        with self._lock:
+            self._save_index()
+
+    def evict(self):
+        """Drop entries past the TTL, then least-recently-used until under max_bytes"""
+        now = _time.time()
+        for entry in [e for e in self._index.values() if self._expired(e, now)]:
+            self._remove(entry)
+            self.stats.expirations += 1
+        if self.max_bytes is not None:
+            total = self.total_bytes()
+            for entry in sorted(self._index.values(), key=lambda e: e.last_access):
+                if total <= self.max_bytes:
+                    break
+                total -= entry.bytes
+                self._remove(entry)
+                self.stats.evictions += 1
+
+    def _remove(self, entry: CacheEntry):
+        self._index.pop(entry.key, None)
+        (self.root / "results" / entry.file).unlink(missing_ok=True)
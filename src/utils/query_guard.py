@@ -0,0 +1,591 @@
+"""
+Cost-guarded query gateway (cost_optimization_config.yaml, bigquery block)
+Every query is dry-run first to estimate the bytes it will scan, then:
+
+- partitioned tables must be filtered on their partition column; unfiltered
+  references are rejected, or with policy="rewrite" wrapped in a subquery
+  limited to the last `max_query_date_range_days` (partition pruning still
+  applies through the subquery)
+- the estimated cost is reserved in a monthly spend ledger, and the query is
+  blocked if it would take the month past the alert threshold
+  (budget_cap_usd * alert_threshold_percent); the reservation is settled
+  with the bytes actually billed once the job finishes
+- at most `max_concurrent_queries` queries run at once across threads
+
+Full-history reads (training exports) pass allow_full_scan=True: they skip
+the partition filter check but are still estimated and charged to the ledger.
+
+read() / read_table() additionally serve repeated queries from the on-disk
+result cache (src/utils/query_cache.py), keyed on the SQL and the versions of
+the tables it reads; a hit skips the dry run, the ledger and the job.
+
+Backends: BigQueryBackend (dry-run jobs, table metadata) and DuckDBBackend, a
+local stand-in that estimates scanned bytes from EXPLAIN.
+"""
+import calendar
+import fcntl
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import duckdb
+import pyarrow as pa
+
+from src.utils.bigquery import PROJECT_ID, get_client
+from src.utils.query_cache import QueryResultCache, cache_key, referenced_tables
+
+logger = logging.getLogger(__name__)
+
+USD_PER_TIB = 6.25                  # BigQuery on-demand pricing
+MIN_BILLED_BYTES = 10 * 1024 ** 2   # BigQuery bills at least 10 MB per query
+DEFAULT_LEDGER = Path(__file__).parent.parent.parent / ".cache" / "query_spend.json"
+
+POLICIES = ("reject", "rewrite", "off")
+
+_CLAUSE_WORDS = {
+    "where", "join", "on", "using", "group", "order", "limit", "left", "right", "inner", "full",
+    "cross", "union", "window", "qualify", "having", "except", "intersect", "tablesample", "for",
+}
+# Comments and string literals, blanked before any clause is inspected
+_NOISE = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.)*'", re.DOTALL)
+_SET_OPERATOR = re.compile(r"\b(?:UNION|EXCEPT|INTERSECT)\b", re.IGNORECASE)
+_PREDICATE_END = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|HAVING|QUALIFY|WINDOW|LIMIT)\b", re.IGNORECASE)
+
+
+class QueryCostError(RuntimeError):
+    """A query was refused by the cost guard"""
+
+
+class PartitionFilterError(QueryCostError):
+    pass
+
+
+class BudgetExceededError(QueryCostError):
+    pass
+
+
+@dataclass
+class QueryEstimate:
+    sql: str                        # the query that will run (after any rewrite)
+    bytes_processed: int
+    tables: List[str] = field(default_factory=list)
+    rewritten: List[str] = field(default_factory=list)
+
+    @property
+    def billed_bytes(self) -> int:
+        return max(self.bytes_processed, MIN_BILLED_BYTES) if self.bytes_processed else 0
+
+    @property
+    def cost_usd(self) -> float:
+        return self.billed_bytes / 1024 ** 4 * USD_PER_TIB
+
+
+@dataclass
+class GuardStats:
+    queries: int = 0
+    rejected: int = 0
+    rewritten: int = 0
+    estimated_bytes: int = 0
+    billed_bytes: int = 0
+
+
+def cost_usd(billed_bytes: int) -> float:
+    return billed_bytes / 1024 ** 4 * USD_PER_TIB
+
+
+def _mask(sql: str) -> str:
+    """`sql` with comments and string literal contents blanked, positions unchanged"""
+    def blank(m: re.Match) -> str:
+        text = m.group(0)
+        if text.startswith("'"):
+            return "'" + " " * (len(text) - 2) + "'"
+        return re.sub(r"[^\n]", " ", text)
+    return _NOISE.sub(blank, sql)
+
+
+def _same_level(sql: str, pos: int) -> str:
+    """Text from `pos` to the end of its parenthesised level, nested parentheses blanked"""
+    out, depth = [], 0
+    for ch in sql[pos:]:
+        if ch == ")":
+            if depth == 0:
+                break
+            depth -= 1
+            out.append(" ")
+            continue
+        if ch == "(":
+            depth += 1
+        out.append(ch if depth == 0 else " ")
+    return "".join(out)
+
+
+def _predicate(sql: str, pos: int) -> str:
+    """WHERE clause of the SELECT whose FROM / JOIN ends at `pos`, up to GROUP BY / ORDER BY / ..."""
+    level = _same_level(sql, pos)
+    union = _SET_OPERATOR.search(level)
+    if union:
+        level = level[:union.start()]
+    where = re.search(r"\bWHERE\b", level, re.IGNORECASE)
+    if where is None:
+        return ""
+    end = _PREDICATE_END.search(level, where.end())
+    # Boundaries come from this level only; the predicate keeps its own parentheses
+    return sql[pos + where.end():pos + (end.start() if end else len(level))]
+
+
+def _reference_pattern(name: str) -> re.Pattern:
+    """FROM / JOIN of `project.dataset.table`, dataset.table or the bare name, optionally aliased"""
+    ref = rf"`?(?:[\w-]+\.)?(?:\w+\.)?{re.escape(name)}`?"
+    return re.compile(rf"\b(FROM|JOIN)\s+({ref})(\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+
+
+def _alias(m: re.Match) -> Optional[str]:
+    alias = m.group(4)
+    return None if alias is None or alias.lower() in _CLAUSE_WORDS else alias
+
+
+def _month(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m")
+
+
+class SpendLedger:
+    """Running month-to-date query spend, shared by every process on the host
+
+    Stored as JSON next to the other local caches; read-modify-write happens
+    under an exclusive file lock so concurrent jobs can't both squeeze under
+    the threshold.
+    """
+
+    def __init__(self, path: Path = DEFAULT_LEDGER, limit_usd: float = 40.0):
+        self.path = Path(path)
+        self.limit_usd = limit_usd
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, open(self.path.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                data = json.loads(self.path.read_text()) if self.path.exists() else {}
+                yield data
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+                tmp.replace(self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _entry(data: dict, month: str) -> dict:
+        return data.setdefault(month, {"spent_usd": 0.0, "reserved_usd": 0.0, "queries": 0})
+
+    def month_to_date(self, month: Optional[str] = None) -> float:
+        """Settled plus in-flight spend for `month` (default: current)"""
+        with self._locked() as data:
+            entry = self._entry(data, month or _month())
+            return entry["spent_usd"] + entry["reserved_usd"]
+
+    def reserve(self, usd: float, label: str = "") -> str:
+        """Hold `usd` against this month, or raise BudgetExceededError"""
+        month = _month()
+        with self._locked() as data:
+            entry = self._entry(data, month)
+            committed = entry["spent_usd"] + entry["reserved_usd"]
+            if committed + usd > self.limit_usd:
+                raise BudgetExceededError(
+                    f"{label or 'query'} would bring {month} spend to ${committed + usd:.2f}, "
+                    f"over the ${self.limit_usd:.2f} alert threshold"
+                )
+            entry["reserved_usd"] += usd
+        return month
+
+    def settle(self, month: str, reserved_usd: float, actual_usd: float):
+        """Replace a reservation with what the job actually cost"""
+        with self._locked() as data:
+            entry = self._entry(data, month)
+            entry["reserved_usd"] = max(0.0, entry["reserved_usd"] - reserved_usd)
+            entry["spent_usd"] += actual_usd
+            entry["queries"] += 1
+
+    def projected_month_end(self) -> float:
+        """Month-to-date spend extrapolated linearly to the end of the month"""
+        now = datetime.now(timezone.utc)
+        days = calendar.monthrange(now.year, now.month)[1]
+        elapsed = (now.day - 1) + now.hour / 24 + now.minute / 1440
+        return self.month_to_date() * days / max(elapsed, 1.0)
+
+
+class BigQueryBackend:
+    """Dry-run estimates and partition metadata from BigQuery"""
+
+    # Partition column type -> start of the default window for rewritten queries
+    window_start = {
+        "DATE": "DATE_SUB(CURRENT_DATE(), INTERVAL {days} DAY)",
+        "DATETIME": "DATETIME_SUB(CURRENT_DATETIME(), INTERVAL {days} DAY)",
+        "TIMESTAMP": "TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)",
+    }
+
+    def __init__(self, client, project: str = PROJECT_ID):
+        self.client = client
+        self.project = project
+        self._partitions: Dict[str, Optional[Tuple[str, str]]] = {}
+
+    def dry_run(self, sql: str, job_config=None) -> Tuple[int, List[str]]:
+        from google.cloud import bigquery
+
+        config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        if job_config is not None and job_config.query_parameters:
+            config.query_parameters = job_config.query_parameters
+        job = self.client.query(sql, job_config=config)
+        tables = [f"{t.project}.{t.dataset_id}.{t.table_id}" for t in job.referenced_tables or ()]
+        return job.total_bytes_processed or 0, tables
+
+    def partition_column(self, table_id: str) -> Optional[Tuple[str, str]]:
+        """(column, type) the table is partitioned on, or None"""
+        if table_id not in self._partitions:
+            try:
+                table = self.client.get_table(table_id)
+            except Exception as e:
+                # INFORMATION_SCHEMA views and other metadata sources have no table entry
+                logger.debug(f"  No table metadata for {table_id}: {e}")
+                self._partitions[table_id] = None
+                return None
+            partitioning = table.time_partitioning
+            if partitioning is None:
+                spec = None
+            elif partitioning.field:
+                types = {f.name: f.field_type for f in table.schema}
+                spec = (partitioning.field, types.get(partitioning.field, "DATE"))
+            else:
+                spec = ("_PARTITIONTIME", "TIMESTAMP")
+            self._partitions[table_id] = spec
+        return self._partitions[table_id]
+
+    def qualify(self, ref: str) -> Optional[str]:
+        """project.dataset.table for a FROM reference; bare names are CTEs"""
+        parts = ref.split(".")
+        if len(parts) == 2:
+            return f"{self.project}.{ref}"
+        return ref if len(parts) == 3 else None
+
+    def table_version(self, table_id: str) -> Optional[str]:
+        """Last-modified stamp from table metadata (no bytes scanned)"""
+        try:
+            modified = self.client.get_table(table_id).modified
+        except Exception as e:
+            logger.debug(f"  No version for {table_id}: {e}")
+            return None
+        return modified.isoformat() if modified else None
+
+    def batches(self, job, page_size: Optional[int] = None) -> Iterator[pa.RecordBatch]:
+        yield from job.result(page_size=page_size).to_arrow_iterable()
+
+    def run(self, sql: str, job_config=None, max_bytes_billed: Optional[int] = None):
+        """Run and wait for completion; returns (job, bytes billed)"""
+        from google.cloud import bigquery
+
+        config = job_config or bigquery.QueryJobConfig()
+        if max_bytes_billed and not config.maximum_bytes_billed:
+            config.maximum_bytes_billed = max_bytes_billed
+        job = self.client.query(sql, job_config=config)
+        job.result()
+        return job, job.total_bytes_billed or 0
+
+
+class DuckDBBackend:
+    """Local stand-in: estimates scanned bytes the way BigQuery bills them
+
+    Bytes = rows read x width of the columns read. A scan filtered on the
+    table's partition column reads the planner's estimated rows (pruned
+    partitions); any other scan reads the whole table. `partitions` maps
+    table name -> (partition column, type), as BigQuery metadata would.
+    """
+
+    window_start = {
+        "DATE": "CURRENT_DATE - INTERVAL {days} DAY",
+        "TIMESTAMP": "CURRENT_TIMESTAMP - INTERVAL {days} DAY",
+    }
+    _WIDTHS = {"BOOLEAN": 1, "TINYINT": 1, "SMALLINT": 2, "INTEGER": 4, "DATE": 8, "VARCHAR": 16}
+
+    def __init__(self, con, partitions: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.con = con
+        self.partitions = partitions or {}
+
+    def _widths(self, table: str) -> Dict[str, int]:
+        rows = self.con.cursor().execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?", [table]
+        ).fetchall()
+        return {name: self._WIDTHS.get(dtype, 8) for name, dtype in rows}
+
+    def dry_run(self, sql: str, job_config=None) -> Tuple[int, List[str]]:
+        # A cursor per call: the gateway is shared across threads
+        cursor = self.con.cursor()
+        plan = json.loads(cursor.execute(f"EXPLAIN (FORMAT json) {sql}").fetchall()[0][1])
+        total, tables = 0, []
+        stack = list(plan)
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("children", ()))
+            info = node.get("extra_info", {})
+            if node.get("name") != "SEQ_SCAN" or "Table" not in info:
+                continue
+            table = info["Table"].split(".")[-1]
+            tables.append(table)
+            widths = self._widths(table)
+            filters = info.get("Filters", "")
+            filters = " ".join(filters) if isinstance(filters, list) else filters
+            columns = set(info.get("Projections", ())) | {c for c in widths if re.search(rf"\b{c}\b", filters)}
+            spec = self.partitions.get(table)
+            if spec and re.search(rf"\b{spec[0]}\b", filters):
+                rows = int(info.get("Estimated Cardinality", 0))
+            else:
+                rows = cursor.execute(f"SELECT COUNT(*) FROM {info['Table']}").fetchone()[0]
+            total += rows * sum(widths.get(c, 8) for c in columns or widths)
+        return total, tables
+
+    def partition_column(self, table_id: str) -> Optional[Tuple[str, str]]:
+        return self.partitions.get(table_id.split(".")[-1])
+
+    def qualify(self, ref: str) -> Optional[str]:
+        return ref
+
+    def table_version(self, table_id: str) -> Optional[str]:
+        """Row count plus an order-independent content hash (DuckDB keeps no mtimes)"""
+        try:
+            count, digest = self.con.cursor().execute(
+                f"SELECT COUNT(*), bit_xor(hash(t)) FROM {table_id} AS t"
+            ).fetchone()
+        except duckdb.Error as e:
+            logger.debug(f"  No version for {table_id}: {e}")
+            return None
+        return f"{count}:{digest}"
+
+    def batches(self, table: pa.Table, page_size: Optional[int] = None) -> Iterator[pa.RecordBatch]:
+        yield from table.to_batches(max_chunksize=page_size or 100_000)
+
+    def run(self, sql: str, job_config=None, max_bytes_billed: Optional[int] = None):
+        """Run and fetch the whole result, so it is read while the concurrency slot is held"""
+        return self.con.cursor().execute(sql).to_arrow_table(), 0
+
+
+class QueryGateway:
+    """Single entry point for warehouse queries: estimate, check, reserve, run"""
+
+    def __init__(
+        self,
+        backend,
+        ledger: Optional[SpendLedger] = None,
+        policy: str = "reject",
+        max_concurrent: int = 5,
+        max_range_days: int = 30,
+        max_query_bytes: Optional[int] = None,
+        cache: Optional[QueryResultCache] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.backend = backend
+        self.ledger = ledger
+        self.policy = policy
+        self.max_range_days = max_range_days
+        self.max_query_bytes = max_query_bytes
+        self.cache = cache
+        self.stats = GuardStats()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, backend, config: Optional[dict] = None, ledger_path: Path = DEFAULT_LEDGER):
+        """Gateway with the limits from cost_optimization_config.yaml"""
+        if config is None:
+            from src.utils.config import load_optimization_config
+            config = load_optimization_config()
+        bq = config["bigquery"]
+        limit = config["budget_cap_usd"] * config["alert_threshold_percent"] / 100
+        max_gb = bq.get("max_query_gb")
+        cache = None
+        if bq.get("enable_query_cache"):
+            cache_gb = bq.get("cache_max_gb")
+            cache = QueryResultCache(
+                ttl_hours=bq.get("cache_ttl_hours"),
+                max_bytes=int(cache_gb * 1024 ** 3) if cache_gb else None,
+            )
+        return cls(
+            backend,
+            ledger=SpendLedger(ledger_path, limit_usd=limit),
+            policy=bq.get("partition_filter_policy", "reject"),
+            max_concurrent=bq["max_concurrent_queries"],
+            max_range_days=bq["max_query_date_range_days"],
+            max_query_bytes=int(max_gb * 1024 ** 3) if max_gb else None,
+            cache=cache,
+        )
+
+    @staticmethod
+    def _unfiltered_refs(sql: str, table_id: str, column: str) -> List[re.Match]:
+        """FROM / JOIN references of `table_id` whose own WHERE never touches `column`
+
+        Matches are taken on the masked SQL (same positions as `sql`). A
+        reference counts as filtered when its query level's predicate names
+        the column bare or qualified by that reference's alias / table name
+        (not `DATE '...'` literals or DATE(...) calls).
+        """
+        masked = _mask(sql)
+        name = table_id.split(".")[-1]
+        missing = []
+        for m in _reference_pattern(name).finditer(masked):
+            qualifiers = "|".join(re.escape(q) for q in (name, _alias(m)) if q)
+            used = rf"(?<![\w.])(?:`?(?:{qualifiers})`?\.)?`?{re.escape(column)}`?(?!\w|\s*['(])"
+            if not re.search(used, _predicate(masked, m.end(2)), re.IGNORECASE):
+                missing.append(m)
+        return missing
+
+    def _unfiltered(self, sql: str, tables: List[str]) -> List[Tuple[str, str, str]]:
+        """Partitioned tables with a FROM / JOIN reference not filtered on the partition column"""
+        missing = []
+        for table_id in dict.fromkeys(tables):
+            spec = self.backend.partition_column(table_id)
+            if spec is None:
+                continue
+            column, column_type = spec
+            if self._unfiltered_refs(sql, table_id, column):
+                missing.append((table_id, column, column_type))
+        return missing
+
+    def _rewrite(self, sql: str, table_id: str, column: str, column_type: str) -> str:
+        """Replace each unfiltered FROM/JOIN of `table_id` with a subquery over the default window"""
+        name = table_id.split(".")[-1]
+        start = self.backend.window_start.get(column_type, self.backend.window_start["DATE"]).format(days=self.max_range_days)
+        for m in reversed(self._unfiltered_refs(sql, table_id, column)):
+            alias = _alias(m)
+            tail = f" AS {alias}" if alias else f" AS {name}" + sql[m.end(2):m.end()]
+            ref = sql[m.start(2):m.end(2)]
+            wrapped = f"{m.group(1)} (SELECT * FROM {ref} WHERE {column} >= {start}){tail}"
+            sql = sql[:m.start()] + wrapped + sql[m.end():]
+        return sql
+
+    def estimate(self, sql: str, allow_full_scan: bool = False, job_config=None) -> QueryEstimate:
+        """Dry-run `sql`, enforcing the partition filter policy"""
+        bytes_processed, tables = self.backend.dry_run(sql, job_config)
+        rewritten = []
+        if self.policy != "off" and not allow_full_scan:
+            missing = self._unfiltered(sql, tables)
+            if missing and self.policy == "reject":
+                with self._stats_lock:
+                    self.stats.rejected += 1
+                raise PartitionFilterError(
+                    "no partition filter on " + ", ".join(f"{t} ({c})" for t, c, _ in missing)
+                    + "; filter the partition column or pass allow_full_scan=True"
+                )
+            for table_id, column, column_type in missing:
+                sql = self._rewrite(sql, table_id, column, column_type)
+                rewritten.append(table_id)
+            if rewritten:
+                logger.warning(f"⚠️  No partition filter on {', '.join(rewritten)}: "
+                               f"limited to the last {self.max_range_days} days")
+                bytes_processed, tables = self.backend.dry_run(sql, job_config)
+        return QueryEstimate(sql, bytes_processed, tables, rewritten)
+
+    def query(self, sql: str, job_config=None, allow_full_scan: bool = False, label: str = ""):
+        """Run `sql` under the guard; returns the finished job (BigQuery) or Arrow table (DuckDB)"""
+        return self._run(sql, job_config, allow_full_scan, label)[0]
+
+    def _run(self, sql: str, job_config, allow_full_scan: bool, label: str):
+        estimate = self.estimate(sql, allow_full_scan=allow_full_scan, job_config=job_config)
+        if self.max_query_bytes and estimate.bytes_processed > self.max_query_bytes:
+            with self._stats_lock:
+                self.stats.rejected += 1
+            raise QueryCostError(
+                f"{label or 'query'} would scan {estimate.bytes_processed / 1024 ** 3:,.1f} GB, "
+                f"over the {self.max_query_bytes / 1024 ** 3:,.0f} GB per-query limit"
+            )
+        month = self.ledger.reserve(estimate.cost_usd, label) if self.ledger else None
+        billed = 0
+        try:
+            with self._slots:
+                result, billed = self.backend.run(estimate.sql, job_config, self.max_query_bytes)
+        finally:
+            if self.ledger:
+                self.ledger.settle(month, estimate.cost_usd, cost_usd(billed))
+            with self._stats_lock:
+                self.stats.queries += 1
+                self.stats.rewritten += bool(estimate.rewritten)
+                self.stats.estimated_bytes += estimate.bytes_processed
+                self.stats.billed_bytes += billed
+        logger.debug(f"  {label or 'query'}: ~{estimate.bytes_processed / 1024 ** 2:,.1f} MB scanned, "
+                     f"{billed / 1024 ** 2:,.1f} MB billed")
+        return result, billed
+
+    def _versions(self, sql: str, tables: Optional[Iterable[str]]) -> Optional[Dict[str, str]]:
+        """Version stamp per table the result depends on, or None if any is unknown"""
+        refs = tables if tables is not None else referenced_tables(sql)
+        table_ids = [self.backend.qualify(ref) for ref in refs]
+        if not table_ids or None in table_ids:
+            return None
+        with ThreadPoolExecutor(max_workers=min(8, len(table_ids))) as pool:
+            versions = dict(zip(table_ids, pool.map(self.backend.table_version, table_ids)))
+        return None if None in versions.values() else versions
+
+    def read(
+        self,
+        sql: str,
+        allow_full_scan: bool = False,
+        label: str = "",
+        tables: Optional[Iterable[str]] = None,
+        page_size: Optional[int] = None,
+        cache: bool = True,
+    ) -> Iterator[pa.RecordBatch]:
+        """Result batches, from the result cache when the source tables are unchanged
+
+        `tables` overrides the tables parsed from the FROM / JOIN clauses.
+        `cache=False` bypasses the result cache, e.g. for INFORMATION_SCHEMA
+        reads, which are metadata already and cost more to version than to run.
+        """
+        use_cache = cache and self.cache is not None
+        versions = self._versions(sql, tables) if use_cache else None
+        if versions is not None:
+            key = cache_key(sql, versions)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"  {label or 'query'}: served from cache ({cached.num_rows:,} rows)")
+                yield from cached.to_batches(max_chunksize=page_size)
+                return
+        elif use_cache:
+            self.cache.stats.uncacheable += 1
+
+        result, billed = self._run(sql, None, allow_full_scan, label)
+        batches = self.backend.batches(result, page_size)
+        if versions is not None:
+            batches = self.cache.store(key, sql, versions, batches, bytes_billed=billed)
+        yield from batches
+
+    def read_table(self, sql: str, **kwargs) -> pa.Table:
+        """read() collected into one Arrow table"""
+        batches = list(self.read(sql, **kwargs))
+        return pa.Table.from_batches(batches) if batches else pa.table({})
+
+
+_gateways: Dict[Tuple[str, Optional[int]], QueryGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(project: str = PROJECT_ID, client=None) -> QueryGateway:
+    """Process-wide BigQuery gateway on `client` (default: the shared pooled client)"""
+    # The gateway holds the client, so its id stays unique while cached
+    key = (project, id(client) if client is not None else None)
+    with _gateways_lock:
+        gateway = _gateways.get(key)
+        if gateway is None:
+            gateway = QueryGateway.from_config(BigQueryBackend(client or get_client(project), project))
+            _gateways[key] = gateway
+    return gateway
+
+
+def guarded_query(sql: str, job_config=None, allow_full_scan: bool = False, label: str = "", project: str = PROJECT_ID):
+    """Shorthand for get_gateway(project).query(...)"""
+    return get_gateway(project).query(sql, job_config=job_config, allow_full_scan=allow_full_scan, label=label)
@@ -0,0 +1,52 @@
+"""
+Secret Manager access with an in-process TTL cache
+Collectors that run in loops (or several times per process) read each secret
+once per TTL instead of paying a Secret Manager round trip on every call.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+PROJECT_ID = "cbi-v15"
+SECRET_TTL_SECONDS = 15 * 60
+
+_cache: Dict[Tuple[str, str, str], Tuple[float, str]] = {}
+_lock = threading.Lock()
+_client = None
+
+
+def _secret_client():
+    global _client
+    if _client is None:
+        from google.cloud import secretmanager
+
+        _client = secretmanager.SecretManagerServiceClient()
+    return _client
+
+
+def get_secret(
+    name: str,
+    project: str = PROJECT_ID,
+    version: str = "latest",
+    ttl: float = SECRET_TTL_SECONDS,
+) -> str:
+    """Return the secret payload, from cache if it was read less than `ttl` seconds ago"""
+    key = (project, name, version)
+    with _lock:
+        cached = _cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        # Fetched under the lock so concurrent callers share one round trip
+        response = _secret_client().access_secret_version(
+            request={"name": f"projects/{project}/secrets/{name}/versions/{version}"}
+        )
+        value = response.payload.data.decode("UTF-8")
+        _cache[key] = (time.monotonic(), value)
+        return value
+
+
+def clear_secret_cache(name: Optional[str] = None):
+    """Forget cached secrets (all, or every version of `name`), e.g. after a rotation"""
+    with _lock:
+        for key in [k for k in _cache if name is None or k[1] == name]:
+            del _cache[key]
@@ -0,0 +1,58 @@
+import io
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import databento as db
+import databento_dbn as dbn
+import pytest
+
+from src.ingestion.databento.backfill import _to_ns
+
+
+class DailyBarSource:
+    """Backfill source serving one daily bar per day for the request's first symbol
+
+    Symbol mappings cover only the requested range, like the live API.
+    `failures` holds, per symbol and call, an error to raise or None to answer;
+    `price(day)` sets every price of that day's bar.
+    """
+
+    def __init__(self, symbols, failures=None, price=lambda day: 50.0):
+        self.ids = {symbol: i + 1 for i, symbol in enumerate(symbols)}
+        self.failures = failures or {}
+        self.price = price
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch(self, request, start, end):
+        symbol = request.symbols[0]
+        with self._lock:
+            self.calls.append((symbol, start, end))
+            pending = self.failures.get(symbol)
+            error = pending.pop(0) if pending else None
+        if error is not None:
+            raise error
+        iid = self.ids[symbol]
+        metadata = dbn.Metadata(
+            dataset=request.dataset, start=_to_ns(start), end=_to_ns(end),
+            stype_in=dbn.SType.CONTINUOUS, stype_out=dbn.SType.INSTRUMENT_ID, schema=dbn.Schema.OHLCV_1D,
+            symbols=[symbol], partial=[], not_found=[],
+            mappings=[SimpleNamespace(raw_symbol=symbol, intervals=[
+                SimpleNamespace(start_date=start, end_date=end, symbol=str(iid)),
+            ])],
+        )
+        buf = io.BytesIO()
+        buf.write(bytes(metadata))
+        day = start
+        while day < end:
+            px = round(self.price(day) * 10**9)
+            buf.write(bytes(dbn.OHLCVMsg(0x23, 1, iid, _to_ns(day), px, px, px, px, 1000)))
+            day += timedelta(days=1)
+        return db.DBNStore.from_bytes(buf.getvalue())
+
+
+@pytest.fixture
+def bar_source():
+    """Factory for DailyBarSource"""
+    return DailyBarSource
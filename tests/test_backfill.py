@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+
+from src.ingestion.databento.backfill import BackfillCheckpoint, BackfillRequest, DBNFileSource, run_backfill
+from src.ingestion.databento.motherduck import TABLE, ZL_OHLCV_DDL, MotherDuckSink
+
+SYMBOL = "ZL.c.0"
+START, END = date(2020, 1, 1), date(2021, 1, 1)
+
+
+def _price(day):
+    return 40 + day.timetuple().tm_yday / 10
+
+
+def _write_dbn(bar_source, path, start, end):
+    """A saved pull of daily SYMBOL bars over [start, end), priced by day of year"""
+    request = BackfillRequest(symbols=(SYMBOL,), start=start, end=end)
+    bar_source([SYMBOL], price=_price).fetch(request, start, end).to_file(path)
+    return path
+
+
+@pytest.fixture
+def source(tmp_path, bar_source):
+    # Two saved pulls that overlap for three months
+    return DBNFileSource([
+        _write_dbn(bar_source, tmp_path / "2020a.dbn", date(2020, 1, 1), date(2020, 9, 1)),
+        _write_dbn(bar_source, tmp_path / "2020b.dbn", date(2020, 6, 1), END),
+    ])
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute(ZL_OHLCV_DDL)
+    return con
+
+
+class InterruptedSink(MotherDuckSink):
+    """Fails on write number `fail_on`, as a crash mid-backfill would"""
+
+    def __init__(self, con, fail_on):
+        super().__init__(con)
+        self.fail_on = fail_on
+        self.writes = 0
+
+    def write(self, store):
+        self.writes += 1
+        if self.writes == self.fail_on:
+            raise ConnectionError("connection reset")
+        return super().write(store)
+
+
+def test_overlapping_files_map_each_bar_once(source):
+    request = BackfillRequest(symbols=(SYMBOL,), start=START, end=END)
+
+    store = source.fetch(request, date(2020, 5, 1), date(2020, 10, 1))
+
+    assert [(i["start_date"], i["end_date"]) for i in store.mappings[SYMBOL]] == [(START, END)]
+    assert len(store.to_df()) == (date(2020, 10, 1) - date(2020, 5, 1)).days
+
+
+def test_resume_after_interruption_has_no_gaps_or_duplicates(source, con, tmp_path):
+    request = BackfillRequest(symbols=(SYMBOL,), start=START, end=END)
+    path = tmp_path / "checkpoint.json"
+
+    with pytest.raises(ConnectionError):
+        run_backfill(source, InterruptedSink(con, fail_on=4), request, window_days=60,
+                     checkpoint=BackfillCheckpoint(path))
+    # Three 60-day windows were written before the failure
+    checkpoint = BackfillCheckpoint(path)
+    assert checkpoint.completed_through(request.key) == START + timedelta(days=180)
+
+    fetched = []
+
+    class RecordingSource:
+        def fetch(self, request, start, end):
+            fetched.append(start)
+            return source.fetch(request, start, end)
+
+    resumed = run_backfill(RecordingSource(), MotherDuckSink(con), request, window_days=60, checkpoint=checkpoint)
+
+    assert fetched[0] == START + timedelta(days=180)
+    assert resumed == (END - START).days - 180
+    assert con.execute(f"SELECT COUNT(*), COUNT(DISTINCT date), MIN(date), MAX(date) FROM {TABLE}").fetchone() == (
+        366, 366, START, END - timedelta(days=1),
+    )
+    # Every bar carries its own day's price, whichever file it came from
+    assert con.execute(f"""
+        SELECT COUNT(*) FROM {TABLE} WHERE close <> CAST(40 + dayofyear(date) / 10 AS DECIMAL(10, 2))
+    """).fetchone()[0] == 0
+    assert BackfillCheckpoint(path)._state[request.key]["rows"] == 366
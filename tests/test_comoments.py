@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+import duckdb
+import numpy as np
+import polars as pl
+import pytest
+
+from src.features.comoments import (
+    FX_COLUMNS,
+    FX_DDL,
+    FX_TABLE,
+    cross_asset_betas,
+    fx_correlations,
+    pair_correlations,
+    write_frames,
+)
+
+DAYS = 150
+DATES = [date(2024, 1, 1) + timedelta(days=i) for i in range(DAYS)]
+# DX skips every seventh day; its return after a gap spans both days
+DX_DATES = [d for i, d in enumerate(DATES) if i % 7 != 3]
+
+
+def _walk(rng, n, start):
+    return start * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+@pytest.fixture(scope="module")
+def bars():
+    rng = np.random.default_rng(7)
+    zl = _walk(rng, DAYS, 50.0)
+    zs = zl * 20 * np.exp(rng.normal(0, 0.005, DAYS))
+    frames = [
+        pl.DataFrame({"date": DATES, "symbol": "ZL", "close": zl}),
+        pl.DataFrame({"date": DATES, "symbol": "ZS", "close": zs}),
+        pl.DataFrame({"date": DATES, "symbol": "6L", "close": _walk(rng, DAYS, 0.2)}),
+        pl.DataFrame({"date": DX_DATES, "symbol": "DX", "close": _walk(rng, len(DX_DATES), 104.0)}),
+    ]
+    return pl.concat(frames)
+
+
+def _returns(bars, symbol):
+    """date -> log return on the symbol's own calendar"""
+    rows = bars.filter(pl.col("symbol") == symbol).sort("date")
+    closes = rows["close"].to_numpy()
+    return dict(zip(rows["date"].to_list()[1:], np.diff(np.log(closes))))
+
+
+def _window(bars, x, y, end, window):
+    """The last `window` paired returns of x and y up to `end`"""
+    rx, ry = _returns(bars, x), _returns(bars, y)
+    common = sorted(d for d in rx if d in ry and d <= end)[-window:]
+    return np.array([rx[d] for d in common]), np.array([ry[d] for d in common])
+
+
+def _at(frame, day, **keys):
+    condition = pl.col("date") == day
+    for column, value in keys.items():
+        condition &= pl.col(column) == value
+    return frame.filter(condition).row(0, named=True)
+
+
+def test_pair_correlations_match_corrcoef(bars):
+    frame = pl.concat(pair_correlations(bars, ["ZL", "ZS", "DX"], windows=(30, 60)))
+    for day in (DATES[-1], DATES[100]):
+        for pair, (x, y) in {"ZL_ZS": ("ZL", "ZS"), "ZL_DX": ("ZL", "DX")}.items():
+            row = _at(frame, day, symbol_pair=pair)
+            for w in (30, 60):
+                expected = np.corrcoef(*_window(bars, x, y, day, w))[0, 1]
+                assert row[f"corr_{w}d"] == pytest.approx(expected, abs=1e-9)
+
+
+def test_short_history_is_null(bars):
+    frame = pl.concat(pair_correlations(bars, ["ZL", "ZS"], windows=(30,)))
+    assert _at(frame, DATES[29], symbol_pair="ZL_ZS")["corr_30d"] is None
+    assert _at(frame, DATES[30], symbol_pair="ZL_ZS")["corr_30d"] is not None
+
+
+def test_betas_match_ols(bars):
+    frame = cross_asset_betas(bars, "ZL", ["ZS", "DX"], windows=(30, 90))
+    for asset in ("ZS", "DX"):
+        row = _at(frame, DATES[-1], asset=asset)
+        for w in (30, 90):
+            x, y = _window(bars, asset, "ZL", DATES[-1], w)
+            slope = np.polyfit(x, y, 1)[0]
+            assert row[f"beta_{w}d"] == pytest.approx(slope, rel=1e-9)
+
+
+def test_fx_columns_written(bars):
+    frame = fx_correlations(bars)
+    row = _at(frame, DATES[-1])
+    for fx, symbol in (("brl", "6L"), ("dxy", "DX")):
+        for w in (30, 60, 90):
+            expected = np.corrcoef(*_window(bars, "ZL", symbol, DATES[-1], w))[0, 1]
+            assert row[f"corr_zl_{fx}_{w}d"] == pytest.approx(expected, abs=1e-9)
+        magnitude = abs(row[f"corr_zl_{fx}_60d"])
+        assert row[f"corr_regime_zl_{fx}"] == ("high" if magnitude >= 0.6 else "medium" if magnitude >= 0.3 else "low")
+
+    con = duckdb.connect()
+    assert write_frames(con, [frame], FX_TABLE, FX_DDL, FX_COLUMNS) == DAYS - 1
+    assert con.execute(f"SELECT COUNT(*) FROM {FX_TABLE} WHERE corr_zl_dxy_90d IS NOT NULL").fetchone()[0] > 0
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+import duckdb
+
+from src.ingestion.databento.arrow_loader import load_ohlcv_arrow
+from src.ingestion.databento.backfill import BackfillRequest, utc_today
+from src.ingestion.databento.cache import CachedSource, DatabentoCache
+from src.ingestion.databento.motherduck import TABLE, ZL_OHLCV_DDL
+
+SYMBOL = "ZL.c.0"
+
+
+def _loaded_rows(store):
+    con = duckdb.connect()
+    con.execute(ZL_OHLCV_DDL)
+    load_ohlcv_arrow(con, store, TABLE)
+    return con.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+
+def test_stitched_segments_keep_every_mapping(tmp_path, bar_source):
+    source = bar_source([SYMBOL])
+    cached = CachedSource(source, DatabentoCache(tmp_path), settle_days=0)
+    request = BackfillRequest(symbols=(SYMBOL,), start=date(2020, 1, 1), end=date(2021, 1, 1))
+
+    cached.fetch(request, date(2020, 1, 1), date(2020, 7, 1))
+    cached.fetch(request, date(2020, 7, 1), date(2021, 1, 1))
+    store = cached.fetch(request, date(2020, 1, 1), date(2021, 1, 1))
+
+    assert len(source.calls) == 2
+    assert _loaded_rows(store) == 366
+
+
+def test_unsettled_tail_is_mapped(tmp_path, bar_source):
+    source = bar_source([SYMBOL])
+    cached = CachedSource(source, DatabentoCache(tmp_path), settle_days=3)
+    today = utc_today()
+    request = BackfillRequest(symbols=(SYMBOL,), start=today - timedelta(days=30), end=today)
+
+    store = cached.fetch(request, request.start, request.end)
+
+    assert _loaded_rows(store) == 30
+
+
+def test_eviction_skips_segments_being_read(tmp_path, bar_source):
+    source = bar_source([SYMBOL])
+    cache = DatabentoCache(tmp_path, max_bytes=1)
+    cached = CachedSource(source, cache, settle_days=0)
+    request = BackfillRequest(symbols=(SYMBOL,), start=date(2020, 1, 1), end=date(2021, 1, 1))
+
+    cached.fetch(request, date(2020, 1, 1), date(2020, 7, 1))
+    # Every gap's put() evicts down to max_bytes; this request's own segments must survive until read
+    store = cached.fetch(request, date(2019, 7, 1), date(2021, 1, 1))
+
+    assert _loaded_rows(store) == 550
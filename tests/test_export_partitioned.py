@@ -0,0 +1,104 @@
+import json
+import sys
+from pathlib import Path
+
+import duckdb
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "cbi-v15-scripts" / "export"))
+
+from export_partitioned import MANIFEST_NAME, SPLITS, DuckDBSource, export_partitioned, partition_path  # noqa: E402
+
+# Split -> [first day, last day) of its rows; two symbols per day
+RANGES = {"train": ("2023-11-01", "2024-03-01"), "val": ("2024-03-01", "2024-04-15"), "test": ("2024-04-15", "2024-05-01")}
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "matrix.duckdb")
+    con = duckdb.connect(path)
+    con.execute("CREATE SCHEMA training")
+    for split, (start, end) in RANGES.items():
+        con.execute(f"""
+            CREATE TABLE {SPLITS[split]} AS
+            SELECT d::DATE AS date, s AS symbol, 50 + dayofyear(d) / 10 AS close
+            FROM range(DATE '{start}', DATE '{end}', INTERVAL 1 DAY) t(d), (VALUES ('ZL'), ('ZS')) v(s)
+        """)
+    con.close()
+    return path
+
+
+def _export(database, root, source_class=DuckDBSource, full=False):
+    source = source_class(database)
+    try:
+        return export_partitioned(source, root, full=full)
+    finally:
+        source.con.close()
+
+
+def _manifest(root):
+    with open(root / MANIFEST_NAME) as f:
+        return json.load(f)["partitions"]
+
+
+def _modified(root):
+    return {p.relative_to(root): (p.stat().st_ino, p.stat().st_mtime_ns) for p in root.rglob("*.parquet")}
+
+
+def _exported(root, split):
+    return sum(pq.read_table(root / e["file"]).num_rows for e in _manifest(root).values() if e["split"] == split)
+
+
+def test_rerun_rewrites_only_months_whose_stamp_changed(database, tmp_path):
+    root = tmp_path / "daily_ml_matrix"
+    # train: Nov-Feb, val: Mar-Apr, test: Apr
+    assert _export(database, root) == 4 + 2 + 1
+    before = _modified(root)
+
+    con = duckdb.connect(database)
+    con.execute(f"UPDATE {SPLITS['train']} SET close = close + 1 WHERE date = DATE '2024-01-15'")
+    con.execute(f"DELETE FROM {SPLITS['train']} WHERE date < DATE '2023-12-01'")
+    con.execute(f"INSERT INTO {SPLITS['test']} SELECT DATE '2024-05-02', 'ZL', 60")
+    rows = {split: con.execute(f"SELECT COUNT(*) FROM {SPLITS[split]}").fetchone()[0] for split in SPLITS}
+    con.close()
+
+    # Jan 2024 of train (revised) and May 2024 of test (new)
+    assert _export(database, root) == 2
+    after = _modified(root)
+
+    changed = {p for p in after if before.get(p) != after[p]}
+    assert changed == {
+        partition_path(root, "train", 2024, 1).relative_to(root),
+        partition_path(root, "test", 2024, 5).relative_to(root),
+    }
+    # November left the source, so its file and manifest entry are gone
+    assert not partition_path(root, "train", 2023, 11).exists()
+    assert "split=train/year=2023/month=11" not in _manifest(root)
+    assert {split: _exported(root, split) for split in SPLITS} == rows
+    # Nothing changed since: a third run rewrites nothing
+    assert _export(database, root) == 0
+
+
+class VanishingSource(DuckDBSource):
+    """Stamps promise rows for val in March, but the read finds none"""
+
+    def batches(self, table_ref, start, end):
+        if table_ref == SPLITS["val"] and start.month == 3:
+            return iter(())
+        return super().batches(table_ref, start, end)
+
+
+def test_empty_read_is_left_out_of_the_manifest(database, tmp_path):
+    root = tmp_path / "daily_ml_matrix"
+    _export(database, root)
+    march = partition_path(root, "val", 2024, 3)
+    assert march.exists()
+
+    assert _export(database, root, source_class=VanishingSource, full=True) == 7
+    manifest = _manifest(root)
+
+    # The old file of the emptied month does not linger
+    assert "split=val/year=2024/month=03" not in manifest
+    assert not march.exists()
+    assert all((root / e["file"]).exists() for e in manifest.values())
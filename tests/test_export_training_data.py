@@ -0,0 +1,82 @@
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import duckdb
+import pyarrow.parquet as pq
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "cbi-v15-scripts" / "export" / "export_training_data.py"
+
+spec = importlib.util.spec_from_file_location("export_training_data", SCRIPT)
+export_training_data = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(export_training_data)
+
+SPLIT_ROWS = {"train": 2_500, "val": 400, "test": 0}
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "matrix.duckdb")
+    con = duckdb.connect(path)
+    con.execute("CREATE SCHEMA training")
+    for split, rows in SPLIT_ROWS.items():
+        table = export_training_data.SPLITS[split]
+        # Two symbols per date, a NULL-only column and mixed types, like the real matrix
+        con.execute(f"""
+            CREATE TABLE {table} AS
+            SELECT DATE '2015-01-01' + (i // 2)::INTEGER AS date,
+                   CASE WHEN i % 2 = 0 THEN 'ZL' ELSE 'ZS' END AS symbol,
+                   i / 7 AS feature_a,
+                   i::BIGINT * 1000 AS volume,
+                   NULL::DOUBLE AS target_6m_price,
+                   CASE WHEN i % 3 = 0 THEN 'bull' END AS regime
+            FROM range({rows}) t(i)
+        """)
+    con.close()
+    return path
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    out = tmp_path / "exports"
+    monkeypatch.setattr(export_training_data, "OUTPUT_DIR", out)
+    # Small pages and row groups so every split spans several of each
+    monkeypatch.setattr(export_training_data, "PAGE_SIZE", 256)
+    monkeypatch.setattr(export_training_data, "ROW_GROUP_ROWS", 1_000)
+    return out
+
+
+def test_streamed_splits_match_the_source(database, output_dir):
+    export_training_data.export_all_splits(batches=export_training_data.duckdb_batches_factory(database))
+
+    con = duckdb.connect(database, read_only=True)
+    for split, rows in SPLIT_ROWS.items():
+        path = output_dir / f"daily_ml_matrix_{split}.parquet"
+        if rows == 0:
+            assert not path.exists()
+            assert not path.with_suffix(".parquet.tmp").exists()
+            continue
+        source = con.execute(f"SELECT * FROM {export_training_data.SPLITS[split]} ORDER BY date, symbol").to_arrow_table()
+        exported = pq.read_table(path)
+        assert exported.num_rows == rows
+        assert exported.schema.equals(source.schema, check_metadata=False)
+        assert exported.equals(source)
+        assert pq.ParquetFile(path).metadata.num_row_groups > 1 or rows <= 1_000
+
+
+def test_dataframe_mode_rejects_other_sources(database, output_dir):
+    with pytest.raises(ValueError):
+        export_training_data.export_all_splits(
+            mode="dataframe", batches=export_training_data.duckdb_batches_factory(database),
+        )
+
+
+def test_cli_rejects_duckdb_with_dataframe_mode(database, tmp_path):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--mode", "dataframe", "--duckdb", database, "--output-dir", str(tmp_path)],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 2
+    assert "--mode dataframe" in result.stderr
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+
+from src.features.matrix import TARGET_HORIZONS
+from src.forecasts.publish import TABLE, DuckDBForecastBackend, ForecastBatch
+
+DATES = [date(2024, 3, 1) + timedelta(i) for i in range(10)]
+
+
+@pytest.fixture
+def backend():
+    return DuckDBForecastBackend(duckdb.connect())
+
+
+def _batch(run_id, models, horizons=("1w", "1m"), offset=0.0):
+    batch = ForecastBatch(run_id)
+    for model in models:
+        for horizon in horizons:
+            batch.add(model, horizon, [{"date": d, "prediction": 50 + i + offset} for i, d in enumerate(DATES)])
+    return batch
+
+
+def _rows(backend):
+    return {
+        h: backend.con.execute(f"""
+            SELECT model_type, run_id, COUNT(*) FROM {TABLE.format(horizon=h)} GROUP BY ALL ORDER BY ALL
+        """).fetchall()
+        for h in TARGET_HORIZONS
+    }
+
+
+def test_republishing_a_run_is_idempotent(backend):
+    stats = _batch("run-1", ["arima", "lgbm"]).publish(backend)
+    first = _rows(backend)
+    _batch("run-1", ["arima", "lgbm"], offset=1.0).publish(backend)
+
+    assert stats.rows == {"1w": 20, "1m": 20}
+    assert _rows(backend) == first == {
+        "1w": [("arima", "run-1", 10), ("lgbm", "run-1", 10)],
+        "1m": [("arima", "run-1", 10), ("lgbm", "run-1", 10)],
+        "3m": [],
+        "6m": [],
+    }
+    # Values come from the second publish
+    assert backend.con.execute("SELECT MIN(prediction) FROM zl_predictions_1w").fetchone()[0] == 51.0
+
+
+def test_rerun_deletes_dropped_models_and_horizons(backend):
+    _batch("run-0", ["naive"], horizons=("1w", "3m")).publish(backend)
+    _batch("run-1", ["arima", "lgbm"], horizons=("1w", "1m")).publish(backend)
+
+    # The rerun drops lgbm and the 1m horizon
+    _batch("run-1", ["arima"], horizons=("1w",)).publish(backend)
+
+    assert _rows(backend) == {
+        "1w": [("arima", "run-1", 10), ("naive", "run-0", 10)],
+        "1m": [],
+        "3m": [("naive", "run-0", 10)],
+        "6m": [],
+    }
+
+
+def test_null_predictions_are_rejected_before_writing(backend):
+    _batch("run-1", ["arima"]).publish(backend)
+    batch = _batch("run-1", ["lgbm"])
+    batch.add_prediction("broken", "1w", DATES[0], None)
+
+    with pytest.raises(ValueError):
+        batch.publish(backend)
+    assert _rows(backend)["1w"] == [("arima", "run-1", 10)]
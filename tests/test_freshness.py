@@ -0,0 +1,49 @@
+import re
+from datetime import date
+
+import duckdb
+import pytest
+
+from src.ops.freshness import collect_status
+from src.utils.query_guard import DuckDBBackend, QueryGateway
+
+PROJECT = "cbi-v15"
+
+
+class BacktickDuckDBBackend(DuckDBBackend):
+    """DuckDB backend that accepts BigQuery's `project.dataset.table` quoting"""
+
+    @staticmethod
+    def _dialect(sql: str) -> str:
+        return re.sub(r"`([^`]+)`", lambda m: ".".join(f'"{part}"' for part in m.group(1).split(".")), sql)
+
+    def dry_run(self, sql, job_config=None):
+        return super().dry_run(self._dialect(sql), job_config)
+
+    def run(self, sql, job_config=None, max_bytes_billed=None):
+        return super().run(self._dialect(sql), job_config, max_bytes_billed)
+
+
+@pytest.fixture
+def gateway():
+    con = duckdb.connect()
+    con.execute(f"ATTACH ':memory:' AS \"{PROJECT}\"")
+    con.execute(f'CREATE SCHEMA "{PROJECT}".market_data')
+    con.execute(f"""
+        CREATE TABLE "{PROJECT}".market_data.prices AS
+        SELECT DATE '2024-01-01' + i::INTEGER AS date, i::DOUBLE AS close FROM range(10) t(i)
+    """)
+    # No INFORMATION_SCHEMA.PARTITIONS here, so the metadata query fails like a missing dataset
+    return QueryGateway(BacktickDuckDBBackend(con, {"prices": ("date", "DATE")}), policy="reject")
+
+
+def test_scan_fallback_reads_partitioned_tables(gateway):
+    statuses = collect_status(None, [("market_data", "prices"), ("market_data", "missing")],
+                              project=PROJECT, gateway=gateway)
+
+    prices = statuses[("market_data", "prices")]
+    assert prices.error is None
+    assert (prices.method, prices.exists, prices.row_count) == ("scan", True, 10)
+    assert (prices.min_date, prices.max_date) == (date(2024, 1, 1), date(2024, 1, 10))
+    assert statuses[("market_data", "missing")].error is not None
+    assert gateway.stats.rejected == 0
@@ -0,0 +1,60 @@
+import asyncio
+
+from aiohttp import web
+
+from src.ingestion.glide import iter_pages
+
+CATALOG = [{"id": i} for i in range(1234)]
+
+
+def _app(mode: str) -> web.Application:
+    async def events(request: web.Request) -> web.Response:
+        limit, offset = int(request.query["limit"]), int(request.query["offset"])
+        if mode == "ignores_limit":
+            data = CATALOG[offset:]
+        elif mode == "ignores_offset":
+            data = CATALOG[:limit]
+        elif mode == "endless":
+            data = [{"id": offset + i} for i in range(limit)]
+        else:
+            data = CATALOG[offset:offset + limit]
+        return web.json_response({"data": data})
+
+    app = web.Application()
+    app.router.add_get("/events", events)
+    return app
+
+
+def _collect(mode: str, **kwargs):
+    async def run():
+        runner = web.AppRunner(_app(mode))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return [page async for page in iter_pages("key", base_url=f"http://127.0.0.1:{port}", **kwargs)]
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+
+def test_stops_on_short_page():
+    pages = _collect("normal", page_size=100, concurrency=4)
+    assert sorted(r["id"] for p in pages for r in p.records) == list(range(1234))
+
+
+def test_stops_on_oversized_page():
+    pages = _collect("ignores_limit", page_size=100, concurrency=1)
+    assert [p.offset for p in pages] == [0]
+    assert len(pages[0].records) == 1234
+
+
+def test_stops_on_repeated_page():
+    pages = _collect("ignores_offset", page_size=100, concurrency=1)
+    assert [p.offset for p in pages] == [0]
+
+
+def test_stops_at_page_cap():
+    pages = _collect("endless", page_size=10, concurrency=4, max_pages=7)
+    assert sorted(p.offset for p in pages) == list(range(0, 70, 10))
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+import duckdb
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from src.features.incremental import JOURNAL_BARS, STATE_TABLE, update_technical_indicators
+from src.features.technical import (
+    OHLCV_TABLE,
+    TECHNICAL_COLUMNS,
+    TECHNICAL_TABLE,
+    compute_technical_indicators,
+    load_ohlcv,
+)
+from src.ingestion.databento.motherduck import ZL_OHLCV_DDL
+
+START = date(2023, 1, 1)
+DAYS = 320
+LOADED, REVISED = "2024-01-01 00:00:00", "2024-02-01 00:00:00"
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute(ZL_OHLCV_DDL)
+    rng = np.random.default_rng(11)
+    frames = []
+    for symbol, level in (("ZL", 50.0), ("HO", 25.0), ("6L", 20.0)):
+        close = level * np.exp(np.cumsum(rng.normal(0, 0.01, DAYS)))
+        frames.append(pl.DataFrame({
+            "date": [START + timedelta(i) for i in range(DAYS)], "symbol": symbol,
+            "open": close * 0.995, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": rng.integers(1000, 1500, DAYS), "open_interest": 5000,
+        }))
+    bars = pl.concat(frames).to_arrow()
+    con.execute(f"INSERT INTO {OHLCV_TABLE} BY NAME SELECT *, TIMESTAMP '{LOADED}' AS updated_at FROM bars")
+    update_technical_indicators(con)
+    return con
+
+
+def _upsert(con, symbol, day, close, volume, updated_at):
+    con.execute(f"""
+        INSERT OR REPLACE INTO {OHLCV_TABLE} (date, symbol, open, high, low, close, volume, open_interest, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 5000, ?)
+    """, [day, symbol, close * 0.995, close * 1.01, close * 0.99, close, volume, updated_at])
+
+
+def _assert_matches_full_recompute(con):
+    stored = con.execute(f"SELECT {', '.join(TECHNICAL_COLUMNS)} FROM {TECHNICAL_TABLE} ORDER BY symbol, date").pl()
+    expected = compute_technical_indicators(load_ohlcv(con)).sort("symbol", "date")
+    assert_frame_equal(stored, expected, check_dtypes=False, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_initial_build_matches_full_recompute(con):
+    _assert_matches_full_recompute(con)
+    assert update_technical_indicators(con) == {}
+
+
+def test_late_bar_rebuilds_from_its_date(con):
+    last = START + timedelta(DAYS - 1)
+    # A 6L bar that arrives after the newer ones were already folded in
+    con.execute(f"DELETE FROM {OHLCV_TABLE} WHERE symbol = '6L' AND date = ?", [last - timedelta(3)])
+    update_technical_indicators(con)
+    _upsert(con, "6L", last - timedelta(3), 25.0, 900, "2024-03-01 00:00:00")
+
+    replayed = update_technical_indicators(con)
+
+    assert replayed == {"6L": 4}
+    _assert_matches_full_recompute(con)
+
+
+def test_revised_and_new_bars_only_replay_the_tail(con):
+    last = START + timedelta(DAYS - 1)
+    # A revised ZL bar ten days back and a new HO bar
+    _upsert(con, "ZL", last - timedelta(10), 60.0, 4000, REVISED)
+    _upsert(con, "HO", last + timedelta(1), 27.0, 1200, REVISED)
+
+    assert update_technical_indicators(con) == {"ZL": 11, "HO": 1}
+    _assert_matches_full_recompute(con)
+
+
+def test_revision_older_than_the_journal_replays_everything(con):
+    _upsert(con, "ZL", START + timedelta(5), 45.0, 3000, REVISED)
+
+    assert update_technical_indicators(con) == {"ZL": DAYS}
+    _assert_matches_full_recompute(con)
+
+
+def test_deleted_bars_are_detected(con):
+    gone = START + timedelta(DAYS - 20)
+    con.execute(f"DELETE FROM {OHLCV_TABLE} WHERE symbol = 'ZL' AND date = ?", [gone])
+
+    assert update_technical_indicators(con) == {"ZL": 19}
+    _assert_matches_full_recompute(con)
+    assert con.execute(f"SELECT COUNT(*) FROM {TECHNICAL_TABLE} WHERE symbol = 'ZL' AND date = ?", [gone]).fetchone()[0] == 0
+
+
+def test_state_journal_stays_bounded(con):
+    last = START + timedelta(DAYS - 1)
+    for i in range(1, 6):
+        _upsert(con, "ZL", last + timedelta(i), 55.0 + i, 1000, f"2024-02-0{i} 00:00:00")
+        update_technical_indicators(con)
+
+    counts = dict(con.execute(f"SELECT symbol, COUNT(*) FROM {STATE_TABLE} GROUP BY symbol").fetchall())
+    assert counts == {"ZL": JOURNAL_BARS, "HO": JOURNAL_BARS, "6L": JOURNAL_BARS}
+    _assert_matches_full_recompute(con)
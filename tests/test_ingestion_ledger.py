@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta, timezone
+
+import duckdb
+import pytest
+
+from src.ingestion.databento.incremental import ledger_source, read_watermarks, record_runs, run_started_at
+from src.ingestion.databento.motherduck import TABLE, ZL_OHLCV_DDL
+from src.ops.ingestion_ledger import CompletionRecord, DuckDBLedger, MirroredLedger
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute(ZL_OHLCV_DDL)
+    return con
+
+
+def test_latest_successful_record_per_source(con):
+    ledger = DuckDBLedger(con)
+    now = datetime.now(timezone.utc)
+    ledger.record(CompletionRecord("databento_zl", TABLE, watermark_date=date(2024, 1, 2),
+                                   completed_at=now - timedelta(hours=2)))
+    ledger.record(CompletionRecord("databento_zl", TABLE, watermark_date=date(2024, 1, 3),
+                                   completed_at=now - timedelta(hours=1), rows_ingested=5, bytes_written=460))
+    ledger.record(CompletionRecord("databento_zl", TABLE, status="failed", error_message="boom",
+                                   watermark_date=date(2024, 1, 9), completed_at=now))
+
+    latest = ledger.latest(["databento_zl", "databento_zs"])
+
+    assert list(latest) == ["databento_zl"]
+    rec = latest["databento_zl"]
+    assert (rec.watermark_date, rec.rows_ingested, rec.bytes_written) == (date(2024, 1, 3), 5, 460)
+
+
+def test_watermark_round_trip(con):
+    ledger = DuckDBLedger(con)
+    started_at = run_started_at(con)
+    con.execute(f"""
+        INSERT INTO {TABLE} (date, symbol, open, high, low, close, volume)
+        SELECT DATE '2024-01-01' + i::INTEGER, 'ZL', 50, 51, 49, 50.5, 1000 FROM range(10) t(i)
+    """)
+
+    record_runs(ledger, con, ["ZL", "ZS"], started_at, duration_seconds=1.5)
+
+    rec = ledger.latest([ledger_source("ZL")])[ledger_source("ZL")]
+    assert (rec.watermark_date, rec.rows_ingested) == (date(2024, 1, 10), 10)
+    assert rec.bytes_written == 10 * (90 + len("ZL"))
+    # ZL is answered from the ledger, not the (now empty) table; ZS never had rows
+    con.execute(f"DELETE FROM {TABLE}")
+    assert read_watermarks(con, ["ZL", "ZS"], ledger=ledger) == {"ZL": date(2024, 1, 10), "ZS": None}
+
+
+class BrokenLedger:
+    def record(self, rec):
+        raise ConnectionError("warehouse unreachable")
+
+
+def test_mirrors_are_best_effort(con):
+    local, copy = DuckDBLedger(con), DuckDBLedger(con, table="mirror_completion")
+    ledger = MirroredLedger(local, BrokenLedger(), copy)
+
+    ledger.record(CompletionRecord("databento_zl", TABLE, watermark_date=date(2024, 1, 3)))
+
+    assert ledger.latest(["databento_zl"])["databento_zl"].watermark_date == date(2024, 1, 3)
+    assert copy.latest(["databento_zl"])["databento_zl"].watermark_date == date(2024, 1, 3)
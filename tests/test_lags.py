@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import duckdb
+import numpy as np
+import polars as pl
+import pytest
+
+from src.features.lags import LAGGED_TABLE, LAGS, LaggedFeatures, base_features
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    frames = []
+    # ZM is shorter than the longest lag, so some of its lags are all NULL
+    for symbol, n in (("ZL", 60), ("ZM", 8), ("ZS", 45)):
+        frames.append(pl.DataFrame({
+            "date": [date(2024, 1, 1) + timedelta(i) for i in range(n)],
+            "symbol": [symbol] * n,
+            "close": 50 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+        }))
+    # Shuffled: base_features sorts by symbol and date
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=1)
+
+
+@pytest.fixture
+def base(bars):
+    return base_features(bars)
+
+
+@pytest.fixture
+def expected(base):
+    return base.select(
+        "date", "symbol",
+        *[pl.col(f).shift(k).over("symbol").alias(f"lag_{k}d_{f}") for f in ("price", "return") for k in LAGS],
+    )
+
+
+def test_columns_match_polars_shift_over_symbol(base, expected):
+    lagged = LaggedFeatures(base)
+
+    for c in lagged.columns:
+        np.testing.assert_array_equal(lagged[c], expected[c].to_numpy(), err_msg=c)
+        np.testing.assert_array_equal(lagged.column(c, 50, 70), expected[c].to_numpy()[50:70], err_msg=c)
+
+
+def test_batches_match_polars_shift_over_symbol(base, expected):
+    lagged = LaggedFeatures(base)
+
+    # A batch size that splits every symbol somewhere inside its lag window
+    frame = pl.concat([pl.from_arrow(b) for b in lagged.batches(batch_rows=7)])
+
+    assert frame.columns == expected.columns
+    # NaN never leaks out: the first return of each symbol is NULL, as in SQL
+    assert frame.select(pl.all().exclude("date", "symbol").is_nan().sum()).sum_horizontal().item() == 0
+    assert frame.equals(expected.with_columns(pl.all().exclude("date", "symbol").fill_nan(None)))
+
+
+def test_lags_never_cross_a_symbol_boundary(base):
+    lagged = LaggedFeatures(base)
+    symbols = base["symbol"].to_numpy()
+
+    for k in LAGS:
+        values = lagged[f"lag_{k}d_price"]
+        source = np.r_[np.full(k, None), symbols[:-k]]
+        assert np.isnan(values[source != symbols]).all()
+        assert not np.isnan(values[source == symbols]).any()
+    # ZM has 8 bars: its 10 and 21 bar lags are empty
+    zm = (symbols == "ZM")
+    assert np.isnan(lagged["lag_10d_price"][zm]).all()
+
+
+def test_view_is_a_read_only_window_on_values(base):
+    lagged = LaggedFeatures(base)
+
+    view, offset = lagged.view("lag_5d_return")
+
+    assert offset == 5
+    assert np.shares_memory(view, lagged.values)
+    assert view.base is not None and not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0] = 1.0
+    assert lagged.values.flags.writeable
+    np.testing.assert_array_equal(view, lagged.values[1, :len(lagged) - 5])
+    # Only the base array is held, however many lags are exposed
+    assert lagged.nbytes == lagged.values.nbytes + lagged.position.nbytes
+
+
+def test_unknown_column_raises(base):
+    with pytest.raises(KeyError):
+        LaggedFeatures(base)["lag_5d_volume"]
+
+
+def test_write_duckdb_matches_sql_lag(bars):
+    con = duckdb.connect()
+    con.register("bars_view", bars.to_arrow())
+    lagged = LaggedFeatures.from_bars(bars)
+
+    assert lagged.write_duckdb(con, batch_rows=16) == len(bars)
+
+    mismatched = con.execute(f"""
+        SELECT COUNT(*) FROM {LAGGED_TABLE} l
+        JOIN (
+            SELECT date, symbol,
+                   LAG(close, 3) OVER w AS price_3,
+                   LAG(close, 21) OVER w AS price_21
+            FROM bars_view WINDOW w AS (PARTITION BY symbol ORDER BY date)
+        ) s USING (date, symbol)
+        WHERE l.lag_3d_price IS DISTINCT FROM s.price_3
+           OR l.lag_21d_price IS DISTINCT FROM s.price_21
+    """).fetchone()[0]
+    assert mismatched == 0
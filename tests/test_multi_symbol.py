@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+from databento.common.error import BentoClientError, BentoServerError
+
+from src.ingestion.databento import multi_symbol
+from src.ingestion.databento.backfill import BackfillCheckpoint
+from src.ingestion.databento.motherduck import TABLE, ZL_OHLCV_DDL, MotherDuckSink
+from src.ingestion.databento.multi_symbol import run_cycle
+from src.utils.rate_limit import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setitem(multi_symbol.PROVIDER_LIMITS, "databento", RateLimiter(rate=1000, burst=1000))
+    monkeypatch.setattr(multi_symbol.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute(ZL_OHLCV_DDL)
+    return con
+
+
+def test_new_symbols_backfill_in_checkpointed_windows(con, tmp_path, bar_source):
+    source = bar_source(["ZS", "ZM"])
+    checkpoint = BackfillCheckpoint(tmp_path / "checkpoint.json")
+
+    results = run_cycle(source, MotherDuckSink(con), con, ["ZS", "ZM"],
+                        full_start=date(2020, 1, 1), end=date(2021, 1, 1),
+                        window_days=90, checkpoint=checkpoint)
+
+    assert [r.status for r in results] == ["ok", "ok"]
+    assert [r.rows for r in results] == [366, 366]
+    assert all(end - start <= timedelta(days=90) for _, start, end in source.calls)
+    assert len(source.calls) == 2 * 5
+    assert con.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0] == 2 * 366
+    assert all(checkpoint.completed_through(f"GLBX.MDP3/ohlcv-1d/continuous/{s}") == date(2021, 1, 1)
+               for s in ("ZS", "ZM"))
+
+
+def test_only_transient_errors_are_retried(con, bar_source):
+    source = bar_source(["ZS", "ZM"], failures={
+        "ZS": [BentoServerError(503, message="unavailable"), BentoClientError(429, message="slow down")],
+        "ZM": [BentoClientError(401, message="bad key")],
+    })
+
+    zs, zm = run_cycle(source, MotherDuckSink(con), con, ["ZS", "ZM"],
+                       full_start=date(2020, 1, 1), end=date(2020, 2, 1))
+
+    assert (zs.status, zs.attempts, zs.rows) == ("ok", 3, 31)
+    assert (zm.status, zm.attempts, zm.rows) == ("failed", 1, 0)
+    assert "401" in zm.error
+
+
+def test_cycle_commits_once_without_the_failed_symbol(con, tmp_path, bar_source):
+    source = bar_source(["ZS", "ZM"], failures={"ZM": [None, BentoClientError(401, message="bad key")]})
+    visible, fetch = [], source.fetch
+
+    def watching_fetch(*args):
+        visible.append(con.cursor().execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0])
+        return fetch(*args)
+
+    source.fetch = watching_fetch
+    checkpoint = BackfillCheckpoint(tmp_path / "checkpoint.json")
+
+    zs, zm = run_cycle(source, MotherDuckSink(con), con, ["ZS", "ZM"],
+                       full_start=date(2020, 1, 1), end=date(2021, 1, 1),
+                       window_days=90, checkpoint=checkpoint, max_workers=1)
+
+    assert (zs.status, zs.rows) == ("ok", 366)
+    assert (zm.status, zm.rows) == ("failed", 0)
+    # Nothing reaches the target table until the cycle's merge
+    assert set(visible) == {0}
+    assert con.execute(f"SELECT symbol, COUNT(*) FROM {TABLE} GROUP BY symbol").fetchall() == [("ZS", 366)]
+    assert checkpoint.completed_through("GLBX.MDP3/ohlcv-1d/continuous/ZS") == date(2021, 1, 1)
+    assert checkpoint.completed_through("GLBX.MDP3/ohlcv-1d/continuous/ZM") is None
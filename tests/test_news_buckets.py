@@ -0,0 +1,77 @@
+import random
+import time
+
+import pytest
+
+from src.news.buckets import BucketClassifier, KeywordAutomaton, tokenize
+
+
+def _matched(automaton, text):
+    return sorted(automaton.keywords[pid] for pid in automaton.matches(tokenize(text)))
+
+
+@pytest.fixture
+def classifier():
+    return BucketClassifier()
+
+
+@pytest.mark.parametrize("text, theme, hits", [
+    ("China imposes tariffs on US soybean exports", "TRADE_GEO", 3),
+    ("Drought cuts crops and yields in Brazil", "SUPPLY_WEATHER", 3),
+    ("Barges stuck as Mississippi ports close", "LOGISTICS", 3),
+])
+def test_plurals_match_singular_keywords(classifier, text, theme, hits):
+    assignment = classifier.classify_text(text)
+    assert assignment.theme_primary == theme
+    assert assignment.hits[theme] == hits
+
+
+def test_short_and_non_plural_words_are_kept():
+    assert tokenize("RFS gas bus analysis class us") == ["rfs", "gas", "bus", "analysis", "class", "us"]
+    assert tokenize("duties boxes crushes") == ["duty", "box", "crush"]
+
+
+def test_overlapping_patterns_all_report():
+    automaton = KeywordAutomaton([("trade", "a"), ("trade war", "b"), ("war", "c"), ("war games", "d")])
+    assert _matched(automaton, "the trade war games") == ["trade", "trade war", "war", "war games"]
+
+
+def test_multi_word_phrases_need_adjacent_tokens():
+    automaton = KeywordAutomaton([("renewable diesel", "x"), ("panama canal", "y")])
+    assert _matched(automaton, "Renewable diesel via the Panama-Canal") == ["panama canal", "renewable diesel"]
+    assert _matched(automaton, "renewable and diesel, panama's canal") == []
+
+
+def test_keywords_match_whole_words_only():
+    automaton = KeywordAutomaton([("rin", "x"), ("fed", "y")])
+    assert _matched(automaton, "Bring the fedora, string cheese") == []
+    assert _matched(automaton, "RIN prices rise as the Fed holds") == ["fed", "rin"]
+
+
+def test_ties_go_to_the_earlier_bucket(classifier):
+    # One SUPPLY_WEATHER and one TRADE_GEO hit: SUPPLY_WEATHER comes first
+    assert classifier.classify_text("Tariff talk overshadows the drought").theme_primary == "SUPPLY_WEATHER"
+    # More hits win regardless of order
+    assert classifier.classify_text("Tariff and export quotas amid drought").theme_primary == "TRADE_GEO"
+
+
+def test_trump_axis_ties_follow_axis_order(classifier):
+    assignment = classifier.classify_text("Trump weighs tariffs on China")
+    assert assignment.is_trump_related
+    assert assignment.policy_axis == "TRADE_CHINA"
+
+
+def test_throughput(classifier):
+    rng = random.Random(1)
+    vocabulary = ("soybean oil futures rose after the report while traders weighed demand from "
+                  "crushers and the outlook for exports tariffs drought biodiesel freight").split()
+    posts = [{"headline": " ".join(rng.choices(vocabulary, k=12)), "content": " ".join(rng.choices(vocabulary, k=120))}
+             for _ in range(5_000)]
+
+    started = time.perf_counter()
+    assignments = classifier.classify_batch(posts)
+    elapsed = time.perf_counter() - started
+
+    assert len(assignments) == len(posts)
+    # ~6,000 posts/s on a laptop; the floor only catches an order-of-magnitude regression
+    assert len(posts) / elapsed > 1_000
@@ -0,0 +1,36 @@
+import duckdb
+
+from src.news.dedup import MEMBERS_TABLE, NearDuplicateIndex
+
+STORY = "Soybean oil futures rallied as the EPA proposed higher biomass-based diesel volumes for 2026 and 2027"
+
+
+def test_empty_text_is_its_own_cluster():
+    index = NearDuplicateIndex()
+    results = [index.add(doc_id, text) for doc_id, text in [("a", ""), ("b", None), ("c", "  ... "), ("d", "")]]
+    assert [(r.cluster_id, r.is_duplicate) for r in results] == [("a", False), ("b", False), ("c", False), ("d", False)]
+    assert len(index) == 0
+    assert index.add("e", STORY).is_duplicate is False
+
+
+def test_repeated_doc_ids_are_not_counted_twice():
+    con = duckdb.connect()
+    index = NearDuplicateIndex(con)
+    batch = [
+        {"article_id": "1", "headline": "EPA", "content": STORY},
+        {"article_id": "1", "headline": "EPA", "content": STORY},   # same article, another theme row
+        {"article_id": "2", "headline": "EPA", "content": STORY + " on Friday"},
+    ]
+    results = index.add_batch(batch)
+    assert [r.cluster_id for r in results] == ["1", "1", "1"]
+    assert [r.is_duplicate for r in results] == [False, False, True]
+    assert results[-1].cluster_count == 2
+    assert index.stats.repeated == 1
+
+    # A later run sees the stored memberships
+    rerun = NearDuplicateIndex(con)
+    again = rerun.add_batch([batch[0], {"article_id": "3", "headline": "", "content": STORY}])
+    assert (again[0].cluster_id, again[0].is_duplicate, again[0].cluster_count) == ("1", False, 2)
+    assert again[1].cluster_count == 3
+    assert rerun.stats.repeated == 1
+    assert con.execute(f"SELECT COUNT(*) FROM {MEMBERS_TABLE}").fetchone()[0] == 3
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from src.news.scoring import (
+    LexiconModel,
+    ScoreCache,
+    SentimentScorer,
+    length_batches,
+    map_to_zl_sentiment,
+    pad_batch,
+)
+
+
+class CountingModel(LexiconModel):
+    """LexiconModel that records every text it scores"""
+
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return super().encode(texts)
+
+
+TEXTS = [
+    "Soybean oil prices rally on strong biodiesel demand",
+    "Tariff retaliation cuts exports",
+    "Markets flat",
+    "Record crush and higher purchases boost demand as buyers surge in",
+]
+
+
+def test_cache_hits_across_calls():
+    model = CountingModel()
+    scorer = SentimentScorer(model, batch_size=2)
+
+    first = scorer.score(TEXTS)
+    second = scorer.score(list(reversed(TEXTS)))
+
+    assert second == list(reversed(first))
+    assert len(model.encoded) == len(TEXTS)
+    assert (scorer.stats.docs, scorer.stats.cache_hits, scorer.stats.scored) == (8, 4, 4)
+
+
+def test_cache_file_survives_restart(tmp_path):
+    path = tmp_path / "scores.duckdb"
+    cache = ScoreCache(path)
+    expected = SentimentScorer(LexiconModel(), cache=cache).score(TEXTS)
+    cache.close()
+
+    model = CountingModel()
+    scorer = SentimentScorer(model, cache=ScoreCache(path))
+    # Whitespace differences hash to the same key
+    assert scorer.score(["  ".join(t.split()) for t in TEXTS]) == expected
+    assert model.encoded == []
+    assert scorer.stats.hit_rate == 1.0
+
+
+def test_duplicates_within_a_call_are_scored_once():
+    model = CountingModel()
+    scorer = SentimentScorer(model)
+
+    scores = scorer.score([TEXTS[0], TEXTS[1], TEXTS[0], None, "", TEXTS[0]])
+
+    assert model.encoded == [TEXTS[0], TEXTS[1], ""]
+    assert scores[0] == scores[2] == scores[5]
+    assert scores[3] == scores[4]
+    assert scorer.stats.duplicates == 3
+
+
+def test_length_batches_group_similar_lengths():
+    lengths = [5, 1, 9, 3, 7, 2]
+    batches = length_batches(lengths, 2)
+    assert [sorted(lengths[i] for i in b) for b in batches] == [[1, 2], [3, 5], [7, 9]]
+
+
+def test_pad_batch_pads_to_the_longest_row():
+    input_ids, attention_mask = pad_batch([[4, 5], [6], [7, 8, 9]], pad_id=0)
+    assert input_ids.shape == attention_mask.shape == (3, 3)
+    assert input_ids.tolist() == [[4, 5, 0], [6, 0, 0], [7, 8, 9]]
+    assert attention_mask.sum(axis=1).tolist() == [2, 1, 3]
+
+
+def test_workers_keep_input_order():
+    rng = np.random.default_rng(3)
+    words = LexiconModel.POSITIVE + LexiconModel.NEGATIVE + ("soybean", "oil", "the", "market")
+    texts = [" ".join(rng.choice(words, size=rng.integers(1, 40))) for _ in range(300)]
+
+    parallel = SentimentScorer(LexiconModel(), batch_size=7, workers=4).score(texts)
+    serial = [SentimentScorer(LexiconModel()).score([t])[0] for t in texts]
+
+    assert parallel == pytest.approx(serial)
+
+
+def _probs(positive, negative):
+    return {"positive": positive, "negative": negative, "neutral": 1 - positive - negative}
+
+
+@pytest.mark.parametrize("probs, text, sentiment, score", [
+    # Tariffs on Chinese UCO imports protect US biofuel demand
+    (_probs(0.8, 0.1), "Tariff on used cooking oil imports", "BULLISH_ZL", 0.8),
+    (_probs(0.2, 0.7), "Tariff on UCO imports dropped", "BEARISH_ZL", 0.7),
+    # Retaliation against US exports destroys demand
+    (_probs(0.8, 0.1), "China retaliation on soybeans", "BEARISH_ZL", 0.8),
+    (_probs(0.2, 0.7), "Trade war eases", "BULLISH_ZL", 0.7),
+    # Other tariff news defaults to bearish
+    (_probs(0.3, 0.6), "New tariff schedule", "BEARISH_ZL", 0.6),
+])
+def test_tariff_mapping(probs, text, sentiment, score):
+    for bucket in ("TRADE_GEO", "tariffs_trade_policy"):
+        result = map_to_zl_sentiment(probs, bucket, text)
+        assert (result["zl_sentiment"], result["sentiment_confidence"]) == (sentiment, score)
+
+
+@pytest.mark.parametrize("probs, sentiment, score", [
+    (_probs(0.7, 0.2), "BULLISH_ZL", 0.7),
+    (_probs(0.2, 0.7), "BEARISH_ZL", 0.7),
+    (_probs(0.3, 0.3), "NEUTRAL", pytest.approx(0.4)),
+])
+def test_other_buckets_follow_the_model(probs, sentiment, score):
+    result = map_to_zl_sentiment(probs, "SUPPLY_WEATHER", "retaliation against US exports")
+    assert (result["zl_sentiment"], result["sentiment_confidence"]) == (sentiment, score)
@@ -0,0 +1,69 @@
+import duckdb
+import pyarrow as pa
+import pytest
+
+from src.utils.query_cache import QueryResultCache
+from src.utils.query_guard import DuckDBBackend, PartitionFilterError, QueryGateway
+
+
+@pytest.fixture
+def gateway():
+    con = duckdb.connect()
+    con.execute("""
+        CREATE TABLE prices AS
+        SELECT DATE '2020-01-01' + i::INTEGER AS date, 'ZL' AS symbol, i::DOUBLE AS close
+        FROM range(2000) t(i)
+    """)
+    return QueryGateway(DuckDBBackend(con, {"prices": ("date", "DATE")}))
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM prices WHERE symbol = 'ZL' ORDER BY date",
+    "SELECT date, AVG(close) FROM prices WHERE symbol = 'ZL' GROUP BY date",
+    "SELECT * FROM prices -- where date > DATE '2024-01-01'",
+    "SELECT * FROM prices WHERE symbol = 'ZL' /* AND date > DATE '2024-01-01' */",
+    "SELECT * FROM prices p JOIN prices q ON p.date = q.date WHERE p.date > DATE '2024-01-01'",
+    "SELECT * FROM prices UNION ALL SELECT * FROM prices WHERE date > DATE '2024-01-01'",
+])
+def test_unfiltered_scans_are_rejected(gateway, sql):
+    with pytest.raises(PartitionFilterError):
+        gateway.estimate(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM prices WHERE date >= DATE '2024-01-01' ORDER BY date",
+    "SELECT * FROM prices p WHERE symbol = 'ZL' AND p.date BETWEEN DATE '2024-01-01' AND DATE '2024-02-01'",
+    "SELECT * FROM (SELECT * FROM prices WHERE date > DATE '2024-01-01') s ORDER BY s.date",
+])
+def test_filtered_scans_pass(gateway, sql):
+    gateway.estimate(sql)
+
+
+def test_rewrite_wraps_only_unfiltered_references(gateway):
+    gateway.policy = "rewrite"
+    sql = "SELECT * FROM prices UNION ALL SELECT * FROM prices WHERE date > DATE '2024-01-01'"
+    estimate = gateway.estimate(sql)
+    assert estimate.sql.count("CURRENT_DATE") == 1
+    assert estimate.sql.endswith("SELECT * FROM prices WHERE date > DATE '2024-01-01'")
+
+
+def test_duckdb_results_are_materialized(gateway):
+    result = gateway.query("SELECT * FROM prices WHERE date >= DATE '2025-01-01'")
+    assert isinstance(result, pa.Table)
+    assert result.num_rows == 2000 - 1827
+
+
+def test_uncached_reads_skip_table_versions(gateway, tmp_path, monkeypatch):
+    gateway.cache = QueryResultCache(tmp_path)
+    versions = []
+    original = gateway.backend.table_version
+    monkeypatch.setattr(gateway.backend, "table_version", lambda t: versions.append(t) or original(t))
+    sql = "SELECT COUNT(*) AS n FROM prices WHERE date >= DATE '2025-01-01'"
+
+    gateway.read_table(sql, cache=False)
+    assert versions == [] and len(gateway.cache) == 0
+
+    gateway.read_table(sql)
+    gateway.read_table(sql)
+    assert versions == ["prices", "prices"]
+    assert (gateway.cache.stats.misses, gateway.cache.stats.hits) == (1, 1)
@@ -0,0 +1,45 @@
+from src.ops.schema_drift import SKELETON_DDL, TableSpec, diff_table, load_skeleton_specs, parse_skeleton_ddl
+
+DDL = """
+-- Prices (see src/ingestion); one row per day
+CREATE TABLE IF NOT EXISTS `cbi-v15.raw.prices` (
+  date DATE,  -- trading date (exchange time); never NULL
+  symbol STRING,
+  -- legacy_close FLOAT64,
+  /* retired: settle FLOAT64, */
+  close FLOAT64
+)
+PARTITION BY DATE(date)
+CLUSTER BY symbol;
+
+/* CREATE TABLE IF NOT EXISTS `cbi-v15.raw.retired` (x INT64); */
+CREATE TABLE IF NOT EXISTS `cbi-v15.raw.events` (
+  ts TIMESTAMP,
+  payload STRING
+);
+"""
+
+
+def test_comments_are_ignored():
+    specs = parse_skeleton_ddl(DDL)
+    assert sorted(specs) == ["raw.events", "raw.prices"]
+    prices = specs["raw.prices"]
+    assert prices.columns == {"date": "DATE", "symbol": "STRING", "close": "FLOAT64"}
+    assert prices.partition_field == "date"
+    assert prices.clustering == ["symbol"]
+    assert specs["raw.events"].columns == {"ts": "TIMESTAMP", "payload": "STRING"}
+
+
+def test_commented_column_is_not_expected():
+    expected = parse_skeleton_ddl(DDL)["raw.prices"]
+    actual = TableSpec("raw.prices", dict(expected.columns), "date", ["symbol"])
+    assert diff_table(expected, actual) == []
+
+
+def test_skeleton_forecast_tables_parse():
+    specs = load_skeleton_specs(SKELETON_DDL)
+    for horizon in ("1w", "1m", "3m", "6m"):
+        spec = specs[f"forecasts.zl_predictions_{horizon}"]
+        assert spec.columns["run_id"] == "STRING"
+        assert spec.columns["published_at"] == "TIMESTAMP"
+        assert spec.clustering == ["model_type"]
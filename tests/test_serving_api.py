@@ -0,0 +1,174 @@
+import asyncio
+import threading
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.ingestion.databento.motherduck import TABLE, ZL_OHLCV_DDL
+from src.serving.api import ResponseCache, ServingStats, create_app
+from src.serving.store import ServingStore, VIEWS, decode_cursor, encode_cursor
+
+FIRST_DAY = date(2024, 1, 1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "serving.duckdb")
+    con = duckdb.connect(path)
+    con.execute(ZL_OHLCV_DDL)
+    # Weekdays only, so consecutive order keys have gaps
+    for symbol, days in (("ZL", 500), ("ZS", 40)):
+        con.execute(f"""
+            INSERT INTO {TABLE} (date, symbol, open, high, low, close, volume, open_interest)
+            SELECT DATE '{FIRST_DAY}' + i::INTEGER, '{symbol}', 50, 51, 49, 50 + i / 100, 1000 + i, 5000
+            FROM range({days}) t(i)
+            WHERE dayofweek(DATE '{FIRST_DAY}' + i::INTEGER) BETWEEN 1 AND 5
+        """)
+    con.close()
+    store = ServingStore(lambda: duckdb.connect(path), views=VIEWS)
+    assert store.refresh() == ["prices"]
+    return store
+
+
+def _weekdays(days):
+    return [str(d) for d in (FIRST_DAY + timedelta(i) for i in range(days)) if d.weekday() < 5]
+
+
+def _serve(store, scenario, page_limit=1000):
+    async def run():
+        async with TestClient(TestServer(create_app(store, page_limit=page_limit))) as client:
+            return await scenario(client)
+    return asyncio.run(run())
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(19_723)) == 19_723
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+def test_pages_cover_the_partition_exactly_once(store):
+    async def scenario(client):
+        pages, query = [], {"symbol": "ZL", "limit": "37"}
+        while True:
+            resp = await client.get("/v1/prices", params=query)
+            assert resp.status == 200
+            body = await resp.json()
+            pages.append(body)
+            if body["next_cursor"] is None:
+                return pages
+            query["after"] = body["next_cursor"]
+
+    pages = _serve(store, scenario)
+
+    dates = [row["date"] for page in pages for row in page["data"]]
+    assert dates == _weekdays(500)
+    assert all(page["count"] == 37 for page in pages[:-1])
+    assert {row["symbol"] for page in pages for row in page["data"]} == {"ZL"}
+
+
+def test_start_and_end_bound_the_pages(store):
+    async def scenario(client):
+        resp = await client.get("/v1/prices", params={"symbol": "ZS", "start": "2024-01-06", "end": "2024-01-16"})
+        return await resp.json()
+
+    body = _serve(store, scenario)
+
+    # 2024-01-06 is a Saturday: the first row is the following Monday
+    assert [row["date"] for row in body["data"]] == [
+        "2024-01-08", "2024-01-09", "2024-01-10", "2024-01-11", "2024-01-12", "2024-01-15", "2024-01-16",
+    ]
+    assert body["next_cursor"] is None
+
+
+def test_if_none_match_returns_304(store):
+    async def scenario(client):
+        first = await client.get("/v1/prices", params={"symbol": "ZS"})
+        etag = first.headers["ETag"]
+        again = await client.get("/v1/prices", params={"symbol": "ZS"}, headers={"If-None-Match": etag})
+        other = await client.get("/v1/prices", params={"symbol": "ZL"}, headers={"If-None-Match": etag})
+        stats = await (await client.get("/stats")).json()
+        return first.status, again.status, await again.read(), other.status, stats
+
+    first, again, body, other, stats = _serve(store, scenario)
+
+    assert (first, again, body, other) == (200, 304, b"", 200)
+    assert (stats["not_modified"], stats["encoded"]) == (1, 2)
+
+
+def test_concurrent_identical_misses_encode_once(store):
+    async def scenario(client):
+        responses = await asyncio.gather(*[client.get("/v1/prices", params={"symbol": "ZL"}) for _ in range(20)])
+        bodies = {await r.read() for r in responses}
+        stats = await (await client.get("/stats")).json()
+        return bodies, stats
+
+    bodies, stats = _serve(store, scenario)
+
+    assert len(bodies) == 1
+    assert stats["encoded"] == 1
+    assert stats["coalesced"] + stats["cache_hits"] == 19
+
+
+def test_response_cache_coalesces_inflight_misses():
+    release, calls = threading.Event(), []
+
+    def encode():
+        calls.append(1)
+        release.wait(timeout=5)
+        return b"body"
+
+    async def run():
+        cache, stats = ResponseCache(), ServingStats()
+        waiters = [asyncio.ensure_future(cache.get('"v1"', encode, stats)) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters), stats
+
+    bodies, stats = asyncio.run(run())
+
+    assert bodies == [b"body"] * 8
+    assert len(calls) == 1
+    assert (stats.encoded, stats.coalesced, stats.cache_hits) == (1, 7, 0)
+
+
+def test_response_cache_evicts_least_recently_used():
+    async def run():
+        cache, stats = ResponseCache(max_entries=2), ServingStats()
+        for etag in ("a", "b", "a", "c"):
+            await cache.get(etag, lambda: etag.encode(), stats)
+        return cache, stats
+
+    cache, stats = asyncio.run(run())
+
+    assert list(cache._bodies) == ["a", "c"]
+    assert (stats.encoded, stats.cache_hits) == (3, 1)
+
+
+@pytest.mark.parametrize("query", [
+    {"symbol": "ZL", "after": "not a cursor"},
+    {"symbol": "ZL", "start": "2024-13-01"},
+    {"symbol": "ZL", "end": "yesterday"},
+    {"symbol": "ZL", "limit": "0"},
+    {"symbol": "ZL", "limit": "ten"},
+    {"limit": "10"},
+])
+def test_bad_queries_return_400(store, query):
+    async def scenario(client):
+        resp = await client.get("/v1/prices", params=query)
+        return resp.status, await resp.json()
+
+    status, body = _serve(store, scenario)
+
+    assert status == 400
+    assert "error" in body
+
+
+def test_unknown_view_returns_404(store):
+    async def scenario(client):
+        return (await client.get("/v1/forecasts", params={"horizon": "1w"})).status
+
+    # No zl_predictions_* tables: the view is not served
+    assert _serve(store, scenario) == 404
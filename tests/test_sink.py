@@ -0,0 +1,107 @@
+import threading
+import time
+
+import duckdb
+import pyarrow as pa
+import pytest
+
+from src.ingestion.sink import BulkSink, DuckDBBackend
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    con.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, value VARCHAR)")
+    return con
+
+
+def _count(con):
+    return con.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def _rows(start, n, value="v"):
+    return [{"id": i, "value": f"{value}{i}"} for i in range(start, start + n)]
+
+
+class GatedBackend(DuckDBBackend):
+    """DuckDB backend whose writes wait for `gate`, counting writes started"""
+
+    def __init__(self, con, table):
+        super().__init__(con, table)
+        self.gate = threading.Event()
+        self.started = 0
+
+    def write(self, table, key_columns=()):
+        self.started += 1
+        self.gate.wait(timeout=10)
+        return super().write(table, key_columns)
+
+
+def test_flushes_when_max_rows_is_reached(con):
+    sink = BulkSink(DuckDBBackend(con, "events"), max_rows=10, max_seconds=60, background=False)
+    for start in range(0, 25, 5):
+        sink.write(_rows(start, 5))
+
+    assert _count(con) == 20
+    assert sink.stats.batches == 2
+    sink.close()
+    assert _count(con) == 25
+    assert (sink.stats.rows_in, sink.stats.rows_written, sink.stats.batches) == (25, 25, 3)
+
+
+def test_flushes_when_max_bytes_is_reached(con):
+    sink = BulkSink(DuckDBBackend(con, "events"), max_rows=10_000, max_bytes=1, max_seconds=60, background=False)
+    sink.write(pa.Table.from_pylist(_rows(0, 3)))
+    assert _count(con) == 3
+
+
+def test_idle_buffer_flushes_after_max_seconds(con):
+    with BulkSink(DuckDBBackend(con, "events"), max_rows=10_000, max_seconds=0.2) as sink:
+        sink.write(_rows(0, 3))
+        assert _count(con) == 0
+        # Stats are updated after the insert, so wait on them rather than the table
+        deadline = time.monotonic() + 5
+        while sink.stats.batches < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert sink.stats.batches == 1
+        assert _count(con) == 3
+
+
+def test_upsert_keeps_the_last_row_per_key(con):
+    with BulkSink(DuckDBBackend(con, "events"), key_columns=["id"], max_rows=6, background=False) as sink:
+        sink.write(_rows(0, 4, "old"))
+        sink.write([{"id": 1, "value": "new1"}, {"id": 1, "value": "newer1"}])
+        sink.write(_rows(3, 2, "late"))
+
+    assert con.execute("SELECT id, value FROM events ORDER BY id").fetchall() == [
+        (0, "old0"), (1, "newer1"), (2, "old2"), (3, "late3"), (4, "late4"),
+    ]
+    # id 1 appears three times in the first batch; id 3 is replaced across batches by the upsert
+    assert (sink.stats.batches, sink.stats.duplicates, sink.stats.rows_written) == (2, 2, 6)
+
+
+def test_full_queue_blocks_the_producer(con):
+    backend = GatedBackend(con, "events")
+    sink = BulkSink(backend, max_rows=1, max_seconds=60, max_pending=1)
+    produced = []
+
+    def produce():
+        for i in range(3):
+            sink.write(_rows(i, 1))
+            produced.append(i)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    # Batch 0 is being written, batch 1 waits in the queue, batch 2 cannot be queued
+    deadline = time.monotonic() + 5
+    while len(produced) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    assert produced == [0, 1]
+    assert backend.started == 1
+
+    backend.gate.set()
+    producer.join(timeout=5)
+    sink.close()
+    assert produced == [0, 1, 2]
+    assert _count(con) == 3
@@ -0,0 +1,119 @@
+import math
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
+from src.features.technical import TECHNICAL_COLUMNS, compute_technical_indicators
+from src.ops.schema_drift import load_skeleton_specs
+
+BARS = 200
+VOLUME, OPEN_INTEREST = 1000.0, 5000.0
+HO_CLOSE, BRL_CLOSE = 2.5, 0.2
+
+
+def _bars(symbol, closes, volumes=None):
+    """Bars with high / low one point around the close and open half a point below it"""
+    volumes = volumes or [VOLUME] * len(closes)
+    return pl.DataFrame({
+        "date": [date(2024, 1, 1) + timedelta(days=i) for i in range(len(closes))],
+        "symbol": symbol,
+        "open": [c - 0.5 for c in closes],
+        "high": [c + 1 for c in closes],
+        "low": [c - 1 for c in closes],
+        "close": closes,
+        "volume": volumes,
+        "open_interest": OPEN_INTEREST,
+    })
+
+
+@pytest.fixture(scope="module")
+def features():
+    # 199 flat bars at 100, then one jump to 110 on three times the volume
+    zl = _bars("ZL", [100.0] * (BARS - 1) + [110.0], [VOLUME] * (BARS - 1) + [3 * VOLUME])
+    ho = _bars("HO", [HO_CLOSE] * BARS)
+    brl = _bars("6L", [BRL_CLOSE] * BARS)
+    out = compute_technical_indicators(pl.concat([zl, ho, brl]))
+    return out.filter(pl.col("symbol") == "ZL").sort("date")
+
+
+@pytest.fixture(scope="module")
+def last(features):
+    return features.row(-1, named=True)
+
+
+@pytest.fixture(scope="module")
+def flat(features):
+    return features.row(-2, named=True)
+
+
+def test_columns_match_skeleton_ddl(features):
+    spec = load_skeleton_specs()["features.technical_indicators_us_oil_solutions"]
+    assert list(spec.columns) == TECHNICAL_COLUMNS
+    assert features.columns == TECHNICAL_COLUMNS
+
+
+def test_moving_average_distances(features, last, flat):
+    # EMA(span) moves 2 / (span + 1) of the way from 100 to 110
+    for span in (5, 10, 21):
+        ema = 100 + 10 * 2 / (span + 1)
+        assert last[f"dist_ema_{span}"] == pytest.approx(110 / ema - 1)
+        assert flat[f"dist_ema_{span}"] == pytest.approx(0)
+        assert features[f"dist_ema_{span}"][span - 2] is None
+        assert features[f"dist_ema_{span}"][span - 1] == pytest.approx(0)
+    assert last["dist_sma_63"] == pytest.approx(110 / ((62 * 100 + 110) / 63) - 1)
+    assert last["dist_sma_200"] == pytest.approx(110 / ((199 * 100 + 110) / 200) - 1)
+    assert flat["dist_sma_200"] is None
+
+
+def test_bollinger(last, flat):
+    # 19 closes at 100 and one at 110: mean 100.5, sample variance 95 / 19 = 5
+    mean, std = 100.5, math.sqrt(5)
+    assert last["bb_pct_b"] == pytest.approx((110 - (mean - 2 * std)) / (4 * std))
+    assert last["bb_bandwidth"] == pytest.approx(4 * std / mean)
+    # Zero band width on flat bars: %b is undefined
+    assert flat["bb_pct_b"] is None
+    assert flat["bb_bandwidth"] == pytest.approx(0)
+
+
+def test_ppo(last, flat):
+    ema_12, ema_26 = 100 + 10 * 2 / 13, 100 + 10 * 2 / 27
+    assert last["ppo_12_26"] == pytest.approx((ema_12 - ema_26) / ema_26 * 100)
+    assert flat["ppo_12_26"] == pytest.approx(0)
+
+
+def test_vwap_distance(last):
+    # Typical price equals the close; the last bar carries 3 of 23 volume units
+    vwap = (20 * 100 + 3 * 110) / 23
+    assert last["dist_vwap_21d"] == pytest.approx(110 / vwap - 1)
+
+
+def test_range_volatility(flat):
+    log_hl, log_co = math.log(101 / 99), math.log(100 / 99.5)
+    gk_var = 0.5 * log_hl ** 2 - (2 * math.log(2) - 1) * log_co ** 2
+    assert flat["vol_garman_klass_annualized"] == pytest.approx(math.sqrt(gk_var * 252))
+    assert flat["vol_parkinson_annualized"] == pytest.approx(log_hl / math.sqrt(4 * math.log(2)) * math.sqrt(252))
+
+
+def test_return_volatility(last, flat):
+    # 20 zero log returns and one r: sample std is r / sqrt(21)
+    r = math.log(1.1)
+    assert last["vol_21d"] == pytest.approx(r / math.sqrt(21) * math.sqrt(252))
+    assert flat["vol_21d"] == pytest.approx(0)
+
+
+def test_liquidity(last, flat):
+    assert last["amihud_illiquidity"] == pytest.approx(0.1 / (3 * VOLUME * 110))
+    assert flat["amihud_illiquidity"] == pytest.approx(0)
+    assert last["oi_volume_ratio"] == pytest.approx(OPEN_INTEREST / (3 * VOLUME))
+    assert flat["oi_volume_ratio"] == pytest.approx(OPEN_INTEREST / VOLUME)
+
+
+def test_cross_asset_and_calendar(features, flat):
+    assert flat["boho_spread"] == pytest.approx(100 / 100 * 7.5 - HO_CLOSE)
+    assert flat["terms_of_trade_zl_brl"] == pytest.approx(100 / BRL_CLOSE)
+    # Flat returns have no variance, so the correlation is stored as NULL
+    assert flat["corr_zl_brl_60d"] is None
+    first = features.row(0, named=True)
+    assert first["doy_sin"] == pytest.approx(math.sin(2 * math.pi / 365))
+    assert first["doy_cos"] == pytest.approx(math.cos(2 * math.pi / 365))